@@ -0,0 +1,51 @@
+import hashlib
+
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def make_weak_etag(*parts):
+    """
+    Build a weak ETag from cheap version parts (ids, timestamps, counters).
+    """
+    raw = "|".join("" if part is None else str(part) for part in parts)
+    return f'W/"{hashlib.sha1(raw.encode("utf-8")).hexdigest()}"'
+
+
+def _strip_weak(etag):
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def is_not_modified(request, etag=None, last_modified=None):
+    """
+    Evaluate If-None-Match (weak comparison) and, when absent, If-Modified-Since.
+    """
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match and etag:
+        candidates = parse_etags(if_none_match)
+        return "*" in candidates or _strip_weak(etag) in {_strip_weak(c) for c in candidates}
+
+    if_modified_since = request.headers.get("If-Modified-Since")
+    if if_modified_since and last_modified:
+        since = parse_http_date_safe(if_modified_since)
+        return since is not None and int(last_modified.timestamp()) <= since
+
+    return False
+
+
+def set_validators(response, etag=None, last_modified=None):
+    if etag:
+        response["ETag"] = etag
+    if last_modified:
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+    return response
+
+
+def not_modified_response(etag=None, last_modified=None):
+    return set_validators(
+        Response(status=status.HTTP_304_NOT_MODIFIED),
+        etag=etag,
+        last_modified=last_modified,
+    )
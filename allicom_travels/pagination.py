@@ -0,0 +1,29 @@
+from django.conf import settings
+
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """
+    Keyset pagination on (created_at, id), newest first.
+
+    Each page is a bounded index range scan from the cursor position, so deep
+    pages cost the same as the first one and no COUNT(*) is ever issued.
+    Page size defaults to API_PAGE_SIZE and can be overridden per request
+    with ?page_size= (capped at API_MAX_PAGE_SIZE).
+    """
+    ordering = ("-created_at", "-id")
+    page_size = getattr(settings, "API_PAGE_SIZE", 25)
+    page_size_query_param = "page_size"
+    max_page_size = getattr(settings, "API_MAX_PAGE_SIZE", 100)
+
+
+class SearchResultsPagination(PageNumberPagination):
+    """
+    Page-number pagination for relevance-ranked results, where a created_at
+    cursor does not apply. Result sets are capped by the search backend, so
+    the page count stays cheap.
+    """
+    page_size = getattr(settings, "API_PAGE_SIZE", 25)
+    page_size_query_param = "page_size"
+    max_page_size = getattr(settings, "API_MAX_PAGE_SIZE", 100)
@@ -32,6 +32,7 @@ INSTALLED_APPS = [
     "rest_framework",
     "rest_framework_simplejwt",
     "corsheaders",
+    "django_filters",
 
     # Local apps
     "users",
@@ -89,6 +90,48 @@ DATABASES = {
     }
 }
 
+# ===========================
+# CACHE
+# ===========================
+# File-based by default so all Passenger processes share one cache without
+# Redis. Set CACHE_BACKEND=django.core.cache.backends.locmem.LocMemCache for
+# single-process development.
+CACHE_BACKEND = os.environ.get(
+    "CACHE_BACKEND",
+    "django.core.cache.backends.filebased.FileBasedCache",
+)
+
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKEND,
+        "LOCATION": os.environ.get(
+            "CACHE_LOCATION",
+            str(BASE_DIR / ".cache" / "django")
+            if CACHE_BACKEND.endswith("FileBasedCache")
+            else "allicom-default",
+        ),
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    }
+}
+
+# Public catalog response cache lifetime (seconds); entries are also
+# invalidated by catalog version bumps on every catalog write.
+CATALOG_CACHE_TIMEOUT = int(os.environ.get("CATALOG_CACHE_TIMEOUT", 600))
+
+# Payment status long-poll (payments/status/<ref>/wait/): longest hold per
+# request, how often a held request re-reads the cached snapshot, and the
+# snapshot lifetime (seconds). A held request ties up a sync worker thread, so
+# each process holds at most PAYMENT_STATUS_MAX_WAITERS at once (extra waiters
+# get a 503 + Retry-After); size the worker pool to MAX_WAITERS plus the
+# threads normal traffic needs.
+PAYMENT_STATUS_WAIT_TIMEOUT = int(os.environ.get("PAYMENT_STATUS_WAIT_TIMEOUT", 10))
+PAYMENT_STATUS_POLL_INTERVAL = float(os.environ.get("PAYMENT_STATUS_POLL_INTERVAL", 1))
+PAYMENT_STATUS_MAX_WAITERS = int(os.environ.get("PAYMENT_STATUS_MAX_WAITERS", 4))
+PAYMENT_STATUS_CACHE_TIMEOUT = int(os.environ.get("PAYMENT_STATUS_CACHE_TIMEOUT", 900))
+
+# Transactions carry no currency of their own; ledger rollups are keyed by this
+PAYMENT_CURRENCY = os.environ.get("PAYMENT_CURRENCY", "NGN")
+
 # ===========================
 # EMAIL (SendGrid SMTP)
 # ===========================
@@ -104,6 +147,11 @@ DEFAULT_FROM_EMAIL = os.environ.get(
     "Allicom Tourism <supports@allicomtourism.com>",
 )
 
+# Booking/payment emails are queued in the EmailOutbox table and delivered
+# by `manage.py run_email_worker`; set EMAIL_USE_OUTBOX=false to send inline.
+EMAIL_USE_OUTBOX = os.environ.get("EMAIL_USE_OUTBOX", "true").lower() in ("1", "true", "yes")
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.environ.get("EMAIL_OUTBOX_MAX_ATTEMPTS", 6))
+
 # Frontend ticket page for QR/email links
 BOOKING_TICKET_FRONTEND_URL = os.environ.get(
     "BOOKING_TICKET_FRONTEND_URL",
@@ -162,6 +210,14 @@ REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
 }
 
+# Cursor pagination for list endpoints (see allicom_travels/pagination.py)
+API_PAGE_SIZE = int(os.environ.get("API_PAGE_SIZE", 25))
+API_MAX_PAGE_SIZE = int(os.environ.get("API_MAX_PAGE_SIZE", 100))
+
+# Minutes a pending, unpaid slot booking keeps its seats before
+# `manage.py release_expired_holds` cancels it and frees the seats.
+SEAT_HOLD_TTL_MINUTES = int(os.environ.get("SEAT_HOLD_TTL_MINUTES", 30))
+
 # SIMPLE JWT
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(days=1),
@@ -176,6 +232,18 @@ CORS_ALLOW_ALL_ORIGINS = True
 FLW_SECRET_KEY = os.environ.get("FLW_SECRET_KEY")
 FLW_PUBLIC_KEY = os.environ.get("FLW_PUBLIC_KEY")
 FLW_REDIRECT_URL = os.environ.get("FLW_REDIRECT_URL")
+# Value of the `verif-hash` header Flutterwave sends with every webhook
+FLW_SECRET_HASH = os.environ.get("FLW_SECRET_HASH")
+
+# Gateway client (payments.gateway): every call is bounded by these timeouts,
+# retried with jittered backoff, and short-circuited while the breaker is open.
+FLW_API_BASE_URL = os.environ.get("FLW_API_BASE_URL", "https://api.flutterwave.com/v3")
+FLW_CONNECT_TIMEOUT = float(os.environ.get("FLW_CONNECT_TIMEOUT", 3.05))
+FLW_READ_TIMEOUT = float(os.environ.get("FLW_READ_TIMEOUT", 10))
+FLW_MAX_RETRIES = int(os.environ.get("FLW_MAX_RETRIES", 2))
+FLW_POOL_SIZE = int(os.environ.get("FLW_POOL_SIZE", 10))
+FLW_BREAKER_THRESHOLD = int(os.environ.get("FLW_BREAKER_THRESHOLD", 5))
+FLW_BREAKER_COOLDOWN = int(os.environ.get("FLW_BREAKER_COOLDOWN", 30))
 
 # DEFAULT PK FIELD
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
@@ -0,0 +1,88 @@
+import copy
+
+
+class FieldTrackerMixin:
+    """
+    Remember the values of TRACKED_FIELDS as they were loaded from the
+    database, so save() hooks and signal handlers can detect transitions
+    without re-reading the row.
+
+    `previous(field)` / `has_changed(*fields)` are valid in pre_save and
+    post_save handlers; the snapshot moves forward once save() returns
+    (only for `update_fields` when given). Unsaved instances have no
+    previous values: previous() is None and has_changed() is True.
+
+    Fields deferred at load time are fetched in one query right before the
+    next save, while the database still holds the old values.
+    """
+    TRACKED_FIELDS = ()
+
+    # None until the instance has a database row to compare against
+    _tracked_initial = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._snapshot_tracked()
+        return instance
+
+    @classmethod
+    def _tracked_attnames(cls):
+        return {name: cls._meta.get_field(name).attname for name in cls.TRACKED_FIELDS}
+
+    def _snapshot_tracked(self, fields=None):
+        attnames = self._tracked_attnames()
+        if fields is not None:
+            attnames = {name: attname for name, attname in attnames.items() if name in fields or attname in fields}
+
+        if self._tracked_initial is None:
+            self._tracked_initial = {}
+        snapshot = self._tracked_initial
+        for name, attname in attnames.items():
+            if attname in self.__dict__:
+                # JSON values are mutable: keep a copy so in-place edits still count as changes
+                snapshot[name] = copy.deepcopy(self.__dict__[attname])
+
+    def _load_deferred_tracked(self):
+        if self._tracked_initial is None or self.pk is None:
+            return
+        missing = [name for name in self.TRACKED_FIELDS if name not in self._tracked_initial]
+        if not missing:
+            return
+
+        attnames = self._tracked_attnames()
+        row = (
+            type(self)._base_manager.using(self._state.db or "default")
+            .filter(pk=self.pk)
+            .values(*[attnames[name] for name in missing])
+            .first()
+        ) or {}
+        for name in missing:
+            self._tracked_initial[name] = row.get(attnames[name])
+
+    def previous(self, field):
+        if self._tracked_initial is None:
+            return None
+        if field not in self._tracked_initial:
+            self._load_deferred_tracked()
+        return self._tracked_initial.get(field)
+
+    def has_changed(self, *fields):
+        if self._tracked_initial is None:
+            return True
+        attnames = self._tracked_attnames()
+        return any(
+            getattr(self, attnames[field]) != self.previous(field)
+            for field in (fields or self.TRACKED_FIELDS)
+        )
+
+    def save(self, *args, **kwargs):
+        self._load_deferred_tracked()
+        created = self._tracked_initial is None
+        super().save(*args, **kwargs)
+        self._snapshot_tracked(None if created else kwargs.get("update_fields"))
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._snapshot_tracked(kwargs.get("fields"))
+
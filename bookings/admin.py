@@ -1,7 +1,9 @@
 from django.contrib import admin
+from django.utils import timezone
 from django.utils.html import format_html
 
-from .models import Booking, Notification
+from .models import Booking, EmailOutbox, Notification, SeatHold
+from .notifications import recount_unread
 from payments.models import Payment
 
 
@@ -149,10 +151,53 @@ class NotificationAdmin(admin.ModelAdmin):
 
     @admin.action(description="Mark selected notifications as read")
     def mark_as_read(self, request, queryset):
+        recipients = set(queryset.values_list("recipient_id", flat=True))
         updated = queryset.update(is_read=True)
+        recount_unread(recipients)
         self.message_user(request, f"{updated} notification(s) marked as read.")
 
     @admin.action(description="Mark selected notifications as unread")
     def mark_as_unread(self, request, queryset):
+        recipients = set(queryset.values_list("recipient_id", flat=True))
         updated = queryset.update(is_read=False)
-        self.message_user(request, f"{updated} notification(s) marked as unread.")
\ No newline at end of file
+        recount_unread(recipients)
+        self.message_user(request, f"{updated} notification(s) marked as unread.")
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        # Covers edits of is_read and moves to another recipient
+        recount_unread([obj.recipient_id, form.initial.get("recipient")])
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        recount_unread([obj.recipient_id])
+
+    def delete_queryset(self, request, queryset):
+        recipients = set(queryset.values_list("recipient_id", flat=True))
+        super().delete_queryset(request, queryset)
+        recount_unread(recipients)
+
+
+@admin.register(SeatHold)
+class SeatHoldAdmin(admin.ModelAdmin):
+    list_display = ("id", "booking", "time_slot", "date", "seats", "status", "expires_at", "released_at")
+    list_filter = ("status", "date")
+    search_fields = ("booking__id", "booking__email")
+    raw_id_fields = ("booking", "time_slot")
+
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display = ("id", "subject", "status", "attempts", "next_attempt_at", "sent_at", "created_at")
+    list_filter = ("status", "created_at")
+    search_fields = ("subject", "recipients")
+    readonly_fields = ("created_at", "sent_at", "last_error")
+    actions = ["retry_now"]
+
+    @admin.action(description="Retry selected emails now")
+    def retry_now(self, request, queryset):
+        updated = queryset.exclude(status=EmailOutbox.STATUS_SENT).update(
+            status=EmailOutbox.STATUS_PENDING,
+            next_attempt_at=timezone.now(),
+        )
+        self.message_user(request, f"{updated} email(s) queued for retry.")
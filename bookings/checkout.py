@@ -0,0 +1,155 @@
+import logging
+import uuid
+from collections import defaultdict
+
+from django.db import transaction
+
+from services.inventory import InsufficientSeats, reserve_seats
+from .emails import (
+    email_admin_new_checkout,
+    email_tourist_checkout_received,
+    email_admin_checkout_paid,
+    email_tourist_checkout_paid,
+    email_operator_checkout_paid,
+)
+from .exceptions import SeatsUnavailable
+from .holds import hold_expiry
+from .models import Booking, SeatHold
+from .notifications import notify
+from .outbox import dispatch_emails
+
+logger = logging.getLogger("bookings")
+
+
+def _reserve_cart(bookings):
+    """
+    Claim seats for every slot item. Items sharing a slot/date are claimed
+    together, and claims run in (slot, date) order so concurrent carts
+    touching the same slots always lock rows in the same order.
+    """
+    wanted = defaultdict(int)
+    slots = {}
+    buckets = {}
+    for booking in bookings:
+        if booking.time_slot_id and booking.start_date and booking.inventory_bucket:
+            key = (booking.time_slot_id, booking.start_date)
+            wanted[key] += booking.seat_count
+            slots[key] = booking.time_slot
+            buckets[key] = booking.inventory_bucket
+
+    for key in sorted(wanted):
+        try:
+            reserve_seats(slots[key], key[1], wanted[key], buckets[key])
+        except InsufficientSeats as exc:
+            raise SeatsUnavailable(key[0], key[1], exc.requested, exc.remaining)
+
+
+def create_checkout(bookings, provider):
+    """
+    Reserve, insert and bill a cart in one transaction.
+
+    Bookings are written with bulk_create, so no per-booking signals run:
+    seat holds and notifications are created here in bulk, and one email
+    is queued per recipient.
+    Returns (bookings, transaction).
+    """
+    from payments.models import Transaction  # local import to avoid circular imports
+
+    reference = f"TXN-{uuid.uuid4().hex[:12].upper()}"
+
+    for booking in bookings:
+        booking.ensure_qr_token()
+        booking.checkout_reference = reference
+
+    with transaction.atomic():
+        _reserve_cart(bookings)
+
+        Booking.objects.bulk_create(bookings)
+        # bulk_create does not return pks on every backend: re-read by token
+        created = list(
+            Booking.objects.filter(
+                booking_qr_token__in=[booking.booking_qr_token for booking in bookings]
+            ).select_related("service__operator", "package", "time_slot").order_by("pk")
+        )
+
+        expires_at = hold_expiry()
+        SeatHold.objects.bulk_create([
+            SeatHold(
+                booking=booking,
+                time_slot_id=booking.time_slot_id,
+                date=booking.start_date,
+                seats=booking.seat_count,
+                expires_at=expires_at,
+            )
+            for booking in created
+            if booking.time_slot_id and booking.inventory_bucket == "held"
+        ])
+
+        txn = Transaction.objects.create(
+            booking=created[0],
+            reference=reference,
+            amount=sum(booking.booked_total_price or 0 for booking in created),
+            provider=provider,
+            status=Transaction.STATUS_INIT,
+            meta={"checkout_booking_ids": [booking.pk for booking in created]},
+        )
+
+        notify_checkout_created(created, reference)
+
+    logger.info(f"[Checkout] Created {len(created)} booking(s) under {reference}")
+    return created, txn
+
+
+def _operator_groups(bookings):
+    groups = defaultdict(list)
+    for booking in bookings:
+        operator = getattr(booking.service, "operator", None)
+        if operator:
+            groups[operator].append(booking)
+    return groups
+
+
+def _describe(bookings):
+    return ", ".join(f"#{booking.pk} '{booking.service.title}'" for booking in bookings)
+
+
+def notify_checkout_created(bookings, reference):
+    """
+    One dashboard notification per operator plus one for admins (bulk
+    inserted), and one email per recipient.
+    """
+    first = bookings[0]
+    notify(
+        [
+            (operator, f"New booking(s) {_describe(items)} created for your services.")
+            for operator, items in _operator_groups(bookings).items()
+        ],
+        admin_message=(
+            f"New checkout {reference} with {len(bookings)} booking(s) "
+            f"by {first.given_name} {first.surname}: {_describe(bookings)}."
+        ),
+    )
+
+    def send_emails():
+        email_admin_new_checkout(bookings, reference)
+        email_tourist_checkout_received(bookings, reference)
+
+    dispatch_emails(send_emails)
+
+
+def notify_checkout_paid(bookings, reference):
+    notify(
+        [
+            (operator, f"Booking(s) {_describe(items)} are now PAID and awaiting your confirmation.")
+            for operator, items in _operator_groups(bookings).items()
+        ],
+        admin_message=f"Payment received for checkout {reference}: {_describe(bookings)}. Awaiting operator confirmation.",
+    )
+
+    def send_emails():
+        for operator, items in _operator_groups(bookings).items():
+            email_operator_checkout_paid(operator.email, items, reference)
+        email_tourist_checkout_paid(bookings, reference)
+        email_admin_checkout_paid(bookings, reference)
+
+    dispatch_emails(send_emails)
@@ -10,6 +10,8 @@ from django.conf import settings
 from django.core.mail import EmailMultiAlternatives, send_mail
 from django.contrib.auth import get_user_model
 
+from .outbox import enqueue_email
+
 logger = logging.getLogger("bookings")
 
 
@@ -92,6 +94,10 @@ def _send(subject: str, message: str, recipients: list[str]) -> None:
     if not recipients:
         return
 
+    if settings.EMAIL_USE_OUTBOX:
+        enqueue_email(subject, message, recipients)
+        return
+
     try:
         send_mail(
             subject=subject,
@@ -109,6 +115,10 @@ def _send_html(subject: str, text_body: str, html_body: str, recipients: list[st
     if not recipients:
         return
 
+    if settings.EMAIL_USE_OUTBOX:
+        enqueue_email(subject, text_body, recipients, html_body=html_body)
+        return
+
     try:
         email = EmailMultiAlternatives(
             subject=subject,
@@ -497,4 +507,78 @@ def email_tourist_booking_rejected(booking) -> None:
         f"{booking_summary_text(booking)}\n"
         f"{footer_text()}"
     )
-    _send(subject, message, [booking.email])
\ No newline at end of file
+    _send(subject, message, [booking.email])
+
+
+# ---------------------------------------------------
+# CART CHECKOUT (one email per recipient, not per booking)
+# ---------------------------------------------------
+def checkout_summary_text(bookings) -> str:
+    total = sum((booking.booked_total_price or 0) for booking in bookings)
+    sections = "\n".join(
+        f"--- Item {index} of {len(bookings)} ---\n{booking_summary_text(booking)}"
+        for index, booking in enumerate(bookings, start=1)
+    )
+    return f"{sections}\nCheckout Total: {format_money(total)}\n"
+
+
+def email_admin_new_checkout(bookings, reference) -> None:
+    subject = f"[New Checkout] {reference} - {len(bookings)} booking(s)"
+    message = (
+        "A multi-item checkout has been created on the platform.\n\n"
+        f"{checkout_summary_text(bookings)}\n"
+        f"Payment Reference: {reference}\n"
+        f"{footer_text()}"
+    )
+    _send(subject, message, get_admin_emails())
+
+
+def email_tourist_checkout_received(bookings, reference) -> None:
+    first = bookings[0]
+    subject = f"Booking received ({len(bookings)} item(s), ref {reference})"
+    message = (
+        f"Hi {first.given_name},\n\n"
+        "Your bookings have been received successfully.\n"
+        "You will receive another email once payment is confirmed and the operators confirm availability.\n\n"
+        f"{checkout_summary_text(bookings)}\n"
+        f"Payment Reference: {reference}\n"
+        f"{footer_text()}"
+    )
+    _send(subject, message, [first.email])
+
+
+def email_admin_checkout_paid(bookings, reference) -> None:
+    subject = f"[Payment Received] Checkout {reference} - {len(bookings)} booking(s)"
+    message = (
+        "Payment has been received successfully for the checkout below.\n"
+        "The bookings are now pending operator confirmation.\n\n"
+        f"{checkout_summary_text(bookings)}\n"
+        f"Payment Reference: {reference}\n"
+        f"{footer_text()}"
+    )
+    _send(subject, message, get_admin_emails())
+
+
+def email_tourist_checkout_paid(bookings, reference) -> None:
+    first = bookings[0]
+    subject = f"Payment received successfully (ref {reference})"
+    message = (
+        f"Hi {first.given_name},\n\n"
+        "Your payment has been received successfully.\n"
+        "Your bookings are now pending confirmation by the tour operators.\n\n"
+        f"{checkout_summary_text(bookings)}\n"
+        f"Payment Reference: {reference}\n"
+        f"{footer_text()}"
+    )
+    _send(subject, message, [first.email])
+
+
+def email_operator_checkout_paid(operator_email, bookings, reference) -> None:
+    subject = f"[Action Required] {len(bookings)} paid booking(s) - ref {reference}"
+    message = (
+        "The bookings below have been marked as PAID and are ready for your review.\n"
+        "Please CONFIRM or REJECT each one based on your availability.\n\n"
+        f"{checkout_summary_text(bookings)}\n"
+        f"{footer_text()}"
+    )
+    _send(subject, message, [operator_email])
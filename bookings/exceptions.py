@@ -0,0 +1,22 @@
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class SeatsUnavailable(APIException):
+    """
+    409 raised when a time slot no longer has enough seats for a booking.
+    """
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "Not enough seats remaining for this time slot."
+    default_code = "seats_unavailable"
+
+    def __init__(self, time_slot_id, date, requested, remaining):
+        super().__init__()
+        self.detail = {
+            "detail": f"Not enough capacity. {remaining} seats remaining.",
+            "code": self.default_code,
+            "time_slot_id": time_slot_id,
+            "date": date.isoformat() if date else None,
+            "requested": requested,
+            "remaining": remaining,
+        }
@@ -0,0 +1,184 @@
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Exists, F, OuterRef
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from services.models import SlotInventory
+from .models import Booking, SeatHold
+from .notifications import notify
+
+logger = logging.getLogger("bookings")
+
+EXPIRED_NOTE = "Cancelled automatically: seat hold expired before payment."
+
+
+def hold_expiry(now=None):
+    return (now or timezone.now()) + timedelta(minutes=settings.SEAT_HOLD_TTL_MINUTES)
+
+
+def open_hold(booking):
+    """
+    Start (or restart) the hold for a pending slot booking.
+    """
+    SeatHold.objects.update_or_create(
+        booking=booking,
+        defaults={
+            "time_slot_id": booking.time_slot_id,
+            "date": booking.start_date,
+            "seats": booking.seat_count,
+            "status": SeatHold.STATUS_ACTIVE,
+            "expires_at": hold_expiry(),
+            "released_at": None,
+        },
+    )
+
+
+def release_hold(booking):
+    """
+    The booking left the held state (paid, cancelled, rejected): the inventory
+    signal already moved its seats, so only the hold row is closed.
+    """
+    SeatHold.objects.filter(booking=booking, status=SeatHold.STATUS_ACTIVE).update(
+        status=SeatHold.STATUS_RELEASED,
+        released_at=timezone.now(),
+    )
+
+
+def move_hold(booking):
+    """
+    A held booking changed slot, date or party size: re-point its active
+    hold so the reaper returns the seats it actually holds.
+    """
+    SeatHold.objects.filter(booking=booking, status=SeatHold.STATUS_ACTIVE).update(
+        time_slot_id=booking.time_slot_id,
+        date=booking.start_date,
+        seats=booking.seat_count,
+    )
+
+
+def extend_hold(booking):
+    """
+    Push an active hold's expiry out by a full TTL (e.g. when checkout starts).
+    """
+    SeatHold.objects.filter(booking=booking, status=SeatHold.STATUS_ACTIVE).update(
+        expires_at=hold_expiry()
+    )
+
+
+def _announce_expired(booking_ids):
+    """
+    Side effects the bulk cancel skipped (booking_post_save never runs for
+    it): one batched notification fan-out and stale status snapshots.
+    """
+    from payments.models import Transaction  # local import to avoid circular imports
+    from payments.status import forget_status
+
+    bookings = Booking.objects.filter(pk__in=booking_ids).select_related("service__operator", "user")
+    messages = []
+    for booking in bookings:
+        messages.append((booking.service.operator, f"Booking #{booking.pk} has been cancelled: the seat hold expired."))
+        messages.append((booking.user, f"Your booking #{booking.pk} has been cancelled: the seat hold expired before payment."))
+    notify(messages, admin_message=f"{len(booking_ids)} unpaid booking(s) cancelled after their seat hold expired.")
+
+    forget_status(
+        Transaction.objects.filter(booking_id__in=booking_ids).values_list("reference", flat=True)
+    )
+
+
+def release_expired_holds(batch_size=500, now=None):
+    """
+    Expire one batch of overdue holds. Returns (expired, deferred, closed).
+
+    In one transaction: lock the batch, cancel the still-unpaid bookings with
+    a single bulk UPDATE, close every hold with one UPDATE per outcome, and
+    return the seats with one counter UPDATE per (slot, date). Bulk UPDATEs
+    send no signals, so the seats are released exactly once, here.
+
+    Holds of bookings with a payment in flight (an INIT/PENDING gateway or
+    bank transaction) are deferred by another TTL, so a late success never
+    lands on a cancelled booking; sync_payments fails abandoned checkouts,
+    after which the hold expires normally. Holds whose booking already left
+    the pending state are just closed.
+
+    Cancelled customers and operators are notified, and cached payment
+    status snapshots dropped, after the batch commits.
+    """
+    from payments.models import Transaction  # local import to avoid circular imports
+
+    now = now or timezone.now()
+
+    lock = {"skip_locked": True} if connection.features.has_select_for_update_skip_locked else {}
+
+    with transaction.atomic():
+        holds = list(
+            SeatHold.objects.select_for_update(**lock)
+            .filter(status=SeatHold.STATUS_ACTIVE, expires_at__lte=now)
+            .order_by("expires_at")
+            .values_list("pk", "booking_id")[:batch_size]
+        )
+        if not holds:
+            return 0, 0, 0
+
+        booking_ids = [booking_id for _, booking_id in holds]
+        payment_in_flight = Transaction.objects.filter(
+            booking=OuterRef("pk"),
+            status__in=[Transaction.STATUS_INIT, Transaction.STATUS_PENDING],
+        )
+        unpaid = list(
+            Booking.objects.select_for_update()
+            .filter(
+                pk__in=booking_ids,
+                status=Booking.STATUS_PENDING,
+                payment_status=Booking.PAYMENT_UNPAID,
+            )
+            .annotate(payment_in_flight=Exists(payment_in_flight))
+            .values("pk", "time_slot_id", "start_date", "num_adults", "num_children", "payment_in_flight")
+        )
+        expiring = [row for row in unpaid if not row["payment_in_flight"]]
+        expiring_ids = {row["pk"] for row in expiring}
+        deferred_ids = {row["pk"] for row in unpaid if row["payment_in_flight"]}
+
+        Booking.objects.filter(pk__in=expiring_ids).update(
+            status=Booking.STATUS_CANCELLED,
+            admin_note=EXPIRED_NOTE,
+            updated_at=now,
+        )
+
+        hold_ids = [pk for pk, _ in holds]
+        SeatHold.objects.filter(pk__in=hold_ids, booking_id__in=expiring_ids).update(
+            status=SeatHold.STATUS_EXPIRED,
+            released_at=now,
+        )
+        SeatHold.objects.filter(pk__in=hold_ids, booking_id__in=deferred_ids).update(
+            expires_at=hold_expiry(now),
+        )
+        SeatHold.objects.filter(pk__in=hold_ids).exclude(
+            booking_id__in=expiring_ids | deferred_ids
+        ).update(
+            status=SeatHold.STATUS_RELEASED,
+            released_at=now,
+        )
+
+        seats = defaultdict(int)
+        for row in expiring:
+            if row["time_slot_id"]:
+                seats[(row["time_slot_id"], row["start_date"])] += (
+                    (row["num_adults"] or 0) + (row["num_children"] or 0)
+                )
+
+        for (time_slot_id, date), count in seats.items():
+            SlotInventory.objects.filter(time_slot_id=time_slot_id, date=date).update(
+                held=Greatest(F("held") - count, 0),
+                updated_at=now,
+            )
+
+    if expiring_ids:
+        logger.info(f"[Holds] Expired {len(expiring_ids)} hold(s), released {sum(seats.values())} seat(s)")
+        _announce_expired(expiring_ids)
+
+    return len(expiring_ids), len(deferred_ids), len(holds) - len(expiring_ids) - len(deferred_ids)
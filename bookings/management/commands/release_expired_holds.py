@@ -0,0 +1,56 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from bookings.holds import release_expired_holds
+
+
+class Command(BaseCommand):
+    help = "Cancel pending bookings whose seat hold expired and return the seats to inventory"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Holds expired per transaction (default: 500).",
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=0,
+            help="Keep running, sweeping every N seconds (default: run once).",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(options["batch_size"], 1)
+        interval = options["interval"]
+
+        while True:
+            self._sweep(batch_size)
+            if not interval:
+                break
+            time.sleep(interval)
+
+    def _sweep(self, batch_size):
+        started = time.monotonic()
+        totals = [0, 0, 0]
+
+        # Drain every overdue hold, one locked batch at a time
+        while True:
+            batch = release_expired_holds(batch_size=batch_size)
+            totals = [total + count for total, count in zip(totals, batch)]
+            if sum(batch) < batch_size:
+                break
+
+        expired, deferred, closed = totals
+        if not any(totals):
+            self.stdout.write("No expired seat holds.")
+            return
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ Expired {expired} hold(s), deferred {deferred} awaiting bank transfer, "
+                f"closed {closed} stale in {time.monotonic() - started:.2f}s"
+            )
+        )
@@ -0,0 +1,72 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from bookings.outbox import claim_batch, deliver_batch
+
+
+class Command(BaseCommand):
+    help = "Deliver queued emails from the EmailOutbox table over a reused SMTP connection"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=50,
+            help="Messages sent per SMTP connection (default: 50).",
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=5,
+            help="Seconds to sleep when the outbox is empty (default: 5).",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain the currently due messages and exit.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(options["batch_size"], 1)
+        interval = max(options["interval"], 1)
+        once = options["once"]
+
+        self.stdout.write(self.style.WARNING("📨 Email worker started…"))
+        totals = [0, 0, 0]
+        failures = 0
+
+        while True:
+            messages = claim_batch(batch_size=batch_size)
+
+            if messages:
+                started = time.monotonic()
+                try:
+                    result = deliver_batch(messages)
+                except Exception as exc:
+                    # SMTP unreachable: the claimed rows come back after their lease
+                    failures += 1
+                    delay = min(interval * (2 ** failures), 300)
+                    self.stdout.write(self.style.ERROR(f"❌ SMTP connection failed: {exc} (retrying in {delay}s)"))
+                    if once:
+                        break
+                    time.sleep(delay)
+                    continue
+
+                failures = 0
+                totals = [total + count for total, count in zip(totals, result)]
+                sent, retrying, failed = result
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"✅ Sent {sent}, retrying {retrying}, failed {failed} "
+                        f"in {time.monotonic() - started:.2f}s"
+                    )
+                )
+                continue
+
+            if once:
+                break
+            time.sleep(interval)
+
+        sent, retrying, failed = totals
+        self.stdout.write(f"Done: {sent} sent, {retrying} scheduled for retry, {failed} failed.")
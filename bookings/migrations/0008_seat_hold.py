@@ -0,0 +1,67 @@
+# Generated by Django 5.2.7 on 2026-10-18 02:00
+
+from datetime import timedelta
+
+import django.db.models.deletion
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def open_holds_for_pending_bookings(apps, schema_editor):
+    # Existing unpaid slot bookings get a fresh hold instead of expiring at once
+    Booking = apps.get_model("bookings", "Booking")
+    SeatHold = apps.get_model("bookings", "SeatHold")
+    expires_at = timezone.now() + timedelta(minutes=settings.SEAT_HOLD_TTL_MINUTES)
+
+    pending = Booking.objects.filter(
+        status="pending",
+        payment_status="unpaid",
+        time_slot__isnull=False,
+    ).values_list("pk", "time_slot_id", "start_date", "num_adults", "num_children")
+
+    SeatHold.objects.bulk_create(
+        [
+            SeatHold(
+                booking_id=pk,
+                time_slot_id=time_slot_id,
+                date=start_date,
+                seats=(adults or 0) + (children or 0),
+                status="active",
+                expires_at=expires_at,
+            )
+            for pk, time_slot_id, start_date, adults, children in pending.iterator()
+            if start_date
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0007_cursor_pagination_indexes'),
+        ('services', '0012_availability_rules'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeatHold',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('seats', models.PositiveIntegerField()),
+                ('status', models.CharField(choices=[('active', 'Active'), ('released', 'Released'), ('expired', 'Expired')], default='active', max_length=20)),
+                ('expires_at', models.DateTimeField()),
+                ('released_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('booking', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='seat_hold', to='bookings.booking')),
+                ('time_slot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='seat_holds', to='services.servicetimeslot')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'expires_at'], name='seathold_status_expiry_idx')],
+            },
+        ),
+        migrations.RunPython(open_holds_for_pending_bookings, migrations.RunPython.noop),
+    ]
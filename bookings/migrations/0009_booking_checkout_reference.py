@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 02:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0008_seat_hold'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='checkout_reference',
+            field=models.CharField(blank=True, db_index=True, help_text='Reference of the Transaction paying for this booking together with other cart items.', max_length=255, null=True),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.7 on 2026-10-18 02:09
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_unread_notifications(apps, schema_editor):
+    Notification = apps.get_model("bookings", "Notification")
+    NotificationCounter = apps.get_model("bookings", "NotificationCounter")
+
+    unread = (
+        Notification.objects.filter(recipient__isnull=False, is_read=False)
+        .values("recipient_id")
+        .annotate(total=Count("id"))
+    )
+    NotificationCounter.objects.bulk_create(
+        [NotificationCounter(user_id=row["recipient_id"], unread=row["total"]) for row in unread.iterator()],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0010_email_outbox'),
+        ('users', '0004_supplierprofile'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='notification_counter', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('unread', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['recipient', 'is_read', 'created_at', 'id'], name='notif_recipient_unread_idx'),
+        ),
+        migrations.RunPython(count_unread_notifications, migrations.RunPython.noop),
+    ]
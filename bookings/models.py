@@ -1,7 +1,9 @@
 import secrets
 
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
+from django.utils import timezone
+from allicom_travels.tracking import FieldTrackerMixin
 from services.models import Service, Package
 from services.models import ServiceTimeSlot
 
@@ -13,7 +15,18 @@ def generate_booking_qr_token() -> str:
     return secrets.token_urlsafe(32)
 
 
-class Booking(models.Model):
+REFUND_REQUIRED_NOTE = "Payment received after the booking was cancelled and the slot is now full: refund required."
+
+
+def inventory_bucket_for(status):
+    if status in Booking.HELD_STATUSES:
+        return "held"
+    if status in Booking.BOOKED_STATUSES:
+        return "booked"
+    return None
+
+
+class Booking(FieldTrackerMixin, models.Model):
     time_slot = models.ForeignKey(
         ServiceTimeSlot,
         on_delete=models.PROTECT,
@@ -45,6 +58,10 @@ class Booking(models.Model):
         (STATUS_REJECTED, "Rejected"),
     ]
 
+    # Statuses that occupy seats in the slot inventory
+    HELD_STATUSES = (STATUS_PENDING,)
+    BOOKED_STATUSES = (STATUS_PAID, STATUS_CONFIRMED)
+
     # ----------------------------
     # Payment Statuses
     # ----------------------------
@@ -58,6 +75,9 @@ class Booking(models.Model):
         (PAYMENT_PENDING, "Pending Verification"),
     ]
 
+    # Workflow and seat-position fields the save signals diff against
+    TRACKED_FIELDS = ("status", "payment_status", "time_slot", "start_date", "num_adults", "num_children")
+
     # ----------------------------
     # User & Service
     # ----------------------------
@@ -126,6 +146,17 @@ class Booking(models.Model):
         help_text="Secure token used for booking QR verification."
     )
 
+    # ----------------------------
+    # CART CHECKOUT
+    # ----------------------------
+    checkout_reference = models.CharField(
+        max_length=255,
+        null=True,
+        blank=True,
+        db_index=True,
+        help_text="Reference of the Transaction paying for this booking together with other cart items."
+    )
+
     # ----------------------------
     # Traveler & Contact Information
     # ----------------------------
@@ -195,6 +226,14 @@ class Booking(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        # Composite keys backing the (created_at, id) cursor pagination
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="booking_created_idx"),
+            models.Index(fields=["user", "created_at", "id"], name="booking_user_created_idx"),
+            models.Index(fields=["service", "created_at", "id"], name="booking_service_created_idx"),
+        ]
+
     # ----------------------------
     # Helpers
     # ----------------------------
@@ -222,6 +261,18 @@ class Booking(models.Model):
             return self.service_price_snapshot
         return self.total_price
 
+    @property
+    def seat_count(self):
+        return (self.num_adults or 0) + (self.num_children or 0)
+
+    @property
+    def inventory_bucket(self):
+        """
+        Which SlotInventory counter this booking occupies ("held"/"booked"),
+        or None when it does not occupy seats.
+        """
+        return inventory_bucket_for(self.status)
+
     @property
     def is_qr_verification_valid(self):
         """
@@ -255,10 +306,41 @@ class Booking(models.Model):
         if self.payment_status == self.PAYMENT_PAID:
             return
 
+        if self.status in (self.STATUS_CANCELLED, self.STATUS_REJECTED):
+            self._mark_paid_after_release()
+            return
+
         self.payment_status = self.PAYMENT_PAID
         self.status = self.STATUS_PAID
         self.save(update_fields=["payment_status", "status", "updated_at"])
 
+    def _mark_paid_after_release(self):
+        """
+        A payment landed after the booking was cancelled/rejected and its
+        seats released. Re-claim the seats with the conditional reserve (so
+        the slot cannot be oversold) and reinstate the booking as paid; if
+        the slot has filled up meanwhile, keep it cancelled, record the
+        payment and flag it for a refund.
+        """
+        from services.inventory import InsufficientSeats, reserve_seats  # local import to avoid circular imports
+
+        with transaction.atomic():
+            if self.time_slot_id:
+                try:
+                    with transaction.atomic():
+                        reserve_seats(self.time_slot, self.start_date, self.seat_count, bucket="booked")
+                except InsufficientSeats:
+                    self.payment_status = self.PAYMENT_PAID
+                    self.admin_note = REFUND_REQUIRED_NOTE
+                    self.save(update_fields=["payment_status", "admin_note", "updated_at"])
+                    return
+                # Already counted: the inventory signal must not add them again
+                self._reserved_inventory = (self.time_slot, self.start_date, self.seat_count, "booked")
+
+            self.payment_status = self.PAYMENT_PAID
+            self.status = self.STATUS_PAID
+            self.save(update_fields=["payment_status", "status", "updated_at"])
+
 
 class Notification(models.Model):
     """
@@ -277,6 +359,120 @@ class Notification(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["recipient", "created_at", "id"],
+                name="notif_recipient_created_idx",
+            ),
+            # ?unread=true listing and mark-all-read
+            models.Index(
+                fields=["recipient", "is_read", "created_at", "id"],
+                name="notif_recipient_unread_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Notification#{self.pk} to {self.recipient} - {self.message[:30]}..."
+
+
+class NotificationCounter(models.Model):
+    """
+    Denormalized unread Notification count per recipient, kept in step by
+    bookings.notifications with F() updates so polling it is a PK lookup.
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="notification_counter",
+    )
+    unread = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user} - {self.unread} unread"
+
+
+class SeatHold(models.Model):
+    """
+    Seats claimed by a pending, unpaid slot booking, valid until `expires_at`.
+
+    Released when the booking is paid or cancelled; expired holds are reaped
+    by `manage.py release_expired_holds`, which cancels the booking and
+    returns the seats to the slot inventory.
+    """
+    STATUS_ACTIVE = "active"
+    STATUS_RELEASED = "released"
+    STATUS_EXPIRED = "expired"
+
+    STATUS_CHOICES = [
+        (STATUS_ACTIVE, "Active"),
+        (STATUS_RELEASED, "Released"),
+        (STATUS_EXPIRED, "Expired"),
+    ]
+
+    booking = models.OneToOneField(
+        Booking,
+        on_delete=models.CASCADE,
+        related_name="seat_hold"
+    )
+    time_slot = models.ForeignKey(
+        ServiceTimeSlot,
+        on_delete=models.CASCADE,
+        related_name="seat_holds"
+    )
+    date = models.DateField()
+    seats = models.PositiveIntegerField()
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_ACTIVE)
+    expires_at = models.DateTimeField()
+    released_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Reaper scan: active holds ordered by expiry
+            models.Index(fields=["status", "expires_at"], name="seathold_status_expiry_idx"),
+        ]
+
+    def __str__(self):
+        return f"Hold for Booking#{self.booking_id} ({self.seats} seats, {self.status})"
+
+
+class EmailOutbox(models.Model):
+    """
+    Queued outgoing email. Rows are written in the same transaction as the
+    change that triggers them and delivered by `manage.py run_email_worker`.
+    """
+    STATUS_PENDING = "pending"
+    STATUS_SENT = "sent"
+    STATUS_FAILED = "failed"
+
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_SENT, "Sent"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    subject = models.CharField(max_length=255)
+    text_body = models.TextField()
+    html_body = models.TextField(blank=True, default="")
+    recipients = models.JSONField(default=list)
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    # Due time for the next delivery attempt; also used as the worker's claim lease
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default="")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["created_at"]
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="outbox_status_due_idx"),
+        ]
 
     def __str__(self):
-        return f"Notification#{self.pk} to {self.recipient} - {self.message[:30]}..."
\ No newline at end of file
+        return f"Email#{self.pk} '{self.subject[:40]}' ({self.status})"
@@ -0,0 +1,99 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+
+from .models import Notification, NotificationCounter
+
+
+def notify(messages, admin_message=None):
+    """
+    Fan one event out to its recipients: one bulk INSERT for the
+    notifications plus one counter UPDATE per distinct increment.
+    `messages` is an iterable of (recipient, message); pairs without a
+    recipient (no operator, guest booking) are skipped. `admin_message`
+    goes to the admin/global feed, which has no counter.
+    """
+    notifications = [
+        Notification(recipient=recipient, message=message)
+        for recipient, message in messages
+        if recipient is not None
+    ]
+    if admin_message:
+        notifications.append(Notification(recipient=None, message=admin_message))
+    if not notifications:
+        return []
+
+    with transaction.atomic():
+        Notification.objects.bulk_create(notifications)
+        _bump_counters(Counter(n.recipient_id for n in notifications if n.recipient_id))
+    return notifications
+
+
+def _bump_counters(increments):
+    if not increments:
+        return
+
+    NotificationCounter.objects.bulk_create(
+        [NotificationCounter(user_id=user_id) for user_id in increments],
+        ignore_conflicts=True,
+    )
+
+    by_amount = {}
+    for user_id, amount in increments.items():
+        by_amount.setdefault(amount, []).append(user_id)
+    for amount, user_ids in by_amount.items():
+        NotificationCounter.objects.filter(user_id__in=user_ids).update(unread=F("unread") + amount)
+
+
+def unread_count(user):
+    return (
+        NotificationCounter.objects.filter(user_id=user.pk)
+        .values_list("unread", flat=True)
+        .first()
+    ) or 0
+
+
+def mark_read(user, notification_ids=None):
+    """
+    Mark the user's unread notifications (or just `notification_ids`) as
+    read with a single UPDATE, and take that many off the counter.
+    Returns the number of notifications changed.
+    """
+    unread = Notification.objects.filter(recipient_id=user.pk, is_read=False)
+    if notification_ids is not None:
+        unread = unread.filter(pk__in=notification_ids)
+
+    with transaction.atomic():
+        updated = unread.update(is_read=True)
+        if updated:
+            NotificationCounter.objects.filter(user_id=user.pk).update(
+                unread=Greatest(F("unread") - updated, 0)
+            )
+    return updated
+
+
+def recount_unread(user_ids):
+    """
+    Rebuild the counters of `user_ids` from the Notification table (after
+    admin bulk edits or deletes that bypass mark_read).
+    """
+    user_ids = {user_id for user_id in user_ids if user_id}
+    if not user_ids:
+        return
+
+    totals = dict(
+        Notification.objects.filter(recipient_id__in=user_ids, is_read=False)
+        .values_list("recipient_id")
+        .annotate(total=Count("id"))
+    )
+    with transaction.atomic():
+        NotificationCounter.objects.bulk_create(
+            [NotificationCounter(user_id=user_id) for user_id in user_ids],
+            ignore_conflicts=True,
+        )
+        counters = list(NotificationCounter.objects.select_for_update().filter(user_id__in=user_ids))
+        for counter in counters:
+            counter.unread = totals.get(counter.user_id, 0)
+        NotificationCounter.objects.bulk_update(counters, ["unread"])
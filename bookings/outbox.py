@@ -0,0 +1,123 @@
+import logging
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import EmailOutbox
+
+logger = logging.getLogger("bookings")
+
+# A claimed row is invisible to other workers for this long; if the worker
+# dies mid-batch the row simply becomes due again.
+CLAIM_LEASE = timedelta(minutes=5)
+
+BACKOFF_BASE_SECONDS = 60
+BACKOFF_MAX_SECONDS = 6 * 60 * 60
+
+
+def enqueue_email(subject, text_body, recipients, html_body=""):
+    return EmailOutbox.objects.create(
+        subject=subject[:255],
+        text_body=text_body,
+        html_body=html_body or "",
+        recipients=list(recipients),
+    )
+
+
+def dispatch_emails(send):
+    """
+    Run an email-producing callable: inside the current transaction when
+    emails are queued (so the outbox rows commit or roll back with the
+    change), otherwise after commit so no SMTP call happens under a lock.
+    """
+    if settings.EMAIL_USE_OUTBOX:
+        send()
+    else:
+        transaction.on_commit(send)
+
+
+def backoff_delay(attempts):
+    """
+    Exponential backoff with jitter: ~1m, 2m, 4m, ... capped at 6h.
+    """
+    delay = min(BACKOFF_BASE_SECONDS * (2 ** max(attempts - 1, 0)), BACKOFF_MAX_SECONDS)
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+def claim_batch(batch_size=50, now=None):
+    """
+    Lease up to batch_size due messages to this worker and return them.
+    """
+    now = now or timezone.now()
+    lock = {"skip_locked": True} if connection.features.has_select_for_update_skip_locked else {}
+
+    with transaction.atomic():
+        messages = list(
+            EmailOutbox.objects.select_for_update(**lock)
+            .filter(status=EmailOutbox.STATUS_PENDING, next_attempt_at__lte=now)
+            .order_by("next_attempt_at", "pk")[:batch_size]
+        )
+        if messages:
+            EmailOutbox.objects.filter(pk__in=[m.pk for m in messages]).update(
+                next_attempt_at=now + CLAIM_LEASE
+            )
+    # Keep the instances in step: deliver_batch writes next_attempt_at back,
+    # and must not undo the lease
+    for message in messages:
+        message.next_attempt_at = now + CLAIM_LEASE
+    return messages
+
+
+def deliver_batch(messages, max_attempts=None):
+    """
+    Send claimed messages over one SMTP connection and record each outcome.
+    Returns (sent, retrying, failed).
+    """
+    max_attempts = max_attempts or settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+    sent = retrying = failed = 0
+    mail_connection = get_connection(fail_silently=False)
+
+    try:
+        mail_connection.open()
+        for message in messages:
+            now = timezone.now()
+            message.attempts += 1
+            try:
+                email = EmailMultiAlternatives(
+                    subject=message.subject,
+                    body=message.text_body,
+                    from_email=getattr(settings, "DEFAULT_FROM_EMAIL", None),
+                    to=message.recipients,
+                    connection=mail_connection,
+                )
+                if message.html_body:
+                    email.attach_alternative(message.html_body, "text/html")
+                email.send(fail_silently=False)
+            except Exception as exc:
+                message.last_error = f"{exc.__class__.__name__}: {exc}"[:2000]
+                if message.attempts >= max_attempts:
+                    message.status = EmailOutbox.STATUS_FAILED
+                    failed += 1
+                    logger.error(f"[Outbox] Giving up on Email#{message.pk} after {message.attempts} attempts: {exc}")
+                else:
+                    message.next_attempt_at = now + backoff_delay(message.attempts)
+                    retrying += 1
+                    logger.warning(f"[Outbox] Email#{message.pk} failed (attempt {message.attempts}): {exc}")
+                continue
+
+            message.status = EmailOutbox.STATUS_SENT
+            message.sent_at = now
+            message.last_error = ""
+            sent += 1
+    finally:
+        mail_connection.close()
+        EmailOutbox.objects.bulk_update(
+            messages,
+            ["status", "attempts", "next_attempt_at", "last_error", "sent_at"],
+        )
+
+    return sent, retrying, failed
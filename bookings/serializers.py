@@ -1,5 +1,10 @@
+from collections import defaultdict
+
+from django.db import transaction
 from rest_framework import serializers
+from .exceptions import SeatsUnavailable
 from .models import Booking, Notification
+from services.inventory import InsufficientSeats, reserve_seats
 from services.models import ServiceTimeSlot
 
 
@@ -138,6 +143,11 @@ class BookingSerializer(serializers.ModelSerializer):
                     {"time_slot_id": "This time slot does not belong to the selected service."}
                 )
 
+            if start_date and not time_slot.availability.rule.is_open(start_date):
+                raise serializers.ValidationError(
+                    {"start_date": "This time slot does not run on the selected date."}
+                )
+
             adults = attrs.get("num_adults", 0)
             children = attrs.get("num_children", 0)
             requested_seats = adults + children
@@ -147,11 +157,12 @@ class BookingSerializer(serializers.ModelSerializer):
                     {"num_adults": "At least one traveler is required."}
                 )
 
-            remaining = time_slot.seats_remaining()
-            if remaining < requested_seats:
-                raise serializers.ValidationError(
-                    {"time_slot_id": f"Not enough capacity. {remaining} seats remaining."}
-                )
+            # Cheap early rejection; create() makes the authoritative atomic claim.
+            # A cart checks capacity itself, summed over items sharing a slot.
+            if not self.context.get("cart"):
+                remaining = time_slot.seats_remaining(start_date)
+                if remaining < requested_seats:
+                    raise SeatsUnavailable(time_slot.pk, start_date, requested_seats, remaining)
 
         return attrs
 
@@ -159,6 +170,27 @@ class BookingSerializer(serializers.ModelSerializer):
         """
         Attach user if authenticated AND store stable snapshots.
         """
+        self.apply_snapshots(validated_data)
+
+        time_slot = validated_data.get("time_slot")
+        start_date = validated_data.get("start_date")
+        if time_slot is None or start_date is None:
+            return super().create(validated_data)
+
+        booking = Booking(**validated_data)
+        with transaction.atomic():
+            try:
+                reserve_seats(time_slot, start_date, booking.seat_count, booking.inventory_bucket)
+            except InsufficientSeats as exc:
+                raise SeatsUnavailable(time_slot.pk, start_date, exc.requested, exc.remaining)
+
+            # Seats are already claimed: the inventory signal must not add them again
+            booking._reserved_inventory = (time_slot, start_date, booking.seat_count, booking.inventory_bucket)
+            booking.save()
+
+        return booking
+
+    def apply_snapshots(self, validated_data):
         request = self.context.get("request")
         if request and request.user and request.user.is_authenticated:
             validated_data["user"] = request.user
@@ -180,9 +212,96 @@ class BookingSerializer(serializers.ModelSerializer):
 
         service_price = validated_data.get("service_price_snapshot")
         validated_data["final_price_snapshot"] = package_price if package_price is not None else service_price
+        return validated_data
+
+
+class CheckoutSerializer(serializers.Serializer):
+    """
+    Cart checkout: shared traveler/contact details plus several booking items.
+    Each item is validated with BookingSerializer (contact fields merged in).
+
+    Errors come back per item, `{"items": [{}, {"time_slot_id": [...]}]}`, so
+    the client can tell which line to fix or drop; that includes items whose
+    slot/date (together with other items on it) is over capacity.
+    """
+    MAX_ITEMS = 10
+
+    CONTACT_FIELDS = (
+        "given_name",
+        "surname",
+        "other_names",
+        "contact_number",
+        "email",
+        "full_contact_address",
+        "nationality",
+        "current_residence",
+        "id_card_type",
+    )
+
+    contact = serializers.DictField()
+    items = serializers.ListField(
+        child=serializers.DictField(),
+        min_length=1,
+        max_length=MAX_ITEMS,
+    )
+
+    def validate(self, attrs):
+        contact = {key: value for key, value in attrs["contact"].items() if key in self.CONTACT_FIELDS}
+
+        errors = {}
+        valid = {}
+        for index, item in enumerate(attrs["items"]):
+            item_serializer = BookingSerializer(data={**contact, **item}, context={**self.context, "cart": True})
+            if item_serializer.is_valid():
+                valid[index] = item_serializer
+            else:
+                errors[index] = item_serializer.errors
+        self._items = list(valid.values())
+
+        errors.update(self._capacity_errors(valid))
+        if errors:
+            raise serializers.ValidationError(
+                {"items": [errors.get(index, {}) for index in range(len(attrs["items"]))]}
+            )
+        return attrs
+
+    def _capacity_errors(self, valid):
+        """
+        Cheap early rejection per (slot, date), summing the seats of every
+        valid item on it; create_checkout() makes the authoritative claim.
+        """
+        wanted = defaultdict(int)
+        members = defaultdict(list)
+        slots = {}
+        for index, item_serializer in valid.items():
+            data = item_serializer.validated_data
+            time_slot = data.get("time_slot")
+            if time_slot is None:
+                continue
+            key = (time_slot.pk, data.get("start_date"))
+            wanted[key] += data.get("num_adults", 0) + data.get("num_children", 0)
+            members[key].append(index)
+            slots[key] = time_slot
+
+        errors = {}
+        for key, seats in wanted.items():
+            remaining = slots[key].seats_remaining(key[1])
+            if remaining < seats:
+                message = f"Not enough capacity. {remaining} seats remaining, {seats} requested across the cart."
+                for index in members[key]:
+                    errors[index] = {"time_slot_id": [message]}
+        return errors
+
+    def build_bookings(self, user=None):
+        """Unsaved Booking instances with snapshots applied, one per item."""
+        bookings = []
+        for item_serializer in self._items:
+            data = item_serializer.apply_snapshots(dict(item_serializer.validated_data))
+            if user is not None:
+                data["user"] = user
+            bookings.append(Booking(**data))
+        return bookings
 
-        return super().create(validated_data)
-    
 
 class NotificationSerializer(serializers.ModelSerializer):
     recipient_username = serializers.CharField(source="recipient.username", read_only=True)
@@ -150,10 +150,14 @@
 #         logger.exception(f"Error in booking_post_save for Booking#{instance.pk}: {e}")
 
 import logging
-from django.db.models.signals import pre_save, post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 
-from .models import Booking, Notification
+from services.inventory import move_booking_seats
+from services.models import ServiceTimeSlot
+from .holds import move_hold, open_hold, release_hold
+from .models import Booking, inventory_bucket_for
+from .notifications import notify
 from .emails import (
     email_admin_new_booking,
     email_admin_payment_received,
@@ -168,22 +172,81 @@ from .emails import (
 logger = logging.getLogger("bookings")
 
 
-@receiver(pre_save, sender=Booking)
-def booking_pre_save(sender, instance, **kwargs):
+# Fields whose change can move a booking's seats between slots, dates or buckets
+INVENTORY_FIELDS = ("status", "time_slot", "start_date", "num_adults", "num_children")
+
+
+def _inventory_position(booking, time_slot=None):
+    """
+    (time_slot, date, seats, bucket) describing the seats a booking occupies.
+    """
+    if not booking.time_slot_id:
+        return None
+    return (
+        time_slot or booking.time_slot,
+        booking.start_date,
+        booking.seat_count,
+        inventory_bucket_for(booking.status),
+    )
+
+
+def _previous_inventory_position(booking):
     """
-    Track old status & payment_status so we can detect transitions.
+    The position as last loaded/saved, rebuilt from the tracked values.
+    Only a slot change needs a query (to fetch the old slot).
     """
-    if instance.pk:
-        try:
-            old = Booking.objects.get(pk=instance.pk)
-            instance._old_status = old.status
-            instance._old_payment_status = old.payment_status
-        except Booking.DoesNotExist:
-            instance._old_status = None
-            instance._old_payment_status = None
+    time_slot_id = booking.previous("time_slot")
+    if not time_slot_id:
+        return None
+
+    if time_slot_id == booking.time_slot_id:
+        time_slot = booking.time_slot
     else:
-        instance._old_status = None
-        instance._old_payment_status = None
+        time_slot = ServiceTimeSlot.objects.filter(pk=time_slot_id).first()
+        if time_slot is None:
+            return None
+
+    return (
+        time_slot,
+        booking.previous("start_date"),
+        (booking.previous("num_adults") or 0) + (booking.previous("num_children") or 0),
+        inventory_bucket_for(booking.previous("status")),
+    )
+
+
+@receiver(post_save, sender=Booking)
+def booking_inventory_post_save(sender, instance, created, **kwargs):
+    """
+    Keep the per-date SlotInventory ledger in step with booking transitions.
+    Runs outside the notification handler so failures are not swallowed.
+    """
+    # Seats already claimed by reserve_seats (new bookings, late payments)
+    reserved = instance.__dict__.pop("_reserved_inventory", None)
+
+    if created or reserved is not None:
+        old = reserved
+    elif instance.has_changed(*INVENTORY_FIELDS):
+        old = _previous_inventory_position(instance)
+    else:
+        return
+
+    new = _inventory_position(instance)
+    move_booking_seats(old, new)
+
+    # Pending slot bookings hold their seats only until the hold expires
+    old_bucket = old[3] if old else None
+    new_bucket = new[3] if new else None
+    if new_bucket == "held" and (created or old_bucket != "held"):
+        open_hold(instance)
+    elif old_bucket == "held" and new_bucket != "held":
+        release_hold(instance)
+    elif new_bucket == "held" and old != new:
+        move_hold(instance)
+
+
+@receiver(post_delete, sender=Booking)
+def booking_inventory_post_delete(sender, instance, **kwargs):
+    move_booking_seats(_inventory_position(instance), None)
 
 
 @receiver(post_save, sender=Booking)
@@ -191,48 +254,43 @@ def booking_post_save(sender, instance, created, **kwargs):
     """
     Keep dashboard Notification table intact, and also send emails.
     """
-    try:
-        def create_notification(recipient, message):
-            Notification.objects.create(recipient=recipient, message=message)
+    # Cart checkouts notify once per recipient (see bookings.checkout)
+    if getattr(instance, "_batched_notifications", False):
+        return
 
+    try:
         service = getattr(instance, "service", None)
         operator = getattr(service, "operator", None) if service else None
 
         if created:
-            if operator:
-                create_notification(
-                    operator,
-                    f"New booking #{instance.pk} created for your service '{service.title}'."
-                )
-
-            create_notification(
-                None,
-                f"New booking #{instance.pk} received for '{service.title}' by {instance.given_name} {instance.surname}."
+            notify(
+                [(operator, f"New booking #{instance.pk} created for your service '{service.title}'.")],
+                admin_message=f"New booking #{instance.pk} received for '{service.title}' by {instance.given_name} {instance.surname}.",
             )
 
             email_admin_new_booking(instance)
             email_tourist_booking_received(instance)
             return
 
-        old_status = getattr(instance, "_old_status", None)
         new_status = instance.status
-
-        old_payment = getattr(instance, "_old_payment_status", None)
         new_payment = instance.payment_status
 
-        status_changed = old_status != new_status
-        payment_changed = old_payment != new_payment
-
-        if payment_changed and new_payment == Booking.PAYMENT_PAID:
-            if operator:
-                create_notification(
-                    operator,
-                    f"Booking #{instance.pk} for '{service.title}' is now PAID and awaiting your confirmation."
-                )
-
-            create_notification(
-                None,
-                f"Payment received for booking #{instance.pk} - '{service.title}'. Awaiting operator confirmation."
+        status_changed = instance.has_changed("status")
+        payment_changed = instance.has_changed("payment_status")
+
+        if payment_changed and new_payment == Booking.PAYMENT_PAID and new_status in (
+            Booking.STATUS_CANCELLED,
+            Booking.STATUS_REJECTED,
+        ):
+            notify(
+                [],
+                admin_message=f"Payment received for {new_status} booking #{instance.pk} - '{service.title}': "
+                              f"the slot is full, refund required.",
+            )
+        elif payment_changed and new_payment == Booking.PAYMENT_PAID:
+            notify(
+                [(operator, f"Booking #{instance.pk} for '{service.title}' is now PAID and awaiting your confirmation.")],
+                admin_message=f"Payment received for booking #{instance.pk} - '{service.title}'. Awaiting operator confirmation.",
             )
 
             email_operator_booking_paid(instance)
@@ -240,57 +298,39 @@ def booking_post_save(sender, instance, created, **kwargs):
             email_admin_payment_received(instance)
 
         if status_changed and new_status == Booking.STATUS_CONFIRMED:
-            if operator:
-                create_notification(
-                    operator,
-                    f"Booking #{instance.pk} for '{service.title}' has been confirmed."
-                )
-
-            create_notification(
-                None,
-                f"Booking #{instance.pk} for '{service.title}' has been confirmed by the operator."
+            notify(
+                [
+                    (operator, f"Booking #{instance.pk} for '{service.title}' has been confirmed."),
+                    (instance.user, f"Your booking #{instance.pk} has been confirmed."),
+                ],
+                admin_message=f"Booking #{instance.pk} for '{service.title}' has been confirmed by the operator.",
             )
 
-            if instance.user:
-                create_notification(
-                    instance.user,
-                    f"Your booking #{instance.pk} has been confirmed."
-                )
-
             email_tourist_booking_confirmed(instance)
             email_admin_booking_confirmed(instance)
 
         if status_changed and new_status == Booking.STATUS_REJECTED:
             reason = instance.admin_note or "No reason provided."
 
-            if operator:
-                create_notification(
-                    operator,
-                    f"Booking #{instance.pk} was rejected. Reason: {reason}"
-                )
-
-            if instance.user:
-                create_notification(
-                    instance.user,
-                    f"Your booking #{instance.pk} was rejected. Reason: {reason}"
-                )
-
-            create_notification(
-                None,
-                f"Booking #{instance.pk} for '{service.title}' was rejected. Reason: {reason}"
+            notify(
+                [
+                    (operator, f"Booking #{instance.pk} was rejected. Reason: {reason}"),
+                    (instance.user, f"Your booking #{instance.pk} was rejected. Reason: {reason}"),
+                ],
+                admin_message=f"Booking #{instance.pk} for '{service.title}' was rejected. Reason: {reason}",
             )
 
             email_tourist_booking_rejected(instance)
 
         if status_changed and new_status == Booking.STATUS_CANCELLED:
             initiator = getattr(instance.user, "username", "Unknown")
-            create_notification(None, f"Booking #{instance.pk} has been cancelled by {initiator}.")
-
-            if operator:
-                create_notification(operator, f"Booking #{instance.pk} has been cancelled.")
-
-            if instance.user:
-                create_notification(instance.user, f"Your booking #{instance.pk} has been cancelled.")
+            notify(
+                [
+                    (operator, f"Booking #{instance.pk} has been cancelled."),
+                    (instance.user, f"Your booking #{instance.pk} has been cancelled."),
+                ],
+                admin_message=f"Booking #{instance.pk} has been cancelled by {initiator}.",
+            )
 
     except Exception as e:
         logger.exception(f"Error in booking_post_save for Booking#{instance.pk}: {e}")
\ No newline at end of file
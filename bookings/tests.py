@@ -1,3 +1,438 @@
-from django.test import TestCase
+from datetime import date, time, timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from services.models import Service, ServiceAvailability, ServiceTimeSlot, SlotInventory
+from .checkout import create_checkout
+from .exceptions import SeatsUnavailable
+from .holds import EXPIRED_NOTE, release_expired_holds
+from .models import Booking, EmailOutbox, Notification, NotificationCounter, SeatHold
+from .notifications import mark_read, notify, recount_unread, unread_count
+from .outbox import CLAIM_LEASE, claim_batch, deliver_batch, enqueue_email
+
+DAY = date(2030, 1, 7)
+
+CONTACT = {
+    "given_name": "Ada",
+    "surname": "Obi",
+    "contact_number": "08000000000",
+    "email": "ada@example.com",
+    "full_contact_address": "1 Marina, Lagos",
+    "nationality": "NG",
+    "current_residence": "NG",
+    "id_card_type": "passport",
+}
+
+
+# ---------------------------------------------------
+# HELPERS
+# ---------------------------------------------------
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "bookings-tests"}})
+class CleanCacheTestCase(TestCase):
+    """Private, emptied cache per test, so DRF throttle history never leaks between runs."""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+
+def make_slot(operator, title, price, capacity):
+    service = Service.objects.create(
+        operator=operator, title=title, city="Lagos", country="Nigeria",
+        description="d", price=price, is_approved=True,
+    )
+    availability = ServiceAvailability.objects.create(
+        service=service, start_date=date(2030, 1, 1), end_date=date(2030, 12, 31),
+    )
+    return ServiceTimeSlot.objects.create(
+        availability=availability, start_time=time(9), end_time=time(11), capacity=capacity,
+    )
+
+
+def make_booking(slot, adults=1, **fields):
+    return Booking.objects.create(
+        service=slot.availability.service, time_slot=slot, start_date=DAY, end_date=DAY,
+        num_adults=adults, **{**CONTACT, **fields},
+    )
+
+
+def counters(slot, day=DAY):
+    row = SlotInventory.objects.filter(time_slot=slot, date=day).first()
+    return (row.booked, row.held) if row else (0, 0)
+
+
+# ---------------------------------------------------
+# CART CHECKOUT
+# ---------------------------------------------------
+@override_settings(FLW_REDIRECT_URL="https://pay.example.com/checkout/{reference}")
+class CheckoutTests(CleanCacheTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.operator = get_user_model().objects.create_user("op", "op@example.com", "pw", role="operator")
+        cls.boat = make_slot(cls.operator, "Boat", Decimal("100"), capacity=5)
+        cls.hike = make_slot(cls.operator, "Hike", Decimal("250"), capacity=2)
+
+    def item(self, slot, adults=1, children=0):
+        return {
+            "service": slot.availability.service_id,
+            "time_slot_id": slot.pk,
+            "start_date": DAY.isoformat(),
+            "end_date": DAY.isoformat(),
+            "num_adults": adults,
+            "num_children": children,
+        }
+
+    def checkout(self, *items):
+        return self.client.post(
+            reverse("bookings:booking-checkout"),
+            {"contact": CONTACT, "items": list(items)},
+            content_type="application/json",
+        )
+
+    def test_cart_reserves_every_item_under_one_transaction(self):
+        from payments.models import Transaction
+
+        response = self.checkout(self.item(self.boat, adults=2, children=1), self.item(self.hike, adults=2))
+
+        self.assertEqual(response.status_code, 201, response.content)
+        body = response.json()
+        self.assertEqual(body["payment_url"], f"https://pay.example.com/checkout/{body['reference']}")
+        self.assertEqual(counters(self.boat), (0, 3))
+        self.assertEqual(counters(self.hike), (0, 2))
+
+        txn = Transaction.objects.get(reference=body["reference"])
+        self.assertEqual(txn.amount, Decimal("350"))
+        bookings = Booking.objects.filter(checkout_reference=txn.reference)
+        self.assertEqual(bookings.count(), 2)
+        self.assertEqual(SeatHold.objects.filter(booking__in=bookings).count(), 2)
+
+    def test_sold_out_item_is_reported_on_its_line(self):
+        response = self.checkout(self.item(self.boat), self.item(self.hike, adults=3))
+
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()["items"]
+        self.assertEqual(errors[0], {})
+        self.assertIn("time_slot_id", errors[1])
+        self.assertEqual(counters(self.boat), (0, 0))
+        self.assertFalse(Booking.objects.exists())
+
+    def test_items_sharing_a_slot_are_checked_together(self):
+        response = self.checkout(self.item(self.hike), self.item(self.hike, adults=2))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([set(line) for line in response.json()["items"]], [{"time_slot_id"}, {"time_slot_id"}])
+
+    @override_settings(FLW_REDIRECT_URL=None)
+    def test_no_payment_link_fails_before_reserving(self):
+        response = self.checkout(self.item(self.boat))
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(counters(self.boat), (0, 0))
+        self.assertFalse(Booking.objects.exists())
+
+    def bookings_for(self, *lines):
+        return [
+            Booking(
+                service=slot.availability.service, time_slot=slot, start_date=DAY, end_date=DAY,
+                num_adults=adults, final_price_snapshot=slot.availability.service.price, **CONTACT,
+            )
+            for slot, adults in lines
+        ]
+
+    def test_lost_race_leaves_no_partial_reservations(self):
+        from payments.models import Transaction
+
+        # Someone else took the hike seats after validation
+        SlotInventory.objects.create(time_slot=self.hike, date=DAY, capacity=2, held=2)
+
+        with self.assertRaises(SeatsUnavailable):
+            create_checkout(self.bookings_for((self.boat, 2), (self.hike, 1)), Transaction.PROVIDER_FLUTTERWAVE)
+
+        self.assertEqual(counters(self.boat), (0, 0))
+        self.assertEqual(counters(self.hike), (0, 2))
+        self.assertFalse(Booking.objects.exists())
+
+    def test_repeated_slot_is_reserved_once_in_lock_order(self):
+        from payments.models import Transaction
+        from services.inventory import reserve_seats
+
+        cart = self.bookings_for((self.hike, 1), (self.boat, 1), (self.hike, 1))
+        with mock.patch("bookings.checkout.reserve_seats", wraps=reserve_seats) as reserve:
+            create_checkout(cart, Transaction.PROVIDER_FLUTTERWAVE)
+
+        self.assertEqual(
+            [call.args for call in reserve.call_args_list],
+            [(self.boat, DAY, 1, "held"), (self.hike, DAY, 2, "held")],
+        )
+        self.assertEqual(counters(self.hike), (0, 2))
+
+
+# ---------------------------------------------------
+# SEAT HOLDS
+# ---------------------------------------------------
+class SeatHoldReaperTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        operator = get_user_model().objects.create_user("op", "op@example.com", "pw", role="operator")
+        cls.slot = make_slot(operator, "Boat", Decimal("100"), capacity=5)
+
+    def reap(self):
+        return release_expired_holds(now=timezone.now() + timedelta(days=1))
+
+    def test_pending_booking_holds_its_seats(self):
+        booking = make_booking(self.slot, adults=2)
+
+        self.assertEqual(counters(self.slot), (0, 2))
+        self.assertEqual(booking.seat_hold.status, SeatHold.STATUS_ACTIVE)
+
+    def test_expired_hold_cancels_the_booking_and_releases_its_seats(self):
+        booking = make_booking(self.slot, adults=2)
+        make_booking(self.slot, adults=1)
+
+        self.assertEqual(self.reap(), (2, 0, 0))
+
+        booking.refresh_from_db()
+        self.assertEqual(booking.status, Booking.STATUS_CANCELLED)
+        self.assertEqual(booking.admin_note, EXPIRED_NOTE)
+        self.assertEqual(booking.seat_hold.status, SeatHold.STATUS_EXPIRED)
+        self.assertEqual(counters(self.slot), (0, 0))
+        self.assertEqual(self.slot.seats_remaining(DAY), 5)
+
+    def test_unexpired_hold_is_left_alone(self):
+        make_booking(self.slot, adults=2)
+
+        self.assertEqual(release_expired_holds(), (0, 0, 0))
+        self.assertEqual(counters(self.slot), (0, 2))
+
+    def test_hold_with_payment_in_flight_is_deferred(self):
+        from payments.models import Transaction
+
+        booking = make_booking(self.slot, adults=2)
+        Transaction.objects.create(
+            booking=booking, reference="TXN-LATE", amount=Decimal("100"),
+            provider=Transaction.PROVIDER_FLUTTERWAVE, status=Transaction.STATUS_PENDING,
+        )
+        expires_at = booking.seat_hold.expires_at
+
+        self.assertEqual(self.reap(), (0, 1, 0))
+
+        booking.refresh_from_db()
+        self.assertEqual(booking.status, Booking.STATUS_PENDING)
+        self.assertGreater(booking.seat_hold.expires_at, expires_at)
+        self.assertEqual(counters(self.slot), (0, 2))
+
+
+# ---------------------------------------------------
+# EMAIL OUTBOX
+# ---------------------------------------------------
+class EmailOutboxTests(TestCase):
+    def setUp(self):
+        self.queued = [enqueue_email(f"Mail {n}", "body", ["ada@example.com"]) for n in range(3)]
+        self.now = timezone.now()
+
+    def test_claimed_rows_are_leased_to_one_worker(self):
+        first = claim_batch(batch_size=2, now=self.now)
+        second = claim_batch(batch_size=2, now=self.now)
+
+        self.assertEqual([m.pk for m in first], [m.pk for m in self.queued[:2]])
+        self.assertEqual([m.pk for m in second], [self.queued[2].pk])
+        self.assertEqual(claim_batch(now=self.now), [])
+
+    def test_lease_lapses_if_the_worker_dies(self):
+        claimed = claim_batch(now=self.now)
+
+        self.assertEqual(claim_batch(now=self.now + CLAIM_LEASE - timedelta(seconds=1)), [])
+        again = claim_batch(now=self.now + CLAIM_LEASE)
+        self.assertEqual({m.pk for m in again}, {m.pk for m in claimed})
+
+    def test_delivered_rows_are_marked_sent(self):
+        self.assertEqual(deliver_batch(claim_batch(now=self.now)), (3, 0, 0))
+
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertFalse(EmailOutbox.objects.exclude(status=EmailOutbox.STATUS_SENT).exists())
+        self.assertEqual(claim_batch(now=self.now + CLAIM_LEASE), [])
+
+    def test_failed_send_backs_off_then_gives_up(self):
+        claimed = claim_batch(batch_size=1, now=self.now)
+        with mock.patch("bookings.outbox.EmailMultiAlternatives.send", side_effect=OSError("smtp down")):
+            self.assertEqual(deliver_batch(claimed, max_attempts=2), (0, 1, 0))
+
+            message = EmailOutbox.objects.get(pk=claimed[0].pk)
+            self.assertEqual((message.status, message.attempts), (EmailOutbox.STATUS_PENDING, 1))
+            self.assertGreater(message.next_attempt_at, self.now + timedelta(seconds=30))
+            self.assertIn("smtp down", message.last_error)
+
+            self.assertEqual(deliver_batch([message], max_attempts=2), (0, 0, 1))
+            message.refresh_from_db()
+            self.assertEqual(message.status, EmailOutbox.STATUS_FAILED)
+
+
+# ---------------------------------------------------
+# UNREAD COUNTERS
+# ---------------------------------------------------
+class NotificationCounterTests(CleanCacheTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.ada = User.objects.create_user("ada", "ada@example.com", "pw")
+        cls.bola = User.objects.create_user("bola", "bola@example.com", "pw")
+
+    def assertCounterMatches(self, user):
+        real = Notification.objects.filter(recipient=user, is_read=False).count()
+        self.assertEqual(unread_count(user), real)
+        return real
+
+    def test_fan_out_counts_each_recipient_once_per_message(self):
+        notify([(self.ada, "one"), (self.ada, "two"), (self.bola, "three"), (None, "guest")], admin_message="admin")
+
+        self.assertEqual(self.assertCounterMatches(self.ada), 2)
+        self.assertEqual(self.assertCounterMatches(self.bola), 1)
+        self.assertTrue(Notification.objects.filter(recipient=None, message="admin").exists())
+
+    def test_mark_read_keeps_the_counter_in_step(self):
+        created = notify([(self.ada, f"n{n}") for n in range(4)] + [(self.bola, "other")])
+        first, second = (n.pk for n in Notification.objects.filter(recipient=self.ada).order_by("pk")[:2])
+
+        self.assertEqual(mark_read(self.ada, [first]), 1)
+        # Already read, and someone else's: neither moves the counter
+        self.assertEqual(mark_read(self.ada, [first, created[-1].pk]), 0)
+        self.assertEqual(self.assertCounterMatches(self.ada), 3)
+
+        self.assertEqual(mark_read(self.ada), 3)
+        self.assertEqual(self.assertCounterMatches(self.ada), 0)
+        self.assertEqual(mark_read(self.ada), 0)
+        self.assertEqual(unread_count(self.ada), 0)
+        self.assertEqual(self.assertCounterMatches(self.bola), 1)
+
+    def test_recount_repairs_a_drifted_counter(self):
+        notify([(self.ada, "one"), (self.ada, "two")])
+        Notification.objects.filter(recipient=self.ada).first().delete()
+
+        recount_unread([self.ada.pk, self.bola.pk])
+
+        self.assertEqual(self.assertCounterMatches(self.ada), 1)
+        self.assertEqual(NotificationCounter.objects.get(user=self.bola).unread, 0)
+
+    def test_endpoints_read_and_clear_the_counter(self):
+        notify([(self.ada, "one"), (self.ada, "two")])
+        notification = Notification.objects.filter(recipient=self.ada).first()
+        self.client.force_login(self.ada)
+
+        self.assertEqual(self.client.get(reverse("bookings:notifications-unread-count")).json(), {"unread": 2})
+        self.client.post(reverse("bookings:notification-read", args=[notification.pk]))
+        self.assertEqual(self.client.get(reverse("bookings:notifications-unread-count")).json(), {"unread": 1})
+        self.client.post(reverse("bookings:notifications-mark-all-read"))
+        self.assertEqual(self.client.get(reverse("bookings:notifications-unread-count")).json(), {"unread": 0})
+
+
+# ---------------------------------------------------
+# CURSOR PAGINATION
+# ---------------------------------------------------
+class CursorPaginationTests(CleanCacheTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.ada = get_user_model().objects.create_user("ada", "ada@example.com", "pw")
+        notify([(cls.ada, f"n{n}") for n in range(7)])
+        # Several rows share a timestamp: the id tie-breaker must keep pages stable
+        same_time = timezone.now() - timedelta(hours=1)
+        Notification.objects.filter(message__in=["n2", "n3", "n4"]).update(created_at=same_time)
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.ada)
+
+    def walk(self, url, inserted_after_first_page=False):
+        seen = []
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                body = self.client.get(url).json()
+            self.assertFalse(any("COUNT(" in query["sql"].upper() for query in queries))
+            seen += [row["message"] for row in body["results"]]
+            if inserted_after_first_page:
+                notify([(self.ada, "late")])
+                inserted_after_first_page = False
+            url = body["next"]
+        return seen
+
+    def test_pages_cover_every_row_once_newest_first(self):
+        seen = self.walk(reverse("bookings:notifications-list") + "?page_size=2")
+
+        expected = list(
+            Notification.objects.filter(recipient=self.ada)
+            .order_by("-created_at", "-id")
+            .values_list("message", flat=True)
+        )
+        self.assertEqual(seen, expected)
+        self.assertEqual(len(seen), 7)
+
+    def test_rows_inserted_mid_walk_do_not_shift_later_pages(self):
+        seen = self.walk(reverse("bookings:notifications-list") + "?page_size=3", inserted_after_first_page=True)
+
+        self.assertNotIn("late", seen)
+        self.assertEqual(sorted(seen), sorted(f"n{n}" for n in range(7)))
+
+
+# ---------------------------------------------------
+# FIELD TRACKING
+# ---------------------------------------------------
+class FieldTrackingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        operator = get_user_model().objects.create_user("op", "op@example.com", "pw", role="operator")
+        cls.slot = make_slot(operator, "Boat", Decimal("100"), capacity=5)
+        cls.booking = make_booking(cls.slot, adults=2)
+
+    def test_transitions_are_seen_without_rereading_the_row(self):
+        booking = Booking.objects.get(pk=self.booking.pk)
+        self.assertFalse(booking.has_changed())
+
+        booking.status = Booking.STATUS_CANCELLED
+        with self.assertNumQueries(0):
+            self.assertTrue(booking.has_changed("status"))
+            self.assertFalse(booking.has_changed("payment_status", "num_adults"))
+            self.assertEqual(booking.previous("status"), Booking.STATUS_PENDING)
+
+        booking.save()
+        self.assertFalse(booking.has_changed())
+        self.assertEqual(booking.previous("status"), Booking.STATUS_CANCELLED)
+        # The status change released the held seats
+        self.assertEqual(counters(self.slot), (0, 0))
+
+    def test_update_fields_only_moves_the_saved_fields(self):
+        booking = Booking.objects.get(pk=self.booking.pk)
+        booking.notes = "window seat"
+        booking.num_adults = 3
+        booking.save(update_fields=["notes"])
+
+        self.assertTrue(booking.has_changed("num_adults"))
+        self.assertEqual(booking.previous("num_adults"), 2)
+
+    def test_deferred_fields_are_loaded_once_before_saving(self):
+        booking = Booking.objects.only("pk", "status").get(pk=self.booking.pk)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(booking.previous("num_adults"), 2)
+            self.assertEqual(booking.previous("num_children"), 0)
+
+    def test_new_instances_count_as_changed(self):
+        booking = Booking(service=self.slot.availability.service, start_date=DAY, **CONTACT)
+
+        self.assertTrue(booking.has_changed("status"))
+        self.assertIsNone(booking.previous("status"))
+
+    def test_in_place_json_edits_are_tracked(self):
+        service = Service.objects.get(pk=self.slot.availability.service_id)
+        service.available_days.append("Monday")
+
+        self.assertTrue(service.has_changed("available_days"))
+        service.save()
+        self.assertEqual(Service.objects.get(pk=service.pk).weekday_mask, 1)
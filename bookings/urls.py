@@ -1,6 +1,7 @@
 from django.urls import path
 from .views import (
     CreateBookingView,
+    CheckoutView,
     GuestBookingDetailView,
     MyBookingsView,
     AllBookingsView,
@@ -8,6 +9,8 @@ from .views import (
     UpdateBookingStatusView,
     MyNotificationsView,
     MarkNotificationReadView,
+    MarkAllNotificationsReadView,
+    UnreadNotificationCountView,
     BookingVerifyView,
 )
 
@@ -18,6 +21,7 @@ urlpatterns = [
     # BOOKINGS
     # -------------------------------
     path("create/", CreateBookingView.as_view(), name="booking-create"),
+    path("checkout/", CheckoutView.as_view(), name="booking-checkout"),
     path("mine/", MyBookingsView.as_view(), name="booking-my-list"),
     path("all/", AllBookingsView.as_view(), name="booking-all"),
     path("<int:booking_id>/status/", UpdateBookingStatusView.as_view(), name="booking-update-status"),
@@ -34,4 +38,6 @@ urlpatterns = [
     # -------------------------------
     path("notifications/", MyNotificationsView.as_view(), name="notifications-list"),
     path("notifications/<int:notif_id>/read/", MarkNotificationReadView.as_view(), name="notification-read"),
+    path("notifications/unread-count/", UnreadNotificationCountView.as_view(), name="notifications-unread-count"),
+    path("notifications/mark-all-read/", MarkAllNotificationsReadView.as_view(), name="notifications-mark-all-read"),
 ]
\ No newline at end of file
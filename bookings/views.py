@@ -1,11 +1,21 @@
+from django.conf import settings
 from django.http import HttpResponse
 
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from allicom_travels.pagination import CreatedAtCursorPagination
+from allicom_travels.conditional import (
+    is_not_modified,
+    make_weak_etag,
+    not_modified_response,
+    set_validators,
+)
+from .checkout import create_checkout
 from .models import Booking, Notification
-from .serializers import BookingSerializer, NotificationSerializer
+from .notifications import mark_read, unread_count
+from .serializers import BookingSerializer, CheckoutSerializer, NotificationSerializer
 
 
 class CreateBookingView(generics.CreateAPIView):
@@ -20,21 +30,79 @@ class CreateBookingView(generics.CreateAPIView):
         serializer.save(user=user)
 
 
+class CheckoutView(APIView):
+    """
+    POST /api/v1/bookings/checkout/
+    Body: {"contact": {...traveler details...}, "items": [{service, package,
+    time_slot_id, start_date, end_date, num_adults, num_children}, ...]}
+
+    Validates and reserves every item in one transaction, creates the
+    bookings together and opens one Transaction covering the total.
+    Answers 503 before reserving anything if no payment link can be built.
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def post(self, request):
+        from payments.models import Transaction  # local import to avoid circular imports
+
+        redirect_url = self.payment_url_template()
+        if redirect_url is None:
+            return Response(
+                {"detail": "Online payment is not available right now."},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+
+        serializer = CheckoutSerializer(data=request.data, context={"request": request})
+        serializer.is_valid(raise_exception=True)
+
+        user = request.user if request.user.is_authenticated else None
+        bookings, txn = create_checkout(
+            serializer.build_bookings(user=user),
+            provider=Transaction.PROVIDER_FLUTTERWAVE,
+        )
+
+        return Response(
+            {
+                "reference": txn.reference,
+                "amount": txn.amount,
+                "payment_url": redirect_url.format(reference=txn.reference),
+                "bookings": BookingSerializer(bookings, many=True).data,
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+    @staticmethod
+    def payment_url_template():
+        """FLW_REDIRECT_URL if it is set and formats with {reference}, else None."""
+        template = settings.FLW_REDIRECT_URL
+        if not template:
+            return None
+        try:
+            template.format(reference="")
+        except (KeyError, IndexError, ValueError):
+            return None
+        return template
+
+
 class MyBookingsView(generics.ListAPIView):
     """
     Shows bookings only for the authenticated user.
     """
     serializer_class = BookingSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
 
     def get_queryset(self):
-        return Booking.objects.filter(user=self.request.user).order_by("-created_at")
+        return Booking.objects.filter(user=self.request.user).select_related(
+            "service", "package", "time_slot"
+        )
 
 
 class AllBookingsView(generics.ListAPIView):
     serializer_class = BookingSerializer
     permission_classes = [permissions.IsAdminUser]
-    queryset = Booking.objects.all().order_by("-created_at")
+    pagination_class = CreatedAtCursorPagination
+    queryset = Booking.objects.select_related("service", "package", "time_slot")
 
 
 class UpdateBookingStatusView(APIView):
@@ -121,12 +189,17 @@ class UpdateBookingStatusView(APIView):
 class MyNotificationsView(generics.ListAPIView):
     """
     Shows notifications for the logged-in user.
+    ?unread=true limits the page to unread ones.
     """
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
 
     def get_queryset(self):
-        return Notification.objects.filter(recipient=self.request.user)
+        qs = Notification.objects.filter(recipient=self.request.user).select_related("recipient")
+        if self.request.query_params.get("unread", "").lower() in ("1", "true", "yes"):
+            qs = qs.filter(is_read=False)
+        return qs
 
 
 class MarkNotificationReadView(APIView):
@@ -136,17 +209,36 @@ class MarkNotificationReadView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request, notif_id):
-        try:
-            notif = Notification.objects.get(id=notif_id, recipient=request.user)
-        except Notification.DoesNotExist:
+        if not Notification.objects.filter(id=notif_id, recipient=request.user).exists():
             return Response({"error": "Not found"}, status=404)
 
-        notif.is_read = True
-        notif.save(update_fields=["is_read"])
+        mark_read(request.user, [notif_id])
 
         return Response({"message": "Notification marked as read"})
 
 
+class UnreadNotificationCountView(APIView):
+    """
+    GET /api/notifications/unread-count/
+    Dashboards poll this: a single primary-key read of the user's counter.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        return Response({"unread": unread_count(request.user)})
+
+
+class MarkAllNotificationsReadView(APIView):
+    """
+    POST /api/notifications/mark-all-read/
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        updated = mark_read(request.user)
+        return Response({"message": "Notifications marked as read", "updated": updated})
+
+
 class GuestBookingDetailView(generics.RetrieveAPIView):
     """
     Allows a guest (non-authenticated user) to retrieve
@@ -172,6 +264,7 @@ class OperatorBookingsView(generics.ListAPIView):
     """
     serializer_class = BookingSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
 
     def get_queryset(self):
         user = self.request.user
@@ -179,7 +272,9 @@ class OperatorBookingsView(generics.ListAPIView):
         if getattr(user, "role", None) != "operator":
             return Booking.objects.none()
 
-        return Booking.objects.filter(service__operator=user).order_by("-created_at")
+        return Booking.objects.filter(service__operator=user).select_related(
+            "service", "package", "time_slot"
+        )
 
 
 class BookingVerifyView(APIView):
@@ -206,6 +301,25 @@ class BookingVerifyView(APIView):
                 status_code=status.HTTP_404_NOT_FOUND,
             )
 
+        wants_json = (
+            request.query_params.get("format") == "json"
+            or "application/json" in request.headers.get("Accept", "")
+        )
+
+        etag = None
+        if wants_json:
+            payment = getattr(booking, "payment", None)
+            etag = make_weak_etag(
+                "booking-verify",
+                booking.id,
+                booking.updated_at.timestamp(),
+                booking.package_id,
+                getattr(payment, "reference", None),
+                getattr(payment, "paid_at", None),
+            )
+            if is_not_modified(request, etag):
+                return not_modified_response(etag)
+
         reasons = []
 
         if booking.status == Booking.STATUS_CANCELLED:
@@ -239,13 +353,8 @@ class BookingVerifyView(APIView):
             "reason": None if is_valid else " ".join(reasons),
         }
 
-        wants_json = (
-            request.query_params.get("format") == "json"
-            or "application/json" in request.headers.get("Accept", "")
-        )
-
         if wants_json:
-            return Response(payload, status=status.HTTP_200_OK)
+            return set_validators(Response(payload, status=status.HTTP_200_OK), etag)
 
         return self._render_html(payload)
 
@@ -3,4 +3,8 @@ from django.apps import AppConfig
 
 class DestinationsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
-    name = "destinations"
\ No newline at end of file
+    name = "destinations"
+
+    def ready(self):
+        # Ensures signals are registered
+        import destinations.signals  # noqa: F401
@@ -0,0 +1,10 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from services.cache import bump_catalog_version
+from .models import Destination
+
+
+@receiver([post_save, post_delete], sender=Destination)
+def destination_changed(sender, instance, **kwargs):
+    bump_catalog_version()
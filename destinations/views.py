@@ -1,6 +1,7 @@
 from rest_framework import generics, permissions
 from .models import Destination
 from .serializers import DestinationSerializer
+from services.cache import cache_catalog_response
 
 
 class DestinationListView(generics.ListAPIView):
@@ -10,5 +11,9 @@ class DestinationListView(generics.ListAPIView):
     serializer_class = DestinationSerializer
     permission_classes = [permissions.AllowAny]
 
+    @cache_catalog_response("destination-list")
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
     def get_queryset(self):
         return Destination.objects.filter(is_active=True).order_by("sort_order", "country", "city")
\ No newline at end of file
@@ -1,8 +1,11 @@
 from django.contrib import admin
+from django.utils import timezone
 from django.utils.html import format_html
 from django.urls import reverse
 
-from .models import Transaction, Payment
+from .bank_statements import approve_statement_line
+from .events import latest_event
+from .models import BankStatementLine, LedgerRollup, Transaction, Payment, TransactionEvent, WebhookEvent
 from .services import retry_gateway_verification
 
 
@@ -21,7 +24,7 @@ class TransactionAdmin(admin.ModelAdmin):
     )
     list_filter = ("provider", "status", "created_at")
     search_fields = ("reference", "booking__id", "flutterwave_id")
-    readonly_fields = ("created_at", "updated_at", "meta_pretty")
+    readonly_fields = ("created_at", "updated_at", "last_verification", "recent_events", "meta_pretty")
     actions = ["mark_success", "retry_verification"]
 
     # ---------------------------
@@ -45,6 +48,33 @@ class TransactionAdmin(admin.ModelAdmin):
         )
     meta_pretty.short_description = "Metadata"
 
+    # ---------------------------
+    # LAST GATEWAY VERIFICATION
+    # ---------------------------
+    def last_verification(self, obj):
+        event = latest_event(obj, TransactionEvent.KIND_VERIFY)
+        if event is None:
+            return "(never)"
+        return f"{event.created_at:%Y-%m-%d %H:%M:%S}  {event.status or '-'}"
+    last_verification.short_description = "Last verification"
+
+    # ---------------------------
+    # EVENT HISTORY (LATEST FIRST)
+    # ---------------------------
+    RECENT_EVENTS = 20
+
+    def recent_events(self, obj):
+        events = list(obj.events.order_by("-id")[: self.RECENT_EVENTS])
+        if not events:
+            return "(none)"
+        import json
+        rows = "\n".join(
+            f"{e.created_at:%Y-%m-%d %H:%M:%S}  {e.kind:<8} {e.status:<12} {json.dumps(e.payload)}"
+            for e in events
+        )
+        return format_html("<pre style='white-space:pre-wrap'>{}</pre>", rows)
+    recent_events.short_description = f"Events (latest {RECENT_EVENTS})"
+
     # ---------------------------
     # BULK ACTIONS
     # ---------------------------
@@ -96,3 +126,73 @@ class PaymentAdmin(admin.ModelAdmin):
         url = reverse("admin:bookings_booking_change", args=[obj.booking.id])
         return format_html(f"<a href='{url}'>Booking #{obj.booking.id}</a>")
     booking_link.short_description = "Booking"
+
+
+# =====================================================================
+# WEBHOOK INBOX ADMIN
+# =====================================================================
+@admin.register(WebhookEvent)
+class WebhookEventAdmin(admin.ModelAdmin):
+    list_display = ("id", "provider", "event_type", "reference", "status", "attempts", "received_at", "processed_at")
+    list_filter = ("provider", "status", "event_type")
+    search_fields = ("reference", "event_id")
+    readonly_fields = ("received_at", "processed_at")
+    actions = ["retry_now"]
+
+    @admin.action(description="Re-queue selected events for processing")
+    def retry_now(self, request, queryset):
+        updated = queryset.exclude(status=WebhookEvent.STATUS_PROCESSED).update(
+            status=WebhookEvent.STATUS_PENDING,
+            next_attempt_at=timezone.now(),
+        )
+        self.message_user(request, f"{updated} event(s) re-queued.")
+
+
+# =====================================================================
+# BANK STATEMENT REVIEW QUEUE
+# =====================================================================
+@admin.register(BankStatementLine)
+class BankStatementLineAdmin(admin.ModelAdmin):
+    list_display = ("posted_on", "amount", "narration", "bank_reference", "status", "transaction", "match_reason")
+    list_filter = ("status", "posted_on", "source")
+    search_fields = ("narration", "bank_reference", "transaction__reference")
+    readonly_fields = ("fingerprint", "source", "imported_at", "resolved_at")
+    raw_id_fields = ("transaction",)
+    list_select_related = ("transaction",)
+    actions = ["approve_match", "ignore_lines"]
+
+    @admin.action(description="Approve suggested transfer (mark SUCCESS)")
+    def approve_match(self, request, queryset):
+        for line in queryset.filter(status=BankStatementLine.STATUS_REVIEW).select_related("transaction"):
+            try:
+                approve_statement_line(line)
+                self.message_user(request, f"{line.transaction.reference}: Marked as successful.")
+            except Exception as e:
+                self.message_user(request, f"Line #{line.id}: {e}", level="error")
+
+    @admin.action(description="Ignore selected lines")
+    def ignore_lines(self, request, queryset):
+        updated = queryset.exclude(status=BankStatementLine.STATUS_MATCHED).update(
+            status=BankStatementLine.STATUS_IGNORED,
+            resolved_at=timezone.now(),
+        )
+        self.message_user(request, f"{updated} line(s) ignored.")
+
+
+# =====================================================================
+# LEDGER ROLLUPS (READ-ONLY; maintained by signals / rebuild_ledger)
+# =====================================================================
+@admin.register(LedgerRollup)
+class LedgerRollupAdmin(admin.ModelAdmin):
+    list_display = ("day", "provider", "status", "currency", "count", "amount", "updated_at")
+    list_filter = ("provider", "status", "currency")
+    date_hierarchy = "day"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
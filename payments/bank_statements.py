@@ -0,0 +1,257 @@
+import csv
+import difflib
+import hashlib
+import logging
+import re
+from collections import Counter
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import BankStatementLine, Transaction
+
+logger = logging.getLogger("payments")
+
+# References issued by initiate_bank_transfer: BANK- + 10 hex chars. Customers
+# type them into transfer narrations as "BANK-1A2B..", "BANK 1a2b.." or
+# "BANK1A2B..".
+REFERENCE_RE = re.compile(r"\bBANK[\s\-_]?([0-9A-F]{10})\b", re.IGNORECASE)
+# Looser shape used to spot mistyped references for review
+REFERENCE_LIKE_RE = re.compile(r"\bBANK[\s\-_]?([0-9A-Z]{8,12})\b", re.IGNORECASE)
+FUZZY_CUTOFF = 0.85
+
+CSV_COLUMNS = {
+    "posted_on": ("date", "transaction date", "trans date", "posted date", "posting date", "value date"),
+    "amount": ("amount", "credit", "credit amount", "deposit", "deposits", "cr"),
+    "narration": ("narration", "description", "details", "remarks", "memo", "particulars"),
+    "bank_reference": ("reference", "ref", "ref no", "reference number", "transaction reference", "fitid"),
+}
+DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%d-%b-%Y", "%d %b %Y", "%d/%m/%y", "%Y%m%d")
+
+
+# ---------------------------------------------------
+# PARSING (STREAMED)
+# ---------------------------------------------------
+def _parse_amount(value):
+    value = re.sub(r"[^\d.\-]", "", str(value or ""))
+    if not value:
+        return None
+    try:
+        return Decimal(value).quantize(Decimal("0.01"))
+    except InvalidOperation:
+        return None
+
+
+def _parse_date(value):
+    value = str(value or "").strip()
+    # Tolerate a trailing time ("2026-10-17 14:02:11")
+    for candidate in dict.fromkeys([value, value.split(" ")[0], value[:11].strip()]):
+        for fmt in DATE_FORMATS:
+            try:
+                return datetime.strptime(candidate, fmt).date()
+            except ValueError:
+                continue
+    return None
+
+
+def iter_csv_entries(fileobj):
+    """
+    Yield one dict per row of a CSV statement with a header row. Column
+    names are matched loosely (see CSV_COLUMNS).
+    """
+    reader = csv.DictReader(fileobj)
+    headers = {(name or "").strip().lower(): name for name in reader.fieldnames or []}
+    columns = {}
+    for field, aliases in CSV_COLUMNS.items():
+        columns[field] = next((headers[alias] for alias in aliases if alias in headers), None)
+    if not columns["posted_on"] or not columns["amount"]:
+        raise ValueError(f"CSV statement needs a date and an amount/credit column, got {reader.fieldnames}")
+
+    for row in reader:
+        yield {
+            "posted_on": _parse_date(row.get(columns["posted_on"])),
+            "amount": _parse_amount(row.get(columns["amount"])),
+            "narration": (row.get(columns["narration"]) or "").strip() if columns["narration"] else "",
+            "bank_reference": (row.get(columns["bank_reference"]) or "").strip() if columns["bank_reference"] else "",
+        }
+
+
+OFX_TAG_RE = re.compile(r"<(/?)([A-Z0-9.]+)>([^<\r\n]*)", re.IGNORECASE)
+
+
+def iter_ofx_entries(fileobj):
+    """
+    Yield one dict per <STMTTRN> of an OFX statement, line by line; works
+    for both SGML (unclosed tags) and XML OFX.
+    """
+    current = None
+    for line in fileobj:
+        for closing, tag, value in OFX_TAG_RE.findall(line):
+            tag = tag.upper()
+            if tag == "STMTTRN":
+                if closing and current is not None:
+                    name = " ".join(filter(None, [current.get("NAME"), current.get("MEMO")]))
+                    yield {
+                        "posted_on": _parse_date(current.get("DTPOSTED", "")[:8]),
+                        "amount": _parse_amount(current.get("TRNAMT")),
+                        "narration": name,
+                        "bank_reference": current.get("FITID", ""),
+                    }
+                    current = None
+                elif not closing:
+                    current = {}
+            elif current is not None and not closing:
+                current[tag] = value.strip()
+
+
+def iter_statement_entries(fileobj, fmt):
+    if fmt == "ofx":
+        return iter_ofx_entries(fileobj)
+    return iter_csv_entries(fileobj)
+
+
+def with_fingerprints(entries, source=""):
+    """
+    Add a fingerprint to each entry. Identical rows within a statement are
+    told apart by their occurrence number, so re-importing the same (or an
+    overlapping) statement recognises lines already stored.
+    """
+    seen = Counter()
+    for entry in entries:
+        key = f"{entry['posted_on']}|{entry['amount']}|{entry['bank_reference']}|{entry['narration']}"
+        seen[key] += 1
+        entry["fingerprint"] = hashlib.sha256(f"{key}|{seen[key]}".encode()).hexdigest()
+        entry["source"] = source[:255]
+        yield entry
+
+
+# ---------------------------------------------------
+# MATCHING
+# ---------------------------------------------------
+class PendingTransferIndex:
+    """
+    In-memory index of pending bank transfers by reference and by amount,
+    loaded with one query.
+    """
+
+    def __init__(self):
+        self.by_reference = {}
+        self.by_amount = {}
+        self.settled = {}
+        pending = Transaction.objects.filter(
+            provider=Transaction.PROVIDER_BANK,
+            status=Transaction.STATUS_PENDING,
+        ).defer("meta")
+        for txn in pending.iterator(chunk_size=2000):
+            self.by_reference[txn.reference.upper()] = txn
+            self.by_amount.setdefault(txn.amount, []).append(txn)
+
+    def __len__(self):
+        return len(self.by_reference)
+
+    def settle(self, txn):
+        """Take a matched transfer out of the index so it matches only once."""
+        self.settled[txn.reference.upper()] = self.by_reference.pop(txn.reference.upper(), txn)
+        same_amount = self.by_amount.get(txn.amount, [])
+        if txn in same_amount:
+            same_amount.remove(txn)
+
+    def match(self, entry):
+        """
+        Returns (status, transaction or None, reason) for a credit line.
+        """
+        text = f"{entry['bank_reference']} {entry['narration']}"
+        amount = entry["amount"]
+
+        for code in REFERENCE_RE.findall(text):
+            reference = f"BANK-{code.upper()}"
+            txn = self.by_reference.get(reference)
+            if txn is None and reference in self.settled:
+                return BankStatementLine.STATUS_REVIEW, self.settled[reference], "Transfer already matched in this import"
+            if txn is None:
+                settled = Transaction.objects.filter(reference__iexact=reference).first()
+                if settled is not None:
+                    return BankStatementLine.STATUS_REVIEW, settled, f"{reference} is {settled.status}, not pending"
+                continue
+            if amount == txn.amount:
+                return BankStatementLine.STATUS_MATCHED, txn, "Reference and amount"
+            return BankStatementLine.STATUS_REVIEW, txn, f"Reference matches but amount {amount} != {txn.amount}"
+
+        for code in REFERENCE_LIKE_RE.findall(text):
+            close = difflib.get_close_matches(f"BANK-{code.upper()}", self.by_reference, n=1, cutoff=FUZZY_CUTOFF)
+            if close:
+                txn = self.by_reference[close[0]]
+                return BankStatementLine.STATUS_REVIEW, txn, f"Reference resembles {txn.reference}"
+
+        candidates = self.by_amount.get(amount, [])
+        if len(candidates) == 1:
+            return BankStatementLine.STATUS_REVIEW, candidates[0], "Amount only"
+        if candidates:
+            return BankStatementLine.STATUS_REVIEW, None, f"Amount matches {len(candidates)} pending transfers"
+        return BankStatementLine.STATUS_UNMATCHED, None, ""
+
+
+def import_statement_batch(entries, index, dry_run=False):
+    """
+    Match a batch of parsed credit entries, settle exact matches with
+    mark_successful and store every new line. Entries already imported
+    (same fingerprint) are skipped. Returns a Counter of line statuses plus
+    "duplicate".
+    """
+    stats = Counter()
+    existing = set(
+        BankStatementLine.objects.filter(
+            fingerprint__in=[entry["fingerprint"] for entry in entries]
+        ).values_list("fingerprint", flat=True)
+    )
+
+    lines = []
+    for entry in entries:
+        if entry["fingerprint"] in existing:
+            stats["duplicate"] += 1
+            continue
+        status, txn, reason = index.match(entry)
+        if status == BankStatementLine.STATUS_MATCHED:
+            index.settle(txn)
+        lines.append(BankStatementLine(status=status, transaction=txn, match_reason=reason[:255], **entry))
+
+    if dry_run:
+        stats.update(line.status for line in lines)
+        return stats
+
+    now = timezone.now()
+    with transaction.atomic():
+        for line in lines:
+            if line.status != BankStatementLine.STATUS_MATCHED:
+                continue
+            try:
+                with transaction.atomic():
+                    line.transaction.mark_successful()
+                line.resolved_at = now
+            except Exception as exc:
+                logger.exception(f"[Bank Statement] Failed to settle {line.transaction.reference}: {exc}")
+                line.status = BankStatementLine.STATUS_REVIEW
+                line.match_reason = f"Settling failed: {exc}"[:255]
+        BankStatementLine.objects.bulk_create(lines)
+
+    stats.update(line.status for line in lines)
+    return stats
+
+
+def approve_statement_line(line):
+    """
+    Admin confirmation of a REVIEW line: settle its suggested transfer.
+    """
+    txn = line.transaction
+    if txn is None or txn.provider != Transaction.PROVIDER_BANK:
+        raise ValueError("No bank transfer suggested for this line")
+    if txn.status != Transaction.STATUS_PENDING:
+        raise ValueError(f"{txn.reference} is {txn.status}, not pending")
+
+    with transaction.atomic():
+        txn.mark_successful()
+        line.status = BankStatementLine.STATUS_MATCHED
+        line.resolved_at = timezone.now()
+        line.save(update_fields=["status", "resolved_at"])
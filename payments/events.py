@@ -0,0 +1,50 @@
+from .models import TransactionEvent
+
+# Fields of a Flutterwave transaction worth keeping; the rest (card, customer,
+# meta, device fingerprint...) is dropped from stored payloads.
+FLUTTERWAVE_FIELDS = (
+    "id",
+    "tx_ref",
+    "flw_ref",
+    "status",
+    "amount",
+    "charged_amount",
+    "currency",
+    "payment_type",
+    "processor_response",
+    "created_at",
+)
+
+
+def compact_flutterwave_response(data):
+    """
+    Keep the envelope status/message and the reconciliation fields of a
+    Flutterwave response or webhook payload.
+    """
+    data = data or {}
+    body = data.get("data") or {}
+    compact = {key: data[key] for key in ("status", "message", "event") if data.get(key) is not None}
+    compact["data"] = {key: body[key] for key in FLUTTERWAVE_FIELDS if body.get(key) is not None}
+    return compact
+
+
+def build_event(txn, kind, status="", payload=None, created_at=None):
+    """
+    Unsaved event, for callers that bulk_create a batch of them.
+    """
+    event = TransactionEvent(transaction=txn, kind=kind, status=(status or "")[:50], payload=payload or {})
+    if created_at:
+        event.created_at = created_at
+    return event
+
+
+def latest_event(txn, kind):
+    """
+    Most recent event of `kind` for a transaction: one index seek on
+    (transaction, kind, id).
+    """
+    return (
+        TransactionEvent.objects.filter(transaction_id=getattr(txn, "pk", txn), kind=kind)
+        .order_by("-id")
+        .first()
+    )
@@ -0,0 +1,250 @@
+import logging
+import random
+import threading
+import time
+from collections import deque
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+
+logger = logging.getLogger("payments")
+
+
+class GatewayError(Exception):
+    """The gateway answered with something we cannot use."""
+
+
+class GatewayUnavailable(GatewayError):
+    """The gateway is unreachable, failing, or the circuit breaker is open."""
+
+
+# ---------------------------------------------------------
+# CIRCUIT BREAKER
+# ---------------------------------------------------------
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive failures and rejects calls for
+    `cooldown` seconds; then lets one probe through (half-open) and closes
+    again on success.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, threshold=5, cooldown=30, clock=time.monotonic):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return self.CLOSED
+        if self.clock() - self.opened_at >= self.cooldown:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    @property
+    def is_open(self):
+        return self.state == self.OPEN
+
+    def allow(self):
+        with self._lock:
+            state = self.state
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._probing or self.failures >= self.threshold:
+                if self.opened_at is None or self._probing:
+                    logger.error(f"[Gateway] Circuit open after {self.failures} consecutive failure(s)")
+                self.opened_at = self.clock()
+            self._probing = False
+
+
+# ---------------------------------------------------------
+# LATENCY STATS
+# ---------------------------------------------------------
+class LatencyStats:
+    """
+    Call/failure counters plus percentiles over the most recent calls.
+    """
+
+    def __init__(self, window=500):
+        self.calls = 0
+        self.failures = 0
+        self._recent = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, elapsed_ms, ok):
+        with self._lock:
+            self.calls += 1
+            if not ok:
+                self.failures += 1
+            self._recent.append(elapsed_ms)
+
+    def snapshot(self):
+        with self._lock:
+            recent = sorted(self._recent)
+            calls, failures = self.calls, self.failures
+
+        def percentile(p):
+            if not recent:
+                return 0.0
+            return round(recent[min(int(len(recent) * p), len(recent) - 1)], 1)
+
+        return {
+            "calls": calls,
+            "failures": failures,
+            "avg_ms": round(sum(recent) / len(recent), 1) if recent else 0.0,
+            "p50_ms": percentile(0.50),
+            "p95_ms": percentile(0.95),
+            "max_ms": round(recent[-1], 1) if recent else 0.0,
+        }
+
+
+# ---------------------------------------------------------
+# FLUTTERWAVE CLIENT
+# ---------------------------------------------------------
+class FlutterwaveClient:
+    """
+    Flutterwave v3 API client: one pooled keep-alive session (safe to share
+    between threads), connect/read timeouts on every call, bounded retries
+    with jittered exponential backoff for network errors and 429/5xx, and
+    a circuit breaker that fails fast while the provider is degraded.
+    Defaults come from the FLW_* settings; base_url can point at a stub.
+    """
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(
+        self,
+        base_url=None,
+        secret_key=None,
+        connect_timeout=None,
+        read_timeout=None,
+        max_retries=None,
+        pool_size=None,
+        breaker=None,
+        backoff=0.25,
+    ):
+        self.base_url = (base_url or settings.FLW_API_BASE_URL).rstrip("/")
+        self.secret_key = secret_key if secret_key is not None else settings.FLW_SECRET_KEY
+        self.timeout = (
+            connect_timeout if connect_timeout is not None else settings.FLW_CONNECT_TIMEOUT,
+            read_timeout if read_timeout is not None else settings.FLW_READ_TIMEOUT,
+        )
+        self.max_retries = max_retries if max_retries is not None else settings.FLW_MAX_RETRIES
+        self.backoff = backoff
+        self.breaker = breaker or CircuitBreaker(
+            threshold=settings.FLW_BREAKER_THRESHOLD,
+            cooldown=settings.FLW_BREAKER_COOLDOWN,
+        )
+        self.latency = LatencyStats()
+
+        pool_size = pool_size or settings.FLW_POOL_SIZE
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "Authorization": f"Bearer {self.secret_key}",
+            "Content-Type": "application/json",
+        })
+
+    def get(self, path, params=None):
+        """
+        GET `path` and return the parsed JSON body. 4xx answers are returned
+        as-is (Flutterwave reports "not found" that way); raises
+        GatewayUnavailable once retries are exhausted or the breaker is open.
+        """
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        attempt = 0
+
+        while True:
+            if not self.breaker.allow():
+                raise GatewayUnavailable(f"Flutterwave circuit open; skipped GET {path}")
+
+            started = time.monotonic()
+            error = None
+            try:
+                resp = self.session.get(url, params=params, timeout=self.timeout)
+                if resp.status_code in self.RETRY_STATUSES:
+                    error = f"HTTP {resp.status_code}"
+            except Exception as exc:
+                error = f"{exc.__class__.__name__}: {exc}"
+
+            elapsed_ms = (time.monotonic() - started) * 1000
+            self.latency.record(elapsed_ms, ok=error is None)
+            logger.debug(f"[Gateway] GET {path} {error or resp.status_code} in {elapsed_ms:.0f}ms")
+
+            if error is None:
+                self.breaker.record_success()
+                try:
+                    return resp.json()
+                except ValueError:
+                    raise GatewayError(f"Non-JSON response from GET {path} (HTTP {resp.status_code})")
+
+            self.breaker.record_failure()
+            if attempt >= self.max_retries:
+                raise GatewayUnavailable(f"GET {path} failed after {attempt + 1} attempt(s): {error}")
+
+            delay = self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5)
+            logger.warning(f"[Gateway] GET {path} failed ({error}); retrying in {delay:.2f}s")
+            time.sleep(delay)
+            attempt += 1
+
+    def verify(self, flutterwave_id):
+        return self.get(f"transactions/{flutterwave_id}/verify")
+
+    def verify_by_reference(self, tx_ref):
+        return self.get("transactions/verify_by_reference", params={"tx_ref": tx_ref})
+
+    def list_transactions(self, from_date, to_date, page=1, status=None):
+        """
+        One page of the account's transactions created between two dates
+        (inclusive); meta.page_info carries total_pages.
+        """
+        params = {"from": str(from_date), "to": str(to_date), "page": page}
+        if status:
+            params["status"] = status
+        return self.get("transactions", params=params)
+
+    def stats(self):
+        return {"circuit": self.breaker.state, **self.latency.snapshot()}
+
+    def close(self):
+        self.session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_flutterwave_client():
+    """
+    Process-wide client, so request handlers share one connection pool and
+    one breaker.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = FlutterwaveClient()
+    return _client
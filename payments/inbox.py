@@ -0,0 +1,142 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .events import build_event, compact_flutterwave_response
+from .models import Transaction, TransactionEvent, WebhookEvent
+from .services import (
+    OUTCOME_ERROR,
+    apply_flutterwave_outcome,
+    fetch_flutterwave_verification,
+    flutterwave_outcome,
+    record_flutterwave_verification,
+)
+
+logger = logging.getLogger("payments")
+
+# A claimed row is invisible to other workers for this long; if the worker
+# dies mid-batch the row simply becomes due again.
+CLAIM_LEASE = timedelta(minutes=5)
+
+MAX_ATTEMPTS = 8
+RETRY_BASE = timedelta(seconds=30)
+RETRY_MAX = timedelta(hours=1)
+
+
+def claim_webhook_events(batch_size=100, now=None):
+    """
+    Lease up to batch_size due inbox rows to this worker and return them.
+    """
+    now = now or timezone.now()
+    lock = {"skip_locked": True} if connection.features.has_select_for_update_skip_locked else {}
+
+    with transaction.atomic():
+        events = list(
+            WebhookEvent.objects.select_for_update(**lock)
+            .filter(status=WebhookEvent.STATUS_PENDING, next_attempt_at__lte=now)
+            .order_by("next_attempt_at", "pk")[:batch_size]
+        )
+        if events:
+            WebhookEvent.objects.filter(pk__in=[e.pk for e in events]).update(
+                next_attempt_at=now + CLAIM_LEASE
+            )
+    return events
+
+
+def _close(events, status, result, now):
+    for event in events:
+        event.status = status
+        event.result = result[:255]
+        event.processed_at = now
+
+
+def _retry(events, result, now):
+    for event in events:
+        event.attempts += 1
+        event.result = result[:255]
+        if event.attempts >= MAX_ATTEMPTS:
+            event.status = WebhookEvent.STATUS_FAILED
+            event.processed_at = now
+        else:
+            event.next_attempt_at = now + min(RETRY_BASE * (2 ** (event.attempts - 1)), RETRY_MAX)
+
+
+def process_webhook_events(events, client=None, workers=4):
+    """
+    Apply a claimed batch. Deliveries are coalesced per tx_ref, so a burst
+    of retries for one charge costs one verify call; verify calls run on a
+    thread pool while this thread does every database write.
+    Returns a dict of counts: processed, coalesced, retrying, failed.
+    """
+    now = timezone.now()
+    stats = {"processed": 0, "coalesced": 0, "retrying": 0, "failed": 0}
+
+    by_reference = {}
+    for event in events:
+        by_reference.setdefault(event.reference, []).append(event)
+    stats["coalesced"] = len(events) - len(by_reference)
+
+    transactions = Transaction.objects.in_bulk(list(by_reference), field_name="reference")
+
+    history = [
+        build_event(
+            transactions[event.reference],
+            TransactionEvent.KIND_WEBHOOK,
+            status=((event.payload or {}).get("data") or {}).get("status") or "",
+            payload={"inbox_id": event.pk, **compact_flutterwave_response(event.payload)},
+            created_at=event.received_at,
+        )
+        for event in events
+        if event.attempts == 0 and event.reference in transactions
+    ]
+
+    to_verify = []
+    for reference, group in by_reference.items():
+        txn = transactions.get(reference)
+        if txn is None:
+            logger.error(f"[Webhook Inbox] Unknown transaction reference: {reference}")
+            _close(group, WebhookEvent.STATUS_FAILED, "Unknown transaction", now)
+        elif txn.status == Transaction.STATUS_SUCCESS:
+            _close(group, WebhookEvent.STATUS_PROCESSED, "Already processed", now)
+        else:
+            # Payload contents are never trusted: verify with the gateway
+            to_verify.append((txn, group))
+
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+        responses = list(pool.map(lambda item: fetch_flutterwave_verification(item[0], client), to_verify))
+
+    for (txn, group), data in zip(to_verify, responses):
+        outcome = flutterwave_outcome(txn, data)
+        if outcome == OUTCOME_ERROR:
+            _retry(group, "Verification unavailable", now)
+            continue
+
+        try:
+            had_id = txn.flutterwave_id
+            history.append(record_flutterwave_verification(txn, data, now=now))
+            if txn.flutterwave_id != had_id:
+                txn.save(update_fields=["flutterwave_id"])
+            apply_flutterwave_outcome(txn, outcome)
+        except Exception as exc:
+            logger.exception(f"[Webhook Inbox] Failed to apply {txn.reference}: {exc}")
+            _retry(group, f"{exc.__class__.__name__}: {exc}", now)
+            continue
+        _close(group, WebhookEvent.STATUS_PROCESSED, f"Verified: {outcome}", now)
+
+    WebhookEvent.objects.bulk_update(
+        events,
+        ["status", "attempts", "next_attempt_at", "result", "processed_at"],
+    )
+    TransactionEvent.objects.bulk_create(history)
+
+    for event in events:
+        if event.status == WebhookEvent.STATUS_PROCESSED:
+            stats["processed"] += 1
+        elif event.status == WebhookEvent.STATUS_FAILED:
+            stats["failed"] += 1
+        else:
+            stats["retrying"] += 1
+    return stats
@@ -0,0 +1,141 @@
+import logging
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import LedgerRollup, Transaction
+
+logger = logging.getLogger("payments")
+
+# Days aggregated per rebuild query/transaction
+REBUILD_CHUNK_DAYS = 31
+
+
+def _currency():
+    return getattr(settings, "PAYMENT_CURRENCY", "NGN")
+
+
+def ledger_day(txn):
+    created_at = txn.created_at or timezone.now()
+    if timezone.is_aware(created_at):
+        return timezone.localdate(created_at)
+    return created_at.date()
+
+
+# ---------------------------------------------------
+# INCREMENTAL UPDATES
+# ---------------------------------------------------
+def _bump(day, provider, status, count, amount):
+    """
+    Add count/amount to one rollup row with a single UPDATE; the row is
+    created on first use.
+    """
+    key = {"day": day, "provider": provider, "status": status, "currency": _currency()}
+    changes = {
+        "count": F("count") + count,
+        "amount": F("amount") + amount,
+        "updated_at": timezone.now(),
+    }
+    if LedgerRollup.objects.filter(**key).update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            LedgerRollup.objects.create(count=count, amount=amount, **key)
+    except IntegrityError:
+        # Another writer created the row first
+        LedgerRollup.objects.filter(**key).update(**changes)
+
+
+def record_transaction_change(txn, created):
+    """
+    Move a transaction between rollup buckets after it is created, changes
+    status or changes amount. Runs inside the caller's database transaction,
+    so the rollup commits or rolls back with the change itself.
+    """
+    day = ledger_day(txn)
+    amount = Decimal(txn.amount or 0)
+
+    if created:
+        _bump(day, txn.provider, txn.status, 1, amount)
+        return
+    if not txn.has_changed("status", "amount"):
+        return
+
+    _bump(day, txn.provider, txn.previous("status"), -1, -Decimal(txn.previous("amount") or 0))
+    _bump(day, txn.provider, txn.status, 1, amount)
+
+
+def record_transaction_removal(txn):
+    _bump(ledger_day(txn), txn.provider, txn.status, -1, -Decimal(txn.amount or 0))
+
+
+# ---------------------------------------------------
+# BACKFILL / REPAIR
+# ---------------------------------------------------
+def rebuild_ledger(from_date, to_date):
+    """
+    Recompute the rollup rows for [from_date, to_date] from Transaction,
+    one chunk of days per query and database transaction. Returns the
+    number of rows written.
+    """
+    written = 0
+    start = from_date
+    while start <= to_date:
+        end = min(start + timedelta(days=REBUILD_CHUNK_DAYS - 1), to_date)
+        totals = (
+            Transaction.objects.annotate(day=TruncDate("created_at"))
+            .filter(day__gte=start, day__lte=end)
+            .values("day", "provider", "status")
+            .annotate(count=Count("id"), total=Sum("amount"))
+            .order_by()
+        )
+        rows = [
+            LedgerRollup(
+                day=row["day"],
+                provider=row["provider"],
+                status=row["status"],
+                currency=_currency(),
+                count=row["count"],
+                amount=row["total"] or 0,
+            )
+            for row in totals
+        ]
+        with transaction.atomic():
+            LedgerRollup.objects.filter(day__gte=start, day__lte=end).delete()
+            LedgerRollup.objects.bulk_create(rows)
+        written += len(rows)
+        start = end + timedelta(days=1)
+    return written
+
+
+# ---------------------------------------------------
+# REPORTING
+# ---------------------------------------------------
+def ledger_report(from_date, to_date, provider=None, status=None):
+    """
+    Rollup rows in a date range plus totals per (provider, status,
+    currency); reads only LedgerRollup.
+    """
+    rows = LedgerRollup.objects.filter(day__gte=from_date, day__lte=to_date)
+    if provider:
+        rows = rows.filter(provider=provider)
+    if status:
+        rows = rows.filter(status=status)
+
+    days = list(
+        rows.filter(count__gt=0)
+        .order_by("day", "provider", "status")
+        .values("day", "provider", "status", "currency", "count", "amount")
+    )
+    totals = list(
+        rows.values("provider", "status", "currency")
+        .annotate(count=Sum("count"), amount=Sum("amount"))
+        .filter(count__gt=0)
+        .order_by("provider", "status")
+    )
+    return {"days": days, "totals": totals}
@@ -0,0 +1,61 @@
+from datetime import date, timedelta
+
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .ledger import ledger_report
+
+
+class LedgerReportView(APIView):
+    """
+    GET /api/v1/payments/ledger/?from=YYYY-MM-DD&to=YYYY-MM-DD&provider=&status=
+    Admin-only daily totals by provider and status, read from the ledger
+    rollups (see `manage.py rebuild_ledger`).
+    """
+    permission_classes = [IsAdminUser]
+
+    DEFAULT_WINDOW_DAYS = 30
+    MAX_WINDOW_DAYS = 366
+
+    def get(self, request):
+        try:
+            date_from, date_to = self._parse_window(request)
+        except ValueError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        report = ledger_report(
+            date_from,
+            date_to,
+            provider=request.query_params.get("provider"),
+            status=request.query_params.get("status"),
+        )
+        return Response({
+            "range": {"from": date_from.isoformat(), "to": date_to.isoformat()},
+            **report,
+        })
+
+    def _parse_window(self, request):
+        date_to = self._parse_date(request.query_params.get("to"), "to") or timezone.localdate()
+        date_from = self._parse_date(request.query_params.get("from"), "from") or (
+            date_to - timedelta(days=self.DEFAULT_WINDOW_DAYS - 1)
+        )
+
+        if date_to < date_from:
+            raise ValueError("'to' cannot be before 'from'.")
+
+        if (date_to - date_from).days >= self.MAX_WINDOW_DAYS:
+            raise ValueError(f"Ledger window cannot exceed {self.MAX_WINDOW_DAYS} days.")
+
+        return date_from, date_to
+
+    @staticmethod
+    def _parse_date(value, name):
+        if not value:
+            return None
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            raise ValueError(f"Invalid '{name}' date. Use YYYY-MM-DD.")
@@ -0,0 +1,123 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from payments.events import build_event, compact_flutterwave_response
+from payments.models import Transaction, TransactionEvent
+
+# Gateway chatter that ages out; status changes are kept for good
+PRUNABLE_KINDS = [TransactionEvent.KIND_VERIFY, TransactionEvent.KIND_WEBHOOK]
+
+# Keys the old code accumulated in Transaction.meta
+LEGACY_META_KEYS = {
+    "last_fw_verify": TransactionEvent.KIND_VERIFY,
+    "flutterwave_webhook": TransactionEvent.KIND_WEBHOOK,
+    "webhook": TransactionEvent.KIND_WEBHOOK,
+}
+
+
+class Command(BaseCommand):
+    help = "Prune old gateway events (keeping the latest per kind) and move legacy meta blobs into events"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--keep-days",
+            type=int,
+            default=90,
+            help="Prune verify/webhook events older than this (default: 90).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Rows deleted or rewritten per query (default: 1000).",
+        )
+        parser.add_argument(
+            "--legacy-meta",
+            action="store_true",
+            help="Also move verify/webhook payloads out of Transaction.meta into events.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report what would change without writing.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(options["batch_size"], 1)
+        dry_run = options["dry_run"]
+
+        if options["legacy_meta"]:
+            moved = self._move_legacy_meta(batch_size, dry_run)
+            self.stdout.write(f"📦 {'Would move' if dry_run else 'Moved'} legacy meta of {moved} transaction(s)")
+
+        cutoff = timezone.now() - timedelta(days=max(options["keep_days"], 0))
+        pruned = self._prune(cutoff, batch_size, dry_run)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ {'Would prune' if dry_run else 'Pruned'} {pruned} event(s) older than {cutoff:%Y-%m-%d}"
+            )
+        )
+
+    def _prune(self, cutoff, batch_size, dry_run):
+        """
+        Delete old verify/webhook events that have a newer event of the same
+        kind, so latest_event() keeps answering for every transaction.
+        """
+        newer = TransactionEvent.objects.filter(
+            transaction_id=OuterRef("transaction_id"),
+            kind=OuterRef("kind"),
+            pk__gt=OuterRef("pk"),
+        )
+        prunable = TransactionEvent.objects.filter(
+            Exists(newer),
+            kind__in=PRUNABLE_KINDS,
+            created_at__lt=cutoff,
+        )
+        if dry_run:
+            return prunable.count()
+
+        total = 0
+        while True:
+            ids = list(prunable.order_by("pk").values_list("pk", flat=True)[:batch_size])
+            if not ids:
+                return total
+            total += TransactionEvent.objects.filter(pk__in=ids).delete()[0]
+
+    def _move_legacy_meta(self, batch_size, dry_run):
+        legacy = Transaction.objects.filter(meta__has_any_keys=list(LEGACY_META_KEYS) + ["last_verify_time"])
+        if dry_run:
+            return legacy.count()
+
+        total = 0
+        while True:
+            batch = list(legacy.order_by("pk").only("pk", "meta")[:batch_size])
+            if not batch:
+                return total
+
+            events = []
+            for txn in batch:
+                meta = dict(txn.meta)
+                verified_at = parse_datetime(str(meta.pop("last_verify_time", "")))
+                for key, kind in LEGACY_META_KEYS.items():
+                    if key not in meta:
+                        continue
+                    data = meta.pop(key)
+                    data = data if isinstance(data, dict) else {}
+                    events.append(
+                        build_event(
+                            txn,
+                            kind,
+                            status=(data.get("data") or {}).get("status") or "",
+                            payload=compact_flutterwave_response(data),
+                            created_at=verified_at if kind == TransactionEvent.KIND_VERIFY else None,
+                        )
+                    )
+                txn.meta = meta or None
+
+            TransactionEvent.objects.bulk_create(events)
+            Transaction.objects.bulk_update(batch, ["meta"])
+            total += len(batch)
@@ -0,0 +1,88 @@
+import os
+import time
+from collections import Counter
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+
+from payments.bank_statements import (
+    PendingTransferIndex,
+    import_statement_batch,
+    iter_statement_entries,
+    with_fingerprints,
+)
+from payments.models import BankStatementLine
+
+
+class Command(BaseCommand):
+    help = "Import a CSV/OFX bank statement and settle the pending bank transfers it pays"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Statement file (.csv or .ofx/.qfx).")
+        parser.add_argument(
+            "--format",
+            choices=["csv", "ofx"],
+            help="Statement format (default: from the file extension).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Statement lines matched and stored per transaction (default: 500).",
+        )
+        parser.add_argument(
+            "--encoding",
+            default="utf-8-sig",
+            help="File encoding (default: utf-8-sig).",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report matches without settling or storing anything.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or ("ofx" if path.lower().endswith((".ofx", ".qfx")) else "csv")
+        batch_size = max(options["batch_size"], 1)
+        dry_run = options["dry_run"]
+
+        if not os.path.isfile(path):
+            raise CommandError(f"No such file: {path}")
+
+        started = time.monotonic()
+        index = PendingTransferIndex()
+        self.stdout.write(
+            self.style.WARNING(f"🏦 Importing {os.path.basename(path)} against {len(index)} pending bank transfer(s)…")
+        )
+
+        stats = Counter()
+        with open(path, newline="", encoding=options["encoding"]) as fileobj:
+            try:
+                entries = with_fingerprints(iter_statement_entries(fileobj, fmt), source=os.path.basename(path))
+                credits = self._credits(entries, stats)
+                while True:
+                    batch = list(islice(credits, batch_size))
+                    if not batch:
+                        break
+                    stats.update(import_statement_batch(batch, index, dry_run=dry_run))
+            except (ValueError, UnicodeDecodeError) as exc:
+                raise CommandError(f"Could not read statement: {exc}")
+
+        elapsed = time.monotonic() - started
+        prefix = "Would settle" if dry_run else "Settled"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ {prefix} {stats[BankStatementLine.STATUS_MATCHED]} transfer(s) in {elapsed:.2f}s; "
+                f"{stats[BankStatementLine.STATUS_REVIEW]} line(s) queued for review, "
+                f"{stats[BankStatementLine.STATUS_UNMATCHED]} unmatched, "
+                f"{stats['duplicate']} already imported, {stats['skipped']} debit/unreadable line(s) skipped"
+            )
+        )
+
+    def _credits(self, entries, stats):
+        for entry in entries:
+            if entry["posted_on"] is None or entry["amount"] is None or entry["amount"] <= 0:
+                stats["skipped"] += 1
+                continue
+            yield entry
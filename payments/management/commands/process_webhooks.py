@@ -0,0 +1,78 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from payments.gateway import FlutterwaveClient
+from payments.inbox import claim_webhook_events, process_webhook_events
+
+
+class Command(BaseCommand):
+    help = "Verify and apply queued gateway webhooks from the WebhookEvent inbox"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Inbox rows claimed per batch (default: 100).",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Concurrent verify calls to the gateway (default: 4).",
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=2,
+            help="Seconds to sleep when the inbox is empty (default: 2).",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain the currently due rows and exit.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(options["batch_size"], 1)
+        workers = max(options["workers"], 1)
+        interval = max(options["interval"], 1)
+        once = options["once"]
+
+        client = FlutterwaveClient(pool_size=workers)
+        self.stdout.write(self.style.WARNING("📥 Webhook worker started…"))
+        totals = {"processed": 0, "coalesced": 0, "retrying": 0, "failed": 0}
+
+        while True:
+            events = claim_webhook_events(batch_size=batch_size)
+
+            if events:
+                started = time.monotonic()
+                result = process_webhook_events(events, client=client, workers=workers)
+                for key, count in result.items():
+                    totals[key] += count
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"✅ {len(events)} event(s): {result['processed']} processed "
+                        f"({result['coalesced']} coalesced), {result['retrying']} retrying, "
+                        f"{result['failed']} failed in {time.monotonic() - started:.2f}s"
+                    )
+                )
+                if client.breaker.is_open:
+                    # Rows stay pending; back off until the gateway recovers
+                    self.stdout.write(self.style.ERROR("❌ Gateway circuit open; pausing"))
+                    if once:
+                        break
+                    time.sleep(client.breaker.cooldown)
+                continue
+
+            if once:
+                break
+            time.sleep(interval)
+
+        client.close()
+        self.stdout.write(
+            f"Done: {totals['processed']} processed ({totals['coalesced']} coalesced), "
+            f"{totals['retrying']} scheduled for retry, {totals['failed']} failed."
+        )
@@ -0,0 +1,51 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from payments.ledger import rebuild_ledger
+from payments.models import Transaction
+
+
+class Command(BaseCommand):
+    help = "Backfill or repair the daily payment ledger rollups from Transaction"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--from",
+            dest="from_date",
+            help="First day to rebuild, YYYY-MM-DD (default: the oldest transaction).",
+        )
+        parser.add_argument(
+            "--to",
+            dest="to_date",
+            help="Last day to rebuild, inclusive (default: the newest transaction).",
+        )
+
+    def handle(self, *args, **options):
+        bounds = Transaction.objects.aggregate(first=Min("created_at"), last=Max("created_at"))
+        if bounds["first"] is None:
+            self.stdout.write("📒 No transactions to roll up")
+            return
+
+        from_date = self._parse_date(options["from_date"], "--from") or timezone.localdate(bounds["first"])
+        to_date = self._parse_date(options["to_date"], "--to") or timezone.localdate(bounds["last"])
+        if from_date > to_date:
+            raise CommandError("--from must not be after --to")
+
+        self.stdout.write(self.style.WARNING(f"📒 Rebuilding ledger rollups for {from_date}..{to_date}…"))
+        started = time.monotonic()
+        written = rebuild_ledger(from_date, to_date)
+        self.stdout.write(
+            self.style.SUCCESS(f"✅ Wrote {written} rollup row(s) in {time.monotonic() - started:.2f}s")
+        )
+
+    def _parse_date(self, value, option):
+        if not value:
+            return None
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            raise CommandError(f"{option} must be a date in YYYY-MM-DD format, got {value!r}")
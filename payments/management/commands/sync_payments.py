@@ -1,59 +1,242 @@
-from django.core.management.base import BaseCommand
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
 from django.utils import timezone
 
-from payments.models import Transaction
-from payments.services import verify_flutterwave_transaction
+from payments.gateway import FlutterwaveClient
+from payments.models import BankStatementLine, Transaction, TransactionEvent
+from payments.services import (
+    OUTCOME_ABANDONED,
+    OUTCOME_ERROR,
+    OUTCOME_FAILED,
+    OUTCOME_NOT_FOUND,
+    OUTCOME_PENDING,
+    OUTCOME_SUCCESS,
+    apply_flutterwave_outcome,
+    claim_due_transactions,
+    fetch_flutterwave_verification,
+    flutterwave_outcome,
+    reconcile_flutterwave_window,
+    record_flutterwave_verification,
+)
 
 
 class Command(BaseCommand):
     help = "Reconcile pending or failed payment transactions"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=8,
+            help="Concurrent verify calls to Flutterwave (default: 8).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=200,
+            help="Transactions claimed per batch (default: 200).",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=0,
+            help="Stop after verifying this many transactions (default: all due).",
+        )
+        parser.add_argument(
+            "--abandon-after",
+            type=int,
+            default=48,
+            help="Mark transactions unknown to Flutterwave as failed after this many hours (default: 48).",
+        )
+        parser.add_argument(
+            "--from",
+            dest="from_date",
+            help="Bulk mode: reconcile Flutterwave charges created from this date (YYYY-MM-DD) "
+                 "using the list-transactions API instead of one verify call per row.",
+        )
+        parser.add_argument(
+            "--to",
+            dest="to_date",
+            help="Bulk mode: last date of the window, inclusive (default: today).",
+        )
+
     def handle(self, *args, **options):
         self.stdout.write(self.style.WARNING("🔄 Starting payment reconciliation…"))
 
         # ---------------------------------------------
         # 1️⃣ Flutterwave Transactions (auto-verifiable)
         # ---------------------------------------------
-        flutterwave_txns = Transaction.objects.filter(
-            provider=Transaction.PROVIDER_FLUTTERWAVE,
-            status__in=[Transaction.STATUS_INIT, Transaction.STATUS_PENDING],
-        )
-
-        self.stdout.write(
-            f"🔍 Found {flutterwave_txns.count()} Flutterwave transactions to verify"
-        )
-
-        for txn in flutterwave_txns:
-            try:
-                self.stdout.write(f"→ Verifying {txn.reference}")
-                verify_flutterwave_transaction(txn)
-            except Exception as exc:
-                self.stderr.write(
-                    self.style.ERROR(
-                        f"❌ Error verifying {txn.reference}: {exc}"
-                    )
-                )
+        if options["from_date"]:
+            self._sync_flutterwave_window(
+                from_date=self._parse_date(options["from_date"], "--from"),
+                to_date=self._parse_date(options["to_date"], "--to") if options["to_date"] else timezone.localdate(),
+                workers=max(options["workers"], 1),
+            )
+        else:
+            self._sync_flutterwave(
+                workers=max(options["workers"], 1),
+                batch_size=max(options["batch_size"], 1),
+                limit=max(options["limit"], 0),
+                abandon_after=timedelta(hours=max(options["abandon_after"], 1)),
+            )
 
         # ---------------------------------------------
         # 2️⃣ Bank Transfers (manual — report only)
         # ---------------------------------------------
-        bank_txns = Transaction.objects.filter(
-            provider=Transaction.PROVIDER_BANK,
-            status=Transaction.STATUS_PENDING,
+        bank_txns = list(
+            Transaction.objects.filter(
+                provider=Transaction.PROVIDER_BANK,
+                status=Transaction.STATUS_PENDING,
+            ).only("reference", "booking_id", "amount")
         )
 
-        if bank_txns.exists():
+        if bank_txns:
             self.stdout.write(
                 self.style.WARNING(
-                    f"🏦 {bank_txns.count()} bank transfer(s) pending manual approval"
+                    f"🏦 {len(bank_txns)} bank transfer(s) pending manual approval"
                 )
             )
             for txn in bank_txns:
                 self.stdout.write(
                     f"   - {txn.reference} | Booking #{txn.booking_id} | ₦{txn.amount}"
                 )
+            self.stdout.write("   Run `manage.py import_bank_statement <file>` to settle them from a statement")
+
+        in_review = BankStatementLine.objects.filter(status=BankStatementLine.STATUS_REVIEW).count()
+        if in_review:
+            self.stdout.write(
+                self.style.WARNING(f"🧾 {in_review} bank statement line(s) waiting for review in the admin")
+            )
 
         # ---------------------------------------------
         # DONE
         # ---------------------------------------------
         self.stdout.write(self.style.SUCCESS("✅ Payment reconciliation completed"))
+
+    def _parse_date(self, value, option):
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            raise CommandError(f"{option} must be a date in YYYY-MM-DD format, got {value!r}")
+
+    def _sync_flutterwave_window(self, from_date, to_date, workers):
+        """
+        Bulk mode: a few list calls for the whole window instead of one
+        verify call per open transaction.
+        """
+        if from_date > to_date:
+            raise CommandError("--from must not be after --to")
+
+        client = FlutterwaveClient(pool_size=workers)
+        started = time.monotonic()
+        stats = reconcile_flutterwave_window(from_date, to_date, client=client, workers=workers)
+        elapsed = time.monotonic() - started
+        latency = client.stats()
+        client.close()
+
+        if stats["failed_pages"]:
+            self.stdout.write(
+                self.style.ERROR(
+                    f"❌ {stats['failed_pages']} page(s) of the Flutterwave listing could not be fetched; "
+                    f"their transactions are left for the next run"
+                )
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"🔍 {from_date}..{to_date}: {stats['listed']} Flutterwave charge(s) listed, "
+                f"{stats['matched']} matched to open transaction(s) in {elapsed:.2f}s: "
+                f"{stats.get(OUTCOME_SUCCESS, 0)} successful, {stats.get(OUTCOME_FAILED, 0)} failed, "
+                f"{stats.get(OUTCOME_PENDING, 0)} still pending, {stats.get(OUTCOME_ERROR, 0)} error(s); "
+                f"{stats['unmatched']} not open here"
+            )
+        )
+        self.stdout.write(
+            f"   Gateway: {latency['calls']} call(s), {latency['failures']} failed, "
+            f"p50 {latency['p50_ms']}ms, p95 {latency['p95_ms']}ms, max {latency['max_ms']}ms"
+        )
+
+    def _sync_flutterwave(self, workers, batch_size, limit, abandon_after):
+        """
+        Claim due transactions batch by batch; worker threads only make the
+        HTTP calls, this thread owns every database write.
+        """
+        client = FlutterwaveClient(pool_size=workers)
+        stats = Counter()
+        checked = 0
+        started = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            while not limit or checked < limit:
+                size = min(batch_size, limit - checked) if limit else batch_size
+                batch = claim_due_transactions(batch_size=size)
+                if not batch:
+                    break
+
+                futures = {
+                    pool.submit(fetch_flutterwave_verification, txn, client): txn
+                    for txn in batch
+                }
+                outcomes = []
+                history = []
+                for future in as_completed(futures):
+                    txn = futures[future]
+                    data = future.result()
+                    outcome = flutterwave_outcome(txn, data)
+
+                    if data is not None:
+                        history.append(record_flutterwave_verification(txn, data, now=txn.last_checked_at))
+                    if outcome in (OUTCOME_PENDING, OUTCOME_NOT_FOUND, OUTCOME_ERROR):
+                        txn.retry_count += 1
+                    if outcome == OUTCOME_NOT_FOUND and timezone.now() - txn.created_at >= abandon_after:
+                        outcome = OUTCOME_ABANDONED
+                    outcomes.append((txn, outcome))
+
+                Transaction.objects.bulk_update(batch, ["flutterwave_id", "retry_count"])
+                TransactionEvent.objects.bulk_create(history)
+
+                for txn, outcome in outcomes:
+                    try:
+                        apply_flutterwave_outcome(txn, outcome)
+                    except Exception as exc:
+                        outcome = OUTCOME_ERROR
+                        self.stderr.write(
+                            self.style.ERROR(
+                                f"❌ Error applying {txn.reference}: {exc}"
+                            )
+                        )
+                    stats[outcome] += 1
+
+                checked += len(batch)
+
+                if client.breaker.is_open:
+                    self.stdout.write(
+                        self.style.ERROR("❌ Flutterwave is failing; circuit open, stopping until the next run")
+                    )
+                    break
+
+        client.close()
+        elapsed = time.monotonic() - started
+
+        if not checked:
+            self.stdout.write("🔍 No Flutterwave transactions due for verification")
+            return
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"🔍 Verified {checked} Flutterwave transaction(s) in {elapsed:.2f}s "
+                f"({checked / max(elapsed, 0.001):.1f}/s): "
+                f"{stats[OUTCOME_SUCCESS]} successful, {stats[OUTCOME_FAILED]} failed, "
+                f"{stats[OUTCOME_ABANDONED]} abandoned, "
+                f"{stats[OUTCOME_PENDING] + stats[OUTCOME_NOT_FOUND]} still pending, "
+                f"{stats[OUTCOME_ERROR]} error(s)"
+            )
+        )
+        latency = client.stats()
+        self.stdout.write(
+            f"   Gateway: {latency['calls']} call(s), {latency['failures']} failed, "
+            f"p50 {latency['p50_ms']}ms, p95 {latency['p95_ms']}ms, max {latency['max_ms']}ms"
+        )
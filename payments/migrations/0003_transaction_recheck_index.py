@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 02:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0011_notification_counter'),
+        ('payments', '0002_transaction_last_checked_at_transaction_retry_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['provider', 'status', 'retry_count', 'last_checked_at'], name='txn_recheck_due_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.7 on 2026-10-18 02:14
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0003_transaction_recheck_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WebhookEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('provider', models.CharField(choices=[('flutterwave', 'Flutterwave'), ('interswitch', 'Interswitch'), ('bank_transfer', 'Bank Transfer')], max_length=50)),
+                ('event_id', models.CharField(max_length=255)),
+                ('event_type', models.CharField(blank=True, default='', max_length=100)),
+                ('reference', models.CharField(blank=True, db_index=True, default='', max_length=255)),
+                ('payload', models.JSONField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('processed', 'Processed'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('result', models.CharField(blank=True, default='', max_length=255)),
+                ('received_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['received_at'],
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='webhook_status_due_idx')],
+                'constraints': [models.UniqueConstraint(fields=('provider', 'event_id'), name='webhook_provider_event_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-18 02:16
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0004_webhook_event'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TransactionEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('verify', 'Gateway verification'), ('webhook', 'Webhook delivery'), ('status', 'Status change')], max_length=20)),
+                ('status', models.CharField(blank=True, default='', max_length=50)),
+                ('payload', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('transaction', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='payments.transaction')),
+            ],
+            options={
+                'ordering': ['-id'],
+                'indexes': [models.Index(fields=['transaction', 'kind', 'id'], name='txnevent_txn_kind_idx'), models.Index(fields=['kind', 'created_at'], name='txnevent_kind_created_idx')],
+            },
+        ),
+    ]
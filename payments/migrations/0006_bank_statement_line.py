@@ -0,0 +1,35 @@
+# Generated by Django 5.2.7 on 2026-10-18 02:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0005_transaction_event'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BankStatementLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fingerprint', models.CharField(max_length=64, unique=True)),
+                ('source', models.CharField(blank=True, default='', max_length=255)),
+                ('posted_on', models.DateField()),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('narration', models.TextField(blank=True, default='')),
+                ('bank_reference', models.CharField(blank=True, default='', max_length=255)),
+                ('status', models.CharField(choices=[('matched', 'Matched'), ('review', 'Needs review'), ('unmatched', 'Unmatched'), ('ignored', 'Ignored')], max_length=20)),
+                ('match_reason', models.CharField(blank=True, default='', max_length=255)),
+                ('imported_at', models.DateTimeField(auto_now_add=True)),
+                ('resolved_at', models.DateTimeField(blank=True, null=True)),
+                ('transaction', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='statement_lines', to='payments.transaction')),
+            ],
+            options={
+                'ordering': ['-posted_on', 'id'],
+                'indexes': [models.Index(fields=['status', 'posted_on'], name='stmtline_status_posted_idx')],
+            },
+        ),
+    ]
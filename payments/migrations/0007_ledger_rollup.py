@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-18 02:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0006_bank_statement_line'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LedgerRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('provider', models.CharField(choices=[('flutterwave', 'Flutterwave'), ('interswitch', 'Interswitch'), ('bank_transfer', 'Bank Transfer')], max_length=50)),
+                ('status', models.CharField(choices=[('init', 'Initialized'), ('pending', 'Pending'), ('success', 'Success'), ('failed', 'Failed')], max_length=20)),
+                ('currency', models.CharField(default='NGN', max_length=3)),
+                ('count', models.IntegerField(default=0)),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['day', 'provider', 'status'],
+                'constraints': [models.UniqueConstraint(fields=('day', 'provider', 'status', 'currency'), name='ledger_rollup_key_uniq')],
+            },
+        ),
+    ]
@@ -1,13 +1,14 @@
 import logging
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
+from allicom_travels.tracking import FieldTrackerMixin
 from bookings.models import Booking
 
 logger = logging.getLogger("payments")
 
 
-class Transaction(models.Model):
+class Transaction(FieldTrackerMixin, models.Model):
     """
     Stores all raw transaction records (from gateways, banks, etc.)
     Used for audit, retries, and reconciliation.
@@ -34,6 +35,9 @@ class Transaction(models.Model):
         (STATUS_FAILED, "Failed"),
     ]
 
+    # amount is tracked so the ledger rollup can move the right total
+    TRACKED_FIELDS = ("status", "amount")
+
     booking = models.ForeignKey(Booking, on_delete=models.CASCADE, related_name="transactions")
     reference = models.CharField(max_length=255, unique=True)
     amount = models.DecimalField(max_digits=12, decimal_places=2)
@@ -53,6 +57,13 @@ class Transaction(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # sync_payments: open gateway transactions by backoff bucket
+            models.Index(
+                fields=["provider", "status", "retry_count", "last_checked_at"],
+                name="txn_recheck_due_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.reference} ({self.status})"
@@ -65,18 +76,55 @@ class Transaction(models.Model):
             return
 
         logger.info(f"[Transaction] Marking successful: {self.reference}")
+        previous = self.status
         self.status = self.STATUS_SUCCESS
         self.save(update_fields=["status", "updated_at"])
+        self.log_status_change(previous)
 
         # sync/create payment
         self.sync_payment_from_transaction()
+        self.publish_status()
 
     def mark_failed(self, reason=""):
         if self.status == self.STATUS_FAILED:
             return
         logger.warning(f"[Transaction] Marking failed: {self.reference} — {reason}")
+        previous = self.status
         self.status = self.STATUS_FAILED
         self.save(update_fields=["status", "updated_at"])
+        self.log_status_change(previous, reason)
+        self.publish_status()
+
+    def publish_status(self):
+        """
+        Refresh the cached status snapshot read by the status endpoints.
+        """
+        from payments.status import publish_status  # local import to avoid circular imports
+
+        publish_status(self)
+
+    def log_status_change(self, previous, reason=""):
+        payload = {"from": previous}
+        if reason:
+            payload["reason"] = reason
+        TransactionEvent.objects.create(
+            transaction=self,
+            kind=TransactionEvent.KIND_STATUS,
+            status=self.status,
+            payload=payload,
+        )
+
+    def covered_bookings(self):
+        """
+        Bookings paid by this transaction: every cart item for a checkout
+        transaction, otherwise just `self.booking`.
+        """
+        bookings = list(
+            Booking.objects.filter(checkout_reference=self.reference)
+            .select_related("service__operator", "package")
+            .order_by("pk")
+        )
+        return bookings or [self.booking]
 
     def sync_payment_from_transaction(self):
         """
@@ -84,6 +132,11 @@ class Transaction(models.Model):
         """
         from payments.models import Payment  # local import to avoid circular imports
 
+        bookings = self.covered_bookings()
+        if len(bookings) > 1:
+            self._sync_checkout_payments(bookings)
+            return
+
         Payment.objects.update_or_create(
             booking=self.booking,
             defaults={
@@ -98,6 +151,34 @@ class Transaction(models.Model):
         # 🔐 SINGLE SOURCE OF TRUTH
         self.booking.mark_paid()
 
+    def _sync_checkout_payments(self, bookings):
+        """
+        One Payment per cart booking (at its own booked price); per-booking
+        notifications are suppressed and sent once per recipient instead.
+        """
+        from bookings.checkout import notify_checkout_paid  # local import to avoid circular imports
+
+        newly_paid = []
+        with transaction.atomic():
+            for booking in bookings:
+                Payment.objects.update_or_create(
+                    booking=booking,
+                    defaults={
+                        "amount": booking.booked_total_price,
+                        "provider": self.provider,
+                        "status": "paid",
+                        "reference": self.reference,
+                        "paid_at": timezone.now(),
+                    },
+                )
+                if booking.payment_status != Booking.PAYMENT_PAID:
+                    booking._batched_notifications = True
+                    booking.mark_paid()
+                    newly_paid.append(booking)
+
+            if newly_paid:
+                notify_checkout_paid(newly_paid, self.reference)
+
     last_checked_at = models.DateTimeField(null=True, blank=True)
     retry_count = models.PositiveIntegerField(default=0)
 
@@ -120,3 +201,163 @@ class Payment(models.Model):
     @property
     def is_paid(self):
         return self.status == "paid"
+
+
+class WebhookEvent(models.Model):
+    """
+    Append-only inbox of gateway webhook deliveries. The webhook view only
+    checks the signature and inserts a row; `manage.py process_webhooks`
+    verifies and applies them. (provider, event_id) is unique, so gateway
+    redeliveries are dropped at insert time.
+    """
+    STATUS_PENDING = "pending"
+    STATUS_PROCESSED = "processed"
+    STATUS_FAILED = "failed"
+
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_PROCESSED, "Processed"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    provider = models.CharField(max_length=50, choices=Transaction.PROVIDER_CHOICES)
+    event_id = models.CharField(max_length=255)
+    event_type = models.CharField(max_length=100, blank=True, default="")
+    reference = models.CharField(max_length=255, blank=True, default="", db_index=True)
+    payload = models.JSONField()
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    # Due time for the next processing attempt; also used as the worker's claim lease
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    result = models.CharField(max_length=255, blank=True, default="")
+
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["received_at"]
+        constraints = [
+            models.UniqueConstraint(fields=["provider", "event_id"], name="webhook_provider_event_uniq"),
+        ]
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="webhook_status_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.provider} {self.event_type} {self.reference or self.event_id} ({self.status})"
+
+
+class TransactionEvent(models.Model):
+    """
+    Append-only history of a transaction (gateway verifications, webhook
+    deliveries, status changes). Rows are plain INSERTs with a compact
+    payload, replacing read-modify-write of Transaction.meta.
+    """
+    KIND_VERIFY = "verify"
+    KIND_WEBHOOK = "webhook"
+    KIND_STATUS = "status"
+
+    KIND_CHOICES = [
+        (KIND_VERIFY, "Gateway verification"),
+        (KIND_WEBHOOK, "Webhook delivery"),
+        (KIND_STATUS, "Status change"),
+    ]
+
+    transaction = models.ForeignKey(Transaction, on_delete=models.CASCADE, related_name="events")
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    # Gateway status for verify/webhook events, new status for status changes
+    status = models.CharField(max_length=50, blank=True, default="")
+    payload = models.JSONField(blank=True, default=dict)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ["-id"]
+        indexes = [
+            # latest_event() and per-transaction history
+            models.Index(fields=["transaction", "kind", "id"], name="txnevent_txn_kind_idx"),
+            # retention sweeps
+            models.Index(fields=["kind", "created_at"], name="txnevent_kind_created_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.transaction_id} {self.kind} {self.status}"
+
+
+class BankStatementLine(models.Model):
+    """
+    A credit line imported from a bank statement by
+    `manage.py import_bank_statement`. Exact reference + amount hits settle
+    their bank transfer automatically; anything less certain waits here in
+    REVIEW for an admin. `fingerprint` makes re-imports idempotent.
+    """
+    STATUS_MATCHED = "matched"
+    STATUS_REVIEW = "review"
+    STATUS_UNMATCHED = "unmatched"
+    STATUS_IGNORED = "ignored"
+
+    STATUS_CHOICES = [
+        (STATUS_MATCHED, "Matched"),
+        (STATUS_REVIEW, "Needs review"),
+        (STATUS_UNMATCHED, "Unmatched"),
+        (STATUS_IGNORED, "Ignored"),
+    ]
+
+    fingerprint = models.CharField(max_length=64, unique=True)
+    source = models.CharField(max_length=255, blank=True, default="")
+    posted_on = models.DateField()
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    narration = models.TextField(blank=True, default="")
+    bank_reference = models.CharField(max_length=255, blank=True, default="")
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES)
+    # The settled transaction, or the suggested one for REVIEW lines
+    transaction = models.ForeignKey(
+        Transaction,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="statement_lines",
+    )
+    match_reason = models.CharField(max_length=255, blank=True, default="")
+
+    imported_at = models.DateTimeField(auto_now_add=True)
+    resolved_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-posted_on", "id"]
+        indexes = [
+            # admin review queue
+            models.Index(fields=["status", "posted_on"], name="stmtline_status_posted_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.posted_on} {self.amount} {self.bank_reference or self.narration[:30]} ({self.status})"
+
+
+class LedgerRollup(models.Model):
+    """
+    Transaction count and amount per (day, provider, status, currency),
+    kept current by the Transaction signals in payments.signals, so finance
+    reports read a few rollup rows instead of scanning transactions. `day`
+    is the local date the transaction was created.
+    """
+    day = models.DateField()
+    provider = models.CharField(max_length=50, choices=Transaction.PROVIDER_CHOICES)
+    status = models.CharField(max_length=20, choices=Transaction.STATUS_CHOICES)
+    currency = models.CharField(max_length=3, default="NGN")
+    count = models.IntegerField(default=0)
+    amount = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["day", "provider", "status"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "provider", "status", "currency"],
+                name="ledger_rollup_key_uniq",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.provider} {self.status}: {self.count} / {self.currency} {self.amount}"
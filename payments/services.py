@@ -1,51 +1,319 @@
 import logging
-import requests
-from django.conf import settings
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time, timedelta
+
+from django.db import connection, transaction
+from django.db.models import F, Q
 from django.utils import timezone
 
-from .models import Transaction
+from .events import build_event, compact_flutterwave_response
+from .gateway import GatewayError, get_flutterwave_client
+from .models import Transaction, TransactionEvent
 
 logger = logging.getLogger("payments")
 
+# Outcomes of a verify call
+OUTCOME_SUCCESS = "success"
+OUTCOME_FAILED = "failed"
+OUTCOME_PENDING = "pending"
+OUTCOME_NOT_FOUND = "not_found"
+OUTCOME_ERROR = "error"
+OUTCOME_ABANDONED = "abandoned"
+
+
+# Re-check backoff: 5 min after the first check, doubling per retry, capped at a day
+RECHECK_BASE = timedelta(minutes=5)
+RECHECK_MAX = timedelta(days=1)
+
+
+def recheck_delay(retry_count):
+    return min(RECHECK_BASE * (2 ** retry_count), RECHECK_MAX)
+
+
+def due_flutterwave_transactions(now=None):
+    """
+    Open Flutterwave transactions whose backoff has elapsed: never checked,
+    or last checked at least recheck_delay(retry_count) ago. Expressed as
+    one range predicate per retry_count so it stays an index scan.
+    """
+    now = now or timezone.now()
+    due = Q(last_checked_at__isnull=True)
+
+    retry_count = 0
+    while recheck_delay(retry_count) < RECHECK_MAX:
+        due |= Q(retry_count=retry_count, last_checked_at__lte=now - recheck_delay(retry_count))
+        retry_count += 1
+    due |= Q(retry_count__gte=retry_count, last_checked_at__lte=now - RECHECK_MAX)
+
+    return Transaction.objects.filter(
+        due,
+        provider=Transaction.PROVIDER_FLUTTERWAVE,
+        status__in=[Transaction.STATUS_INIT, Transaction.STATUS_PENDING],
+    )
+
+
+def claim_due_transactions(batch_size=200, now=None):
+    """
+    Lease a batch of due transactions by stamping last_checked_at, so an
+    overlapping run does not verify the same rows.
+    """
+    now = now or timezone.now()
+    lock = {"skip_locked": True} if connection.features.has_select_for_update_skip_locked else {}
+
+    with transaction.atomic():
+        batch = list(
+            due_flutterwave_transactions(now)
+            .select_for_update(**lock)
+            .order_by(F("last_checked_at").asc(nulls_first=True), "pk")[:batch_size]
+        )
+        if batch:
+            Transaction.objects.filter(pk__in=[txn.pk for txn in batch]).update(last_checked_at=now)
+    for txn in batch:
+        txn.last_checked_at = now
+    return batch
+
 
 # ---------------------------------------------------------
 # FLUTTERWAVE VERIFY CALL (USED BY WEBHOOK + RETRY)
 # ---------------------------------------------------------
+def fetch_flutterwave_verification(txn: Transaction, client=None):
+    """
+    HTTP half of verification: no database access, so it is safe to run on
+    worker threads. Verifies by Flutterwave id when we have one, otherwise
+    by our tx_ref. Returns the parsed API response, or None when the gateway
+    is unavailable (timeouts, retries exhausted, circuit open).
+    """
+    client = client or get_flutterwave_client()
+
+    logger.info(f"[FW VERIFY] Verifying {txn.reference} (fw id {txn.flutterwave_id or '-'})")
+
+    try:
+        if txn.flutterwave_id:
+            return client.verify(txn.flutterwave_id)
+        return client.verify_by_reference(txn.reference)
+    except GatewayError as e:
+        logger.warning(f"[FW VERIFY] {txn.reference}: {e}")
+        return None
+
+
+def flutterwave_outcome(txn: Transaction, data):
+    """
+    Map a verify response onto one of the OUTCOME_* values. A "successful"
+    charge only counts if it is for this reference and covers the amount.
+    """
+    if not data:
+        return OUTCOME_ERROR
+    if data.get("status") != "success":
+        message = str(data.get("message", "")).lower()
+        return OUTCOME_NOT_FOUND if "not found" in message or "no transaction" in message else OUTCOME_ERROR
+
+    fw = data.get("data") or {}
+    fw_status = fw.get("status")
+
+    if fw_status == "successful":
+        if fw.get("tx_ref") not in (None, txn.reference):
+            logger.error(f"[FW VERIFY] tx_ref mismatch for {txn.reference}: {fw.get('tx_ref')}")
+            return OUTCOME_ERROR
+        try:
+            if float(fw.get("amount") or 0) < float(txn.amount):
+                logger.error(f"[FW VERIFY] Underpayment for {txn.reference}: {fw.get('amount')} < {txn.amount}")
+                return OUTCOME_FAILED
+        except (TypeError, ValueError):
+            return OUTCOME_ERROR
+        return OUTCOME_SUCCESS
+
+    if fw_status in ["failed", "cancelled"]:
+        return OUTCOME_FAILED
+    return OUTCOME_PENDING
+
+
+def record_flutterwave_verification(txn: Transaction, data, now=None):
+    """
+    Learn the Flutterwave id on the instance (not saved) and return an
+    unsaved verify TransactionEvent holding the compacted response.
+    """
+    fw = (data or {}).get("data") or {}
+    if fw.get("id") and not txn.flutterwave_id:
+        txn.flutterwave_id = str(fw["id"])
+
+    return build_event(
+        txn,
+        TransactionEvent.KIND_VERIFY,
+        status=fw.get("status") or (data or {}).get("status") or "",
+        payload=compact_flutterwave_response(data),
+        created_at=now,
+    )
+
+
+def apply_flutterwave_outcome(txn: Transaction, outcome):
+    if outcome == OUTCOME_SUCCESS:
+        txn.mark_successful()
+    elif outcome == OUTCOME_FAILED:
+        txn.mark_failed("Gateway returned failed/cancelled")
+    elif outcome == OUTCOME_ABANDONED:
+        txn.mark_failed("Not found at Flutterwave; checkout abandoned")
+
+
 def verify_flutterwave_transaction(txn: Transaction):
     """
     Calls Flutterwave's v3 verify API for a given Transaction.
     Returns the parsed API data or None on failure.
     """
-
-    if not txn.flutterwave_id:
-        logger.warning(f"[FW VERIFY] No flutterwave_id for txn {txn.reference}")
+    data = fetch_flutterwave_verification(txn)
+    if data is None:
         return None
 
-    url = f"https://api.flutterwave.com/v3/transactions/{txn.flutterwave_id}/verify"
+    # Append the response for audit
+    had_id = txn.flutterwave_id
+    record_flutterwave_verification(txn, data).save()
+    if txn.flutterwave_id != had_id:
+        txn.save(update_fields=["flutterwave_id"])
 
-    headers = {
-        "Authorization": f"Bearer {settings.FLW_SECRET_KEY}",
-        "Content-Type": "application/json",
-    }
+    return data
 
-    logger.info(f"[FW VERIFY] Verifying FW transaction {txn.flutterwave_id}")
 
-    try:
-        resp = requests.get(url, headers=headers)
-        data = resp.json()
-    except Exception as e:
-        logger.exception(f"[FW VERIFY] Network error: {e}")
-        return None
+# ---------------------------------------------------------
+# WINDOW RECONCILIATION (LIST API)
+# ---------------------------------------------------------
+# Our row is created before the customer pays, so look back a little past
+# the window start for rows whose charge landed inside it.
+WINDOW_SLACK = timedelta(days=1)
+
+# When a tx_ref has several charges (retries), the best one decides
+LISTED_STATUS_RANK = {"successful": 2, "pending": 1}
+
 
-    # Save raw data for audit
-    txn.meta = {
-        **(txn.meta or {}),
-        "last_fw_verify": data,
-        "last_verify_time": str(timezone.now()),
+def fetch_flutterwave_window(from_date, to_date, client=None, workers=4):
+    """
+    Every Flutterwave transaction created between two dates: page 1 gives
+    total_pages, the remaining pages are fetched on a thread pool.
+    Returns (transactions, failed_pages); a page that cannot be fetched is
+    counted rather than aborting the run.
+    """
+    client = client or get_flutterwave_client()
+
+    def fetch_page(page):
+        try:
+            data = client.list_transactions(from_date, to_date, page=page)
+        except GatewayError as e:
+            logger.warning(f"[FW LIST] Page {page} of {from_date}..{to_date}: {e}")
+            return None
+        if not data or data.get("status") != "success":
+            logger.warning(f"[FW LIST] Page {page} of {from_date}..{to_date}: {(data or {}).get('message')}")
+            return None
+        return data
+
+    first = fetch_page(1)
+    if first is None:
+        return [], 1
+
+    listed = list(first.get("data") or [])
+    total_pages = int(((first.get("meta") or {}).get("page_info") or {}).get("total_pages") or 1)
+    failed_pages = 0
+
+    if total_pages > 1:
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+            for data in pool.map(fetch_page, range(2, total_pages + 1)):
+                if data is None:
+                    failed_pages += 1
+                else:
+                    listed.extend(data.get("data") or [])
+
+    return listed, failed_pages
+
+
+def open_flutterwave_index(from_date, to_date):
+    """
+    Hash index over the open (INIT/PENDING) Flutterwave transactions that
+    can appear in the window: one query, then (by_reference, by_fw_id).
+    """
+    tz = timezone.get_current_timezone()
+    start = timezone.make_aware(datetime.combine(from_date, time.min), tz) - WINDOW_SLACK
+    end = timezone.make_aware(datetime.combine(to_date + timedelta(days=1), time.min), tz)
+
+    by_reference = {}
+    by_fw_id = {}
+    open_txns = Transaction.objects.filter(
+        provider=Transaction.PROVIDER_FLUTTERWAVE,
+        status__in=[Transaction.STATUS_INIT, Transaction.STATUS_PENDING],
+        created_at__gte=start,
+        created_at__lt=end,
+    ).defer("meta")
+
+    for txn in open_txns.iterator(chunk_size=2000):
+        by_reference[txn.reference] = txn
+        if txn.flutterwave_id:
+            by_fw_id[txn.flutterwave_id] = txn
+    return by_reference, by_fw_id
+
+
+def match_flutterwave_listing(listed, by_reference, by_fw_id):
+    """
+    Pair listed charges with our open rows, by Flutterwave id first and
+    then tx_ref. Returns ({txn.pk: (txn, charge)}, unmatched_count), keeping
+    the best charge per transaction.
+    """
+    matches = {}
+    unmatched = 0
+    for fw in listed:
+        txn = by_fw_id.get(str(fw.get("id") or "")) or by_reference.get(fw.get("tx_ref"))
+        if txn is None:
+            unmatched += 1
+            continue
+        current = matches.get(txn.pk)
+        rank = LISTED_STATUS_RANK.get(fw.get("status"), 0)
+        if current is None or rank > LISTED_STATUS_RANK.get(current[1].get("status"), 0):
+            matches[txn.pk] = (txn, fw)
+    return matches, unmatched
+
+
+def reconcile_flutterwave_window(from_date, to_date, client=None, workers=4, now=None):
+    """
+    Bulk alternative to verifying one transaction at a time: list the
+    window's charges in a few calls, match them in memory, write ids,
+    check stamps and verify events in bulk, then apply final outcomes.
+    Returns a dict of counts keyed by OUTCOME_* plus listed, matched,
+    unmatched and failed_pages.
+    """
+    now = now or timezone.now()
+    listed, failed_pages = fetch_flutterwave_window(from_date, to_date, client=client, workers=workers)
+    by_reference, by_fw_id = open_flutterwave_index(from_date, to_date)
+    matches, unmatched = match_flutterwave_listing(listed, by_reference, by_fw_id)
+
+    stats = {
+        "listed": len(listed),
+        "matched": len(matches),
+        "unmatched": unmatched,
+        "failed_pages": failed_pages,
     }
-    txn.save(update_fields=["meta"])
+    if not matches:
+        return stats
 
-    return data
+    txns = []
+    history = []
+    outcomes = []
+    for txn, fw in matches.values():
+        data = {"status": "success", "message": "Listed", "data": fw}
+        outcome = flutterwave_outcome(txn, data)
+        history.append(record_flutterwave_verification(txn, data, now=now))
+        txn.last_checked_at = now
+        if outcome == OUTCOME_PENDING:
+            txn.retry_count += 1
+        txns.append(txn)
+        outcomes.append((txn, outcome))
+
+    with transaction.atomic():
+        Transaction.objects.bulk_update(txns, ["flutterwave_id", "last_checked_at", "retry_count"])
+        TransactionEvent.objects.bulk_create(history)
+
+    for txn, outcome in outcomes:
+        try:
+            apply_flutterwave_outcome(txn, outcome)
+        except Exception as exc:
+            logger.exception(f"[FW LIST] Failed to apply {txn.reference}: {exc}")
+            outcome = OUTCOME_ERROR
+        stats[outcome] = stats.get(outcome, 0) + 1
+    return stats
 
 
 # ---------------------------------------------------------
@@ -66,15 +334,12 @@ def retry_gateway_verification(txn: Transaction):
     if not data:
         return "FAILED — could not verify transaction"
 
-    fw_status = data.get("data", {}).get("status")
+    outcome = flutterwave_outcome(txn, data)
+    apply_flutterwave_outcome(txn, outcome)
 
-    if fw_status == "successful":
-        txn.mark_successful()
+    if outcome == OUTCOME_SUCCESS:
         return "SUCCESS — transaction marked successful"
-
-    elif fw_status in ["failed", "cancelled"]:
-        txn.mark_failed("Gateway returned failed/cancelled")
+    elif outcome == OUTCOME_FAILED:
         return "FAILED — gateway returned failed/cancelled"
-
     else:
-        return f"PENDING — gateway status = {fw_status}"
+        return f"PENDING — gateway status = {(data.get('data') or {}).get('status') or outcome}"
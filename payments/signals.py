@@ -1,78 +1,39 @@
 import logging
-from django.db.models.signals import pre_save, post_save
+
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
-from .models import Transaction           # ✅ only Transaction comes from payments.models
-from bookings.models import Booking, Notification   # ✅ Booking + Notification come from bookings app
 
+from bookings.models import Booking
+from .ledger import record_transaction_change, record_transaction_removal
+from .models import Transaction
+from .status import forget_status
 
 logger = logging.getLogger('bookings')
 
-@receiver(pre_save, sender=Booking)
-def booking_pre_save(sender, instance, **kwargs):
-    """
-    Capture old status before saving to detect changes.
-    """
-    if instance.pk:
-        try:
-            old = Booking.objects.get(pk=instance.pk)
-            instance._old_status = old.status
-        except Booking.DoesNotExist:
-            instance._old_status = None
-    else:
-        instance._old_status = None
+# Booking notifications (creation, payment, confirm/reject/cancel) are fanned
+# out once per event by bookings.signals.booking_post_save.
 
 
 @receiver(post_save, sender=Booking)
-def booking_post_save(sender, instance, created, **kwargs):
+def booking_status_snapshot_post_save(sender, instance, created, **kwargs):
     """
-    Trigger notifications on creation and status updates.
-    Booking-centric notifications remain here (operator/user/admin).
+    Cached payment status snapshots include booking fields; drop them when
+    those change.
     """
-    try:
-        def create_notification(recipient, message):
-            Notification.objects.create(recipient=recipient, message=message)
-
-        service = getattr(instance, "service", None)
-        operator = getattr(service, "operator", None) if service else None
-
-        # --- New booking ---
-        if created:
-            if operator:
-                create_notification(
-                    operator,
-                    f"New booking #{instance.pk} created for your service \"{service.title}\"."
-                )
-            # also notify admin/global
-            create_notification(None, f"New booking #{instance.pk} created for service \"{service.title}\".")
-            return
+    if created or not instance.has_changed("status", "payment_status"):
+        return
 
-        old_status = getattr(instance, "_old_status", None)
-        new_status = instance.status
-        if old_status == new_status:
-            return  # No change
+    references = set(Transaction.objects.filter(booking=instance).values_list("reference", flat=True))
+    if instance.checkout_reference:
+        references.add(instance.checkout_reference)
+    forget_status(references)
 
-        # --- Booking confirmed ---
-        if new_status == Booking.STATUS_CONFIRMED:
-            if operator:
-                create_notification(operator, f"Booking #{instance.pk} for \"{service.title}\" has been approved.")
-            if instance.user:
-                create_notification(instance.user, f"Your booking #{instance.pk} has been approved.")
 
-        # --- Booking rejected ---
-        elif new_status == Booking.STATUS_REJECTED:
-            reason = instance.admin_note or "No reason provided."
-            if operator:
-                create_notification(operator, f"Booking #{instance.pk} was rejected. Reason: {reason}")
-            if instance.user:
-                create_notification(instance.user, f"Your booking #{instance.pk} was rejected. Reason: {reason}")
+@receiver(post_save, sender=Transaction)
+def transaction_ledger_post_save(sender, instance, created, **kwargs):
+    record_transaction_change(instance, created)
 
-        # --- Booking cancelled ---
-        elif new_status == Booking.STATUS_CANCELLED:
-            create_notification(None, f"Booking #{instance.pk} has been cancelled by {getattr(instance.user, 'username', 'Unknown')}.")
-            if operator:
-                create_notification(operator, f"Booking #{instance.pk} has been cancelled.")
-            if instance.user:
-                create_notification(instance.user, f"Your booking #{instance.pk} has been cancelled.")
 
-    except Exception:
-        logger.exception("Error in booking signals")
\ No newline at end of file
+@receiver(post_delete, sender=Transaction)
+def transaction_ledger_post_delete(sender, instance, **kwargs):
+    record_transaction_removal(instance)
@@ -0,0 +1,134 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Transaction
+
+logger = logging.getLogger("payments")
+
+STATUS_KEY = "payments:status:{reference}"
+
+FINAL_STATUSES = {Transaction.STATUS_SUCCESS, Transaction.STATUS_FAILED}
+
+# Wakes waiters in this process as soon as a status is published here; waiters
+# in other Passenger processes see the change on their next cache read.
+_changed = threading.Condition()
+
+# Held long-polls per process (see PAYMENT_STATUS_MAX_WAITERS), created on first use
+_waiters = None
+_waiters_lock = threading.Lock()
+
+
+def _timeout():
+    return getattr(settings, "PAYMENT_STATUS_CACHE_TIMEOUT", 900)
+
+
+# ---------------------------------------------------
+# SNAPSHOTS
+# ---------------------------------------------------
+def build_status_snapshot(txn):
+    booking = txn.booking
+    return {
+        "reference": txn.reference,
+        "status": txn.status,
+        "provider": txn.provider,
+        "amount": float(txn.amount),
+        "booking_status": booking.status,
+        "payment_status": booking.payment_status,
+        "booked_total_price": float(booking.booked_total_price),
+    }
+
+
+def get_status_snapshot(reference):
+    """
+    Cached status of a transaction; on a miss it is rebuilt with one query.
+    Returns None for an unknown reference.
+    """
+    key = STATUS_KEY.format(reference=reference)
+    snapshot = cache.get(key)
+    if snapshot is not None:
+        return snapshot
+
+    txn = Transaction.objects.select_related("booking").filter(reference=reference).first()
+    if txn is None:
+        return None
+    snapshot = build_status_snapshot(txn)
+    cache.set(key, snapshot, _timeout())
+    return snapshot
+
+
+def _publish(reference):
+    txn = Transaction.objects.select_related("booking").filter(reference=reference).first()
+    if txn is None:
+        return
+    cache.set(STATUS_KEY.format(reference=reference), build_status_snapshot(txn), _timeout())
+    with _changed:
+        _changed.notify_all()
+
+
+def publish_status(txn):
+    """
+    Once the surrounding transaction commits, store a fresh snapshot (one
+    query, so booking fields changed by the same commit are included) and
+    wake waiting requests.
+    """
+    reference = txn.reference
+    transaction.on_commit(lambda: _publish(reference))
+
+
+def forget_status(references):
+    """
+    Drop cached snapshots (e.g. after a booking change); the next read
+    rebuilds them.
+    """
+    keys = [STATUS_KEY.format(reference=reference) for reference in references]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+# ---------------------------------------------------
+# LONG-POLL
+# ---------------------------------------------------
+@contextmanager
+def waiter_slot():
+    """
+    Claim one of this process's PAYMENT_STATUS_MAX_WAITERS long-poll slots
+    without blocking; yields whether a slot was free.
+    """
+    global _waiters
+    with _waiters_lock:
+        if _waiters is None:
+            _waiters = threading.BoundedSemaphore(getattr(settings, "PAYMENT_STATUS_MAX_WAITERS", 4))
+    acquired = _waiters.acquire(blocking=False)
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            _waiters.release()
+
+
+def wait_for_status_change(reference, since, timeout):
+    """
+    Block until the cached status differs from `since`, the transaction is
+    final, or `timeout` seconds pass; returns the latest snapshot. Waiting
+    only reads the cache, every PAYMENT_STATUS_POLL_INTERVAL seconds or
+    sooner when this process publishes a change.
+    """
+    interval = getattr(settings, "PAYMENT_STATUS_POLL_INTERVAL", 1)
+    deadline = time.monotonic() + timeout
+
+    while True:
+        snapshot = get_status_snapshot(reference)
+        if snapshot is None or snapshot["status"] != since or snapshot["status"] in FINAL_STATUSES:
+            return snapshot
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return snapshot
+        with _changed:
+            _changed.wait(min(interval, remaining))
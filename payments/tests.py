@@ -1,3 +1,616 @@
-from django.test import TestCase
+import json
+import os
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from urllib.parse import parse_qs, urlparse
 
-# Create your tests here.
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from bookings.models import Booking
+from services.models import Service
+from .events import build_event, latest_event
+from .ledger import rebuild_ledger
+from .gateway import CircuitBreaker, FlutterwaveClient, GatewayUnavailable
+from .models import BankStatementLine, LedgerRollup, Transaction, TransactionEvent
+from .services import OUTCOME_FAILED, OUTCOME_PENDING, OUTCOME_SUCCESS, reconcile_flutterwave_window
+
+
+# ---------------------------------------------------
+# HELPERS
+# ---------------------------------------------------
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class StubGateway:
+    """
+    Local HTTP stand-in for the Flutterwave API. `respond(path, query)`
+    returns (status, body); every request path is recorded in `requests`.
+    """
+
+    def __init__(self, respond):
+        self.respond = respond
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                stub.requests.append(self.path)
+                status, body = stub.respond(url.path, parse_qs(url.query))
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+        self.thread.start()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server.server_port}/v3"
+
+    def client(self, **kwargs):
+        options = {
+            "secret_key": "test",
+            "connect_timeout": 2,
+            "read_timeout": 2,
+            "max_retries": 0,
+            "pool_size": 4,
+            "backoff": 0,
+        }
+        options.update(kwargs)
+        return FlutterwaveClient(base_url=self.base_url, **options)
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def scripted(*responses):
+    """Respond with each (status, body) in turn, repeating the last one."""
+    queue = list(responses)
+    lock = threading.Lock()
+
+    def respond(path, query):
+        with lock:
+            return queue.pop(0) if len(queue) > 1 else queue[0]
+    return respond
+
+
+VERIFIED = {"status": "success", "data": {"id": 1, "tx_ref": "TXN-1", "status": "successful"}}
+
+
+# ---------------------------------------------------
+# CIRCUIT BREAKER
+# ---------------------------------------------------
+class CircuitBreakerTests(SimpleTestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker(threshold=3, cooldown=30, clock=self.clock)
+
+    def test_opens_after_threshold_consecutive_failures(self):
+        for _ in range(2):
+            self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self.assertTrue(self.breaker.allow())
+
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(self.breaker.allow())
+
+    def test_success_resets_the_failure_count(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_half_open_lets_a_single_probe_through(self):
+        for _ in range(3):
+            self.breaker.record_failure()
+        self.clock.advance(29)
+        self.assertFalse(self.breaker.allow())
+
+        self.clock.advance(1)
+        self.assertEqual(self.breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertTrue(self.breaker.allow())
+        self.assertFalse(self.breaker.allow())
+
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self.assertTrue(self.breaker.allow())
+
+    def test_failed_probe_reopens_for_a_full_cooldown(self):
+        for _ in range(3):
+            self.breaker.record_failure()
+        self.clock.advance(30)
+        self.assertTrue(self.breaker.allow())
+
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.clock.advance(29)
+        self.assertFalse(self.breaker.allow())
+        self.clock.advance(1)
+        self.assertTrue(self.breaker.allow())
+
+
+# ---------------------------------------------------
+# FLUTTERWAVE CLIENT
+# ---------------------------------------------------
+class FlutterwaveClientTests(SimpleTestCase):
+    def start(self, respond):
+        stub = StubGateway(respond)
+        self.addCleanup(stub.close)
+        return stub
+
+    def test_5xx_is_retried_until_success(self):
+        stub = self.start(scripted((503, {}), (502, {}), (200, VERIFIED)))
+        client = stub.client(max_retries=2)
+
+        self.assertEqual(client.verify(1), VERIFIED)
+        self.assertEqual(len(stub.requests), 3)
+        self.assertEqual(client.stats()["failures"], 2)
+        self.assertEqual(client.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_gives_up_after_max_retries(self):
+        stub = self.start(scripted((500, {})))
+        client = stub.client(max_retries=2)
+
+        with self.assertRaises(GatewayUnavailable):
+            client.verify(1)
+        self.assertEqual(len(stub.requests), 3)
+
+    def test_4xx_is_returned_as_is_without_retrying(self):
+        body = {"status": "error", "message": "No transaction was found for this id"}
+        stub = self.start(scripted((404, body)))
+        client = stub.client(max_retries=3)
+
+        self.assertEqual(client.verify(1), body)
+        self.assertEqual(len(stub.requests), 1)
+        self.assertEqual(client.breaker.failures, 0)
+
+    def test_open_breaker_fails_fast_then_probes_once(self):
+        stub = self.start(scripted((500, {}), (500, {}), (200, VERIFIED)))
+        clock = FakeClock()
+        client = stub.client(breaker=CircuitBreaker(threshold=2, cooldown=30, clock=clock))
+
+        for _ in range(2):
+            with self.assertRaises(GatewayUnavailable):
+                client.verify(1)
+        self.assertTrue(client.breaker.is_open)
+
+        with self.assertRaises(GatewayUnavailable):
+            client.verify(1)
+        self.assertEqual(len(stub.requests), 2)
+
+        clock.advance(30)
+        self.assertEqual(client.verify(1), VERIFIED)
+        self.assertEqual(len(stub.requests), 3)
+        self.assertEqual(client.breaker.state, CircuitBreaker.CLOSED)
+
+
+# ---------------------------------------------------
+# WINDOW RECONCILIATION (LIST API)
+# ---------------------------------------------------
+def charge(fw_id, tx_ref, status, amount=100):
+    return {"id": fw_id, "tx_ref": tx_ref, "status": status, "amount": amount, "card": {"last_4digits": "4242"}}
+
+
+# Three pages of three; page 3 is down
+LISTING = {
+    1: [
+        charge(501, "TXN-PAID", "successful"),
+        charge(502, "TXN-RETRIED", "failed"),
+        charge(503, "TXN-SHORT", "successful", amount=50),
+    ],
+    2: [
+        charge(504, "TXN-WAITING", "pending"),
+        charge(505, "TXN-RETRIED", "successful"),
+        charge(506, "TXN-CLOSED", "failed"),
+    ],
+    3: [
+        charge(507, "TXN-ON-LOST-PAGE", "successful"),
+        charge(508, "SOMEONE-ELSE", "successful"),
+    ],
+}
+
+
+def listing(path, query):
+    page = int(query["page"][0])
+    if page == 3:
+        return 500, {}
+    return 200, {
+        "status": "success",
+        "message": "Transactions fetched",
+        "meta": {"page_info": {"total": 8, "current_page": page, "total_pages": 3}},
+        "data": LISTING[page],
+    }
+
+
+class ReconcileFlutterwaveWindowTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        operator = get_user_model().objects.create_user("op", "op@example.com", "pw", role="operator")
+        service = Service.objects.create(
+            operator=operator, title="Tour", city="Lagos", country="Nigeria",
+            description="d", price=100, is_approved=True,
+        )
+        cls.txns = {}
+        for reference, status in [
+            ("TXN-PAID", Transaction.STATUS_INIT),
+            ("TXN-RETRIED", Transaction.STATUS_PENDING),
+            ("TXN-SHORT", Transaction.STATUS_INIT),
+            ("TXN-WAITING", Transaction.STATUS_INIT),
+            ("TXN-CLOSED", Transaction.STATUS_SUCCESS),
+            ("TXN-ON-LOST-PAGE", Transaction.STATUS_INIT),
+        ]:
+            booking = Booking.objects.create(
+                service=service, num_adults=1, given_name="Ada", surname="Obi",
+                contact_number="1", email="ada@example.com", full_contact_address="x",
+                nationality="NG", current_residence="NG", id_card_type="passport",
+                start_date=date(2030, 1, 1), end_date=date(2030, 1, 1),
+            )
+            cls.txns[reference] = Transaction.objects.create(
+                booking=booking, reference=reference, amount=Decimal("100"),
+                provider=Transaction.PROVIDER_FLUTTERWAVE, status=status,
+            )
+
+    def reconcile(self):
+        stub = StubGateway(listing)
+        self.addCleanup(stub.close)
+        today = timezone.localdate()
+        stats = reconcile_flutterwave_window(today, today, client=stub.client(), workers=2)
+        return stats, stub
+
+    def status_of(self, reference):
+        return Transaction.objects.get(reference=reference).status
+
+    def test_pages_are_fetched_and_a_failed_page_is_counted(self):
+        stats, stub = self.reconcile()
+
+        self.assertEqual(sorted(int(parse_qs(urlparse(p).query)["page"][0]) for p in stub.requests), [1, 2, 3])
+        self.assertEqual(stats["listed"], 6)
+        self.assertEqual(stats["failed_pages"], 1)
+        # Only on the lost page: left for the next run
+        on_lost_page = Transaction.objects.get(reference="TXN-ON-LOST-PAGE")
+        self.assertEqual(on_lost_page.status, Transaction.STATUS_INIT)
+        self.assertIsNone(on_lost_page.last_checked_at)
+
+    def test_outcomes(self):
+        stats, _ = self.reconcile()
+
+        self.assertEqual(stats["matched"], 4)
+        self.assertEqual(stats[OUTCOME_SUCCESS], 2)
+        self.assertEqual(stats[OUTCOME_FAILED], 1)
+        self.assertEqual(stats[OUTCOME_PENDING], 1)
+        self.assertEqual(self.status_of("TXN-PAID"), Transaction.STATUS_SUCCESS)
+
+        waiting = Transaction.objects.get(reference="TXN-WAITING")
+        self.assertEqual(waiting.status, Transaction.STATUS_INIT)
+        self.assertEqual(waiting.retry_count, 1)
+        self.assertEqual(waiting.flutterwave_id, "504")
+
+    def test_best_charge_wins_for_a_retried_tx_ref(self):
+        self.reconcile()
+
+        retried = Transaction.objects.get(reference="TXN-RETRIED")
+        self.assertEqual(retried.status, Transaction.STATUS_SUCCESS)
+        self.assertEqual(retried.flutterwave_id, "505")
+
+    def test_underpayment_is_failed(self):
+        self.reconcile()
+
+        self.assertEqual(self.status_of("TXN-SHORT"), Transaction.STATUS_FAILED)
+
+    def test_only_open_rows_are_touched(self):
+        stats, _ = self.reconcile()
+
+        # TXN-CLOSED (already successful here) and SOMEONE-ELSE are not open
+        self.assertEqual(stats["unmatched"], 1)
+        self.assertEqual(self.status_of("TXN-CLOSED"), Transaction.STATUS_SUCCESS)
+        self.assertFalse(
+            TransactionEvent.objects.filter(transaction__reference="TXN-CLOSED", kind=TransactionEvent.KIND_VERIFY).exists()
+        )
+
+    def test_verify_events_store_compact_payloads(self):
+        self.reconcile()
+
+        event = TransactionEvent.objects.get(transaction__reference="TXN-PAID", kind=TransactionEvent.KIND_VERIFY)
+        self.assertEqual(event.payload["data"]["id"], 501)
+        self.assertNotIn("card", event.payload["data"])
+
+
+# ---------------------------------------------------
+# STATUS LONG-POLL
+# ---------------------------------------------------
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "wait-status-tests"}})
+class WaitPaymentStatusTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        operator = get_user_model().objects.create_user("op", "op@example.com", "pw", role="operator")
+        service = Service.objects.create(
+            operator=operator, title="Tour", city="Lagos", country="Nigeria",
+            description="d", price=100, is_approved=True,
+        )
+        booking = Booking.objects.create(
+            service=service, num_adults=1, given_name="Ada", surname="Obi",
+            contact_number="1", email="ada@example.com", full_contact_address="x",
+            nationality="NG", current_residence="NG", id_card_type="passport",
+            start_date=date(2030, 1, 1), end_date=date(2030, 1, 1),
+        )
+        Transaction.objects.create(
+            booking=booking, reference="TXN-WAIT", amount=Decimal("100"),
+            provider=Transaction.PROVIDER_FLUTTERWAVE, status=Transaction.STATUS_INIT,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse("payments:wait_payment_status", args=["TXN-WAIT"])
+
+    def test_non_finite_or_negative_timeout_is_rejected(self):
+        for timeout in ("nan", "inf", "-1", "soon"):
+            with self.subTest(timeout=timeout):
+                self.assertEqual(self.client.get(self.url, {"timeout": timeout}).status_code, 400)
+
+    def test_changed_status_answers_without_waiting(self):
+        response = self.client.get(self.url, {"since": Transaction.STATUS_PENDING, "timeout": "5"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()["changed"])
+
+    def test_extra_waiters_get_503_with_retry_after(self):
+        slots = threading.BoundedSemaphore(1)
+        slots.acquire()
+        with mock.patch("payments.status._waiters", slots):
+            response = self.client.get(self.url, {"timeout": "5"})
+
+        self.assertEqual(response.status_code, 503)
+        self.assertIn("Retry-After", response)
+        self.assertFalse(response.json()["changed"])
+
+
+# ---------------------------------------------------
+# EVENT HISTORY
+# ---------------------------------------------------
+class LatestEventTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        operator = get_user_model().objects.create_user("op", "op@example.com", "pw", role="operator")
+        service = Service.objects.create(
+            operator=operator, title="Tour", city="Lagos", country="Nigeria",
+            description="d", price=100, is_approved=True,
+        )
+        booking = Booking.objects.create(
+            service=service, num_adults=1, given_name="Ada", surname="Obi",
+            contact_number="1", email="ada@example.com", full_contact_address="x",
+            nationality="NG", current_residence="NG", id_card_type="passport",
+            start_date=date(2030, 1, 1), end_date=date(2030, 1, 1),
+        )
+        cls.txn = Transaction.objects.create(
+            booking=booking, reference="TXN-EVENTS", amount=Decimal("100"),
+            provider=Transaction.PROVIDER_FLUTTERWAVE, status=Transaction.STATUS_INIT,
+        )
+
+    def test_latest_event_survives_compaction(self):
+        long_ago = timezone.now() - timedelta(days=200)
+        TransactionEvent.objects.bulk_create([
+            build_event(self.txn, TransactionEvent.KIND_VERIFY, f"check-{n}", created_at=long_ago + timedelta(days=n))
+            for n in range(3)
+        ] + [build_event(self.txn, TransactionEvent.KIND_WEBHOOK, "charge.completed", created_at=long_ago)])
+
+        call_command("compact_transaction_events", "--keep-days", "90", stdout=StringIO())
+
+        verifies = TransactionEvent.objects.filter(transaction=self.txn, kind=TransactionEvent.KIND_VERIFY)
+        self.assertEqual(verifies.count(), 1)
+        newest = latest_event(self.txn, TransactionEvent.KIND_VERIFY)
+        self.assertEqual(newest.status, "check-2")
+        self.assertEqual(latest_event(self.txn.pk, TransactionEvent.KIND_WEBHOOK).status, "charge.completed")
+
+
+# ---------------------------------------------------
+# BANK STATEMENT IMPORT
+# ---------------------------------------------------
+STATEMENT = """Date,Narration,Reference,Amount
+17/10/2030,Transfer from ADA OBI BANK 1a2b3c4d5e,FT001,100.00
+17/10/2030,BANK-AAAAAAAAAA tour,FT002,200.00
+18/10/2030,payment for tour,FT003,75.00
+18/10/2030,salary,FT004,999.00
+18/10/2030,charges,FT005,-50.00
+19/10/2030,BANK-1A2B3C4D5E again,FT006,100.00
+"""
+
+
+class ImportBankStatementTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        operator = get_user_model().objects.create_user("op", "op@example.com", "pw", role="operator")
+        service = Service.objects.create(
+            operator=operator, title="Tour", city="Lagos", country="Nigeria",
+            description="d", price=100, is_approved=True,
+        )
+        for reference, amount in [("BANK-1A2B3C4D5E", "100"), ("BANK-AAAAAAAAAA", "250"), ("BANK-0000000001", "75")]:
+            booking = Booking.objects.create(
+                service=service, num_adults=1, given_name="Ada", surname="Obi",
+                contact_number="1", email="ada@example.com", full_contact_address="x",
+                nationality="NG", current_residence="NG", id_card_type="passport",
+                start_date=date(2030, 1, 1), end_date=date(2030, 1, 1),
+            )
+            Transaction.objects.create(
+                booking=booking, reference=reference, amount=Decimal(amount),
+                provider=Transaction.PROVIDER_BANK, status=Transaction.STATUS_PENDING,
+            )
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".csv")
+        with os.fdopen(handle, "w") as statement:
+            statement.write(STATEMENT)
+        self.addCleanup(os.remove, self.path)
+
+    def run_import(self, *args):
+        call_command("import_bank_statement", self.path, *args, stdout=StringIO())
+
+    def line(self, bank_reference):
+        return BankStatementLine.objects.get(bank_reference=bank_reference)
+
+    def status_of(self, reference):
+        return Transaction.objects.get(reference=reference).status
+
+    def test_exact_reference_and_amount_settles_the_transfer(self):
+        self.run_import()
+
+        self.assertEqual(self.status_of("BANK-1A2B3C4D5E"), Transaction.STATUS_SUCCESS)
+        line = self.line("FT001")
+        self.assertEqual((line.status, line.transaction.reference), (BankStatementLine.STATUS_MATCHED, "BANK-1A2B3C4D5E"))
+        self.assertIsNotNone(line.resolved_at)
+        self.assertEqual(Booking.objects.get(transactions__reference="BANK-1A2B3C4D5E").payment_status, Booking.PAYMENT_PAID)
+
+    def test_uncertain_lines_wait_for_review(self):
+        self.run_import()
+
+        self.assertEqual(self.line("FT002").status, BankStatementLine.STATUS_REVIEW)
+        self.assertEqual(self.status_of("BANK-AAAAAAAAAA"), Transaction.STATUS_PENDING)
+        self.assertEqual(self.line("FT003").match_reason, "Amount only")
+        self.assertEqual(self.status_of("BANK-0000000001"), Transaction.STATUS_PENDING)
+        self.assertEqual(self.line("FT004").status, BankStatementLine.STATUS_UNMATCHED)
+        self.assertFalse(BankStatementLine.objects.filter(bank_reference="FT005").exists())
+        # A second credit quoting a settled reference never settles twice
+        self.assertEqual(self.line("FT006").status, BankStatementLine.STATUS_REVIEW)
+
+    def test_reimport_is_idempotent(self):
+        self.run_import()
+        before = list(BankStatementLine.objects.order_by("pk").values_list("pk", "status"))
+
+        self.run_import()
+
+        self.assertEqual(list(BankStatementLine.objects.order_by("pk").values_list("pk", "status")), before)
+
+    def test_dry_run_writes_nothing(self):
+        self.run_import("--dry-run")
+
+        self.assertFalse(BankStatementLine.objects.exists())
+        self.assertEqual(self.status_of("BANK-1A2B3C4D5E"), Transaction.STATUS_PENDING)
+
+
+# ---------------------------------------------------
+# LEDGER ROLLUPS
+# ---------------------------------------------------
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "ledger-tests"}})
+class LedgerRollupTests(TestCase):
+    DAY = date(2030, 3, 4)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.operator = operator = get_user_model().objects.create_user("op", "op@example.com", "pw", role="operator")
+        cls.admin = get_user_model().objects.create_user("admin", "admin@example.com", "pw", is_staff=True)
+        service = Service.objects.create(
+            operator=operator, title="Tour", city="Lagos", country="Nigeria",
+            description="d", price=100, is_approved=True,
+        )
+        cls.booking = Booking.objects.create(
+            service=service, num_adults=1, given_name="Ada", surname="Obi",
+            contact_number="1", email="ada@example.com", full_contact_address="x",
+            nationality="NG", current_residence="NG", id_card_type="passport",
+            start_date=date(2030, 1, 1), end_date=date(2030, 1, 1),
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def make_txn(self, reference, amount, status=Transaction.STATUS_PENDING, day=DAY, provider=Transaction.PROVIDER_BANK):
+        created_at = timezone.make_aware(datetime.combine(day, time(12)))
+        return Transaction.objects.create(
+            booking=self.booking, reference=reference, amount=Decimal(amount),
+            provider=provider, status=status, created_at=created_at,
+        )
+
+    def buckets(self):
+        return {
+            (row.day, row.provider, row.status): (row.count, row.amount)
+            for row in LedgerRollup.objects.filter(count__gt=0)
+        }
+
+    def test_status_and_amount_changes_move_totals_between_buckets(self):
+        txn = self.make_txn("LEDGER-1", "100")
+        self.make_txn("LEDGER-2", "40")
+
+        txn.status = Transaction.STATUS_SUCCESS
+        txn.amount = Decimal("120")
+        txn.save()
+
+        bank = Transaction.PROVIDER_BANK
+        self.assertEqual(self.buckets(), {
+            (self.DAY, bank, Transaction.STATUS_PENDING): (1, Decimal("40")),
+            (self.DAY, bank, Transaction.STATUS_SUCCESS): (1, Decimal("120")),
+        })
+
+        txn.delete()
+
+        self.assertEqual(self.buckets(), {(self.DAY, bank, Transaction.STATUS_PENDING): (1, Decimal("40"))})
+
+    def test_rebuild_matches_incremental_rollups(self):
+        for n, (amount, status) in enumerate([
+            ("100", Transaction.STATUS_SUCCESS),
+            ("40", Transaction.STATUS_PENDING),
+            ("15.50", Transaction.STATUS_SUCCESS),
+        ]):
+            self.make_txn(f"LEDGER-{n}", amount, status)
+        self.make_txn("LEDGER-NEXT", "70", day=self.DAY + timedelta(days=1), provider=Transaction.PROVIDER_FLUTTERWAVE)
+        incremental = self.buckets()
+
+        LedgerRollup.objects.update(count=0, amount=0)
+        written = rebuild_ledger(self.DAY, self.DAY + timedelta(days=1))
+
+        self.assertEqual(written, 3)
+        self.assertEqual(self.buckets(), incremental)
+
+    def test_report_is_admin_only(self):
+        url = reverse("payments:ledger_report")
+        self.assertEqual(self.client.get(url).status_code, 401)
+        self.client.force_login(self.operator)
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.client.force_login(self.admin)
+        self.make_txn("LEDGER-1", "100", Transaction.STATUS_SUCCESS)
+        response = self.client.get(url, {"from": self.DAY.isoformat(), "to": self.DAY.isoformat()})
+
+        self.assertEqual(response.status_code, 200)
+        totals = response.json()["totals"]
+        self.assertEqual([(row["status"], row["count"]) for row in totals], [(Transaction.STATUS_SUCCESS, 1)])
+
+    def test_report_rejects_bad_windows(self):
+        self.client.force_login(self.admin)
+        url = reverse("payments:ledger_report")
+
+        for params in (
+            {"from": "2030-03-05", "to": "2030-03-04"},
+            {"from": "2029-01-01", "to": "2030-03-04"},
+            {"from": "04/03/2030"},
+        ):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(url, params).status_code, 400)
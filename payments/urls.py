@@ -1,6 +1,7 @@
 from django.urls import path
 from . import views
 from . import webhooks
+from .ledger_views import LedgerReportView
 
 from payments.bank_transfer_views import (
     initiate_bank_transfer,
@@ -21,12 +22,13 @@ urlpatterns = [
     path("success/", views.payment_success, name="payment_success"),
     path("cancelled/", views.payment_cancelled, name="payment_cancelled"),
 
-    # 3) Flutterwave webhook
-    path("webhook/", views.flutterwave_webhook, name="flutterwave_webhook"),
+    # 3) Flutterwave webhook (signature-checked, queued for process_webhooks)
+    path("webhook/", webhooks.flutterwave_webhook, name="flutterwave_webhook"),
     path("webhooks/flutterwave/", webhooks.flutterwave_webhook),
 
     # 4) Optional status checker
     path("status/<str:reference>/", views.check_payment_status, name="check_payment_status"),
+    path("status/<str:reference>/wait/", views.wait_payment_status, name="wait_payment_status"),
 
     # Bank transfer
     path("bank/init/<int:booking_id>/", initiate_bank_transfer),
@@ -34,4 +36,7 @@ urlpatterns = [
     path("bank/approve/<str:reference>/", approve_bank_transfer),
     path("bank/reject/<str:reference>/", reject_bank_transfer),
 
+    # Finance reporting (admin)
+    path("ledger/", LedgerReportView.as_view(), name="ledger_report"),
+
 ]
@@ -167,17 +167,19 @@
 #     })
 
 import logging
+import math
 import uuid
 from decimal import Decimal
 
 from django.conf import settings
 from django.shortcuts import redirect
-from django.views.decorators.csrf import csrf_exempt
-from django.http import JsonResponse, HttpResponseBadRequest, HttpResponse
+from django.http import JsonResponse, HttpResponseBadRequest
 
 from bookings.models import Booking
+from bookings.holds import extend_hold
 from .models import Transaction
 from .services import verify_flutterwave_transaction
+from .status import FINAL_STATUSES, get_status_snapshot, wait_for_status_change, waiter_slot
 
 logger = logging.getLogger("payments")
 
@@ -209,7 +211,10 @@ def initialize_payment(request, booking_id):
 
     logger.info(f"[Init Payment] Created Txn {reference} for Booking {booking.id}")
 
-    redirect_url = settings.FLUTTERWAVE_REDIRECT_URL.format(reference=reference)
+    # Give the customer a full hold window to complete checkout
+    extend_hold(booking)
+
+    redirect_url = settings.FLW_REDIRECT_URL.format(reference=reference)
 
     return JsonResponse({
         "payment_url": redirect_url,
@@ -249,61 +254,50 @@ def payment_cancelled(request):
     return redirect(frontend_url)
 
 
-@csrf_exempt
-def flutterwave_webhook(request):
+def check_payment_status(request, reference):
     """
-    Flutterwave webhook verification (server → server).
+    Optional endpoint used by frontend/mobile apps.
+    Served from the cached status snapshot.
     """
-    if request.method != "POST":
-        return HttpResponse("Invalid method", status=405)
-
-    try:
-        payload = request.body.decode("utf-8")
-        import json
-        data = json.loads(payload)
-    except Exception:
-        return HttpResponseBadRequest("Invalid JSON")
-
-    logger.info(f"[FW Webhook] Received: {data}")
-
-    reference = data.get("data", {}).get("tx_ref")
-
-    if not reference:
-        return HttpResponseBadRequest("Missing tx_ref")
-
-    try:
-        txn = Transaction.objects.get(reference=reference)
-    except Transaction.DoesNotExist:
-        return HttpResponseBadRequest("Unknown reference")
-
-    txn.meta = {
-        **(txn.meta or {}),
-        "webhook": data,
-    }
-    txn.save(update_fields=["meta"])
-
-    if data.get("data", {}).get("status") == "successful":
-        verify_flutterwave_transaction(txn)
+    snapshot = get_status_snapshot(reference)
+    if snapshot is None:
+        return JsonResponse({"error": "Invalid reference"}, status=404)
 
-    return HttpResponse("Webhook OK", status=200)
+    return JsonResponse(snapshot)
 
 
-def check_payment_status(request, reference):
+def wait_payment_status(request, reference):
     """
-    Optional endpoint used by frontend/mobile apps.
+    Long-poll replacement for polling check_payment_status: answers as soon
+    as the status differs from ?since= (default: the current status) or is
+    final, otherwise after ?timeout= seconds with "changed": false.
+
+    A held request occupies a worker thread, so each process holds at most
+    PAYMENT_STATUS_MAX_WAITERS of them; beyond that it answers 503 with
+    Retry-After and the client falls back to polling.
     """
-    try:
-        txn = Transaction.objects.get(reference=reference)
-        booking = txn.booking
-    except Transaction.DoesNotExist:
+    snapshot = get_status_snapshot(reference)
+    if snapshot is None:
         return JsonResponse({"error": "Invalid reference"}, status=404)
 
-    return JsonResponse({
-        "reference": txn.reference,
-        "status": txn.status,
-        "provider": txn.provider,
-        "amount": float(txn.amount),
-        "booking_status": booking.status,
-        "payment_status": booking.payment_status,
-        "booked_total_price": float(booking.booked_total_price),
-    })
\ No newline at end of file
+    max_wait = settings.PAYMENT_STATUS_WAIT_TIMEOUT
+    try:
+        timeout = float(request.GET.get("timeout", max_wait))
+    except ValueError:
+        return HttpResponseBadRequest("Invalid timeout")
+    if not math.isfinite(timeout) or timeout < 0:
+        return HttpResponseBadRequest("Invalid timeout")
+    timeout = min(timeout, max_wait)
+
+    since = request.GET.get("since") or snapshot["status"]
+    if snapshot["status"] != since or snapshot["status"] in FINAL_STATUSES or not timeout:
+        return JsonResponse({**snapshot, "changed": snapshot["status"] != since})
+
+    with waiter_slot() as admitted:
+        if not admitted:
+            response = JsonResponse({**snapshot, "changed": False}, status=503)
+            response["Retry-After"] = str(math.ceil(settings.PAYMENT_STATUS_POLL_INTERVAL))
+            return response
+        snapshot = wait_for_status_change(reference, since, timeout) or snapshot
+
+    return JsonResponse({**snapshot, "changed": snapshot["status"] != since})
\ No newline at end of file
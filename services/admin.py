@@ -1,4 +1,6 @@
 from django.contrib import admin
+from django.utils import timezone
+from .cache import bump_catalog_version
 from .models import Service, Package
 from django.contrib import admin
 from .models import Service, ServiceImage, Package
@@ -8,6 +10,7 @@ from .models import (
     Package,
     ServiceAvailability,
     ServiceTimeSlot,
+    SlotInventory,
 )
 
 
@@ -55,8 +58,17 @@ class ServiceAdmin(admin.ModelAdmin):
     #         obj.operator = request.user
     #     super().save_model(request, obj, form, change)
 
+    def _invalidate_catalog(self, queryset):
+        # queryset.update() sends no post_save, so bump the cached catalog here
+        slugs = list(queryset.values_list("slug", flat=True))
+        bump_catalog_version()
+        for slug in slugs:
+            bump_catalog_version(slug)
+
     def approve_services(self, request, queryset):
-        queryset.update(is_approved=True)
+        # updated_at feeds the detail ETag, so stale copies get revalidated
+        queryset.update(is_approved=True, updated_at=timezone.now())
+        self._invalidate_catalog(queryset)
         self.message_user(
             request,
             f"{queryset.count()} service(s) approved successfully."
@@ -65,7 +77,8 @@ class ServiceAdmin(admin.ModelAdmin):
     approve_services.short_description = "Approve selected services"
 
     def reject_services(self, request, queryset):
-        queryset.update(is_approved=False)
+        queryset.update(is_approved=False, updated_at=timezone.now())
+        self._invalidate_catalog(queryset)
         self.message_user(
             request,
             f"{queryset.count()} service(s) rejected."
@@ -82,6 +95,14 @@ class ServiceAvailabilityAdmin(admin.ModelAdmin):
     inlines = [ServiceTimeSlotInline]
 
 
+@admin.register(SlotInventory)
+class SlotInventoryAdmin(admin.ModelAdmin):
+    list_display = ("time_slot", "date", "capacity", "booked", "held", "updated_at")
+    list_filter = ("date",)
+    search_fields = ("time_slot__availability__service__title",)
+    readonly_fields = ("capacity", "booked", "held", "updated_at")
+
+
 @admin.register(Package)
 class PackageAdmin(admin.ModelAdmin):
     list_display = ("name", "service", "price", "duration_days", "is_active")
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ServicesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'services'
+
+    def ready(self):
+        # Ensures signals are registered
+        import services.signals  # noqa: F401
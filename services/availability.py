@@ -0,0 +1,183 @@
+"""
+Weekday bitmask helpers shared by services, availabilities and filters.
+
+Bit 0 is Monday ... bit 6 is Sunday (matching date.weekday()). An
+`available_days` list with no recognised day names (including an empty one)
+means "every day", i.e. ALL_DAYS_MASK.
+
+AvailabilityRule compiles a ServiceAvailability window into mask + exception
+dates and expands it to concrete open dates.
+"""
+from datetime import date, timedelta
+
+WEEKDAY_NAMES = (
+    "Monday",
+    "Tuesday",
+    "Wednesday",
+    "Thursday",
+    "Friday",
+    "Saturday",
+    "Sunday",
+)
+
+ALL_DAYS_MASK = (1 << 7) - 1
+
+
+def weekday_mask(days):
+    """
+    Convert a list of weekday names to a 7-bit mask. Unknown names are ignored;
+    a list with no known names means every day. Migrations 0011/0012 backfill
+    with the same rule.
+    """
+    if not days:
+        return ALL_DAYS_MASK
+
+    lookup = {name.lower(): index for index, name in enumerate(WEEKDAY_NAMES)}
+    mask = 0
+    for day in days:
+        index = lookup.get(str(day).strip().lower())
+        if index is not None:
+            mask |= 1 << index
+    return mask or ALL_DAYS_MASK
+
+
+def parse_weekday(value):
+    """
+    Accept a weekday name ("monday", "Mon") or index ("0".."6"); return the
+    index or None.
+    """
+    value = str(value).strip().lower()
+    if value.isdigit():
+        index = int(value)
+        return index if 0 <= index < 7 else None
+    for index, name in enumerate(WEEKDAY_NAMES):
+        if name.lower().startswith(value) and len(value) >= 3:
+            return index
+    return None
+
+
+def masks_containing(weekdays):
+    """
+    Every mask value that includes at least one of the given weekday indexes.
+
+    Used as `weekday_mask__in=...` so the filter is an IN-list over an
+    indexed column instead of a per-row bitwise expression.
+    """
+    wanted = 0
+    for index in weekdays:
+        wanted |= 1 << index
+    return [mask for mask in range(1, ALL_DAYS_MASK + 1) if mask & wanted]
+
+
+def find_overlaps(intervals):
+    """
+    Sorted interval sweep over inclusive (start, end, key) date ranges.
+
+    Returns (earlier_key, later_key) pairs: every interval that overlaps an
+    interval starting before it is reported once, against the interval with
+    the furthest end seen so far. O(n log n) with no database access.
+    """
+    overlaps = []
+    reach_end = None
+    reach_key = None
+
+    for start, end, key in sorted(intervals, key=lambda item: (item[0], item[1])):
+        if reach_end is not None and start <= reach_end:
+            overlaps.append((reach_key, key))
+        if reach_end is None or end > reach_end:
+            reach_end = end
+            reach_key = key
+
+    return overlaps
+
+
+# ---------------------------------------------------
+# COMPILED RULES
+# ---------------------------------------------------
+def parse_exception_dates(values):
+    """
+    Normalise a list of ISO date strings (or dates) to a sorted list of
+    unique ISO strings. Raises ValueError on anything unparseable.
+    """
+    parsed = set()
+    for value in values or []:
+        parsed.add(value if isinstance(value, date) else date.fromisoformat(str(value)))
+    return [day.isoformat() for day in sorted(parsed)]
+
+
+class AvailabilityRule:
+    """
+    An availability window compiled to an inclusive date range, a weekday
+    mask and a set of exception (blackout) dates.
+
+    `open_dates()` expands the rule arithmetically: for each weekday bit it
+    jumps to the first matching date and steps by 7 days, so the cost is
+    proportional to the number of open dates, not to the window length.
+    """
+    __slots__ = ("start", "end", "mask", "exceptions")
+
+    def __init__(self, start, end, mask=ALL_DAYS_MASK, exceptions=()):
+        self.start = start
+        self.end = end
+        self.mask = mask
+        self.exceptions = frozenset(
+            day if isinstance(day, date) else date.fromisoformat(day) for day in exceptions
+        )
+
+    @classmethod
+    def for_availability(cls, availability):
+        return cls(
+            availability.start_date,
+            availability.end_date,
+            availability.weekday_mask,
+            availability.blackout_dates or (),
+        )
+
+    def is_open(self, day):
+        return (
+            self.start <= day <= self.end
+            and bool(self.mask & (1 << day.weekday()))
+            and day not in self.exceptions
+        )
+
+    def first_open_date(self, date_from=None):
+        """
+        Earliest open date on or after date_from (clipped to the window), or
+        None. Jumps straight to each weekday, skipping exception dates.
+        """
+        first = max(self.start, date_from) if date_from else self.start
+        earliest = None
+        for weekday in range(7):
+            if not self.mask & (1 << weekday):
+                continue
+            day = first + timedelta(days=(weekday - first.weekday()) % 7)
+            while day <= self.end and day in self.exceptions:
+                day += timedelta(days=7)
+            if day <= self.end and (earliest is None or day < earliest):
+                earliest = day
+        return earliest
+
+    def open_dates(self, date_from=None, date_to=None):
+        """
+        Sorted list of open dates within [date_from, date_to] (clipped to the rule's window).
+        """
+        first = max(self.start, date_from) if date_from else self.start
+        last = min(self.end, date_to) if date_to else self.end
+        if first > last:
+            return []
+
+        first_ordinal = first.toordinal()
+        last_ordinal = last.toordinal()
+        first_weekday = first.weekday()
+
+        ordinals = []
+        for weekday in range(7):
+            if self.mask & (1 << weekday):
+                start = first_ordinal + (weekday - first_weekday) % 7
+                ordinals.extend(range(start, last_ordinal + 1, 7))
+        ordinals.sort()
+
+        days = [date.fromordinal(ordinal) for ordinal in ordinals]
+        if self.exceptions:
+            days = [day for day in days if day not in self.exceptions]
+        return days
@@ -0,0 +1,128 @@
+import hashlib
+import logging
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+
+from rest_framework.response import Response
+
+logger = logging.getLogger("services")
+
+GLOBAL_VERSION_KEY = "catalog:version:global"
+SERVICE_VERSION_KEY = "catalog:version:service:{slug}"
+STATS_KEY = "catalog:stats:{kind}"
+
+
+def _timeout():
+    return getattr(settings, "CATALOG_CACHE_TIMEOUT", 600)
+
+
+# ---------------------------------------------------
+# VERSIONS
+# ---------------------------------------------------
+# Versions are opaque tokens replaced on every change (a plain `set`), not
+# counters, because `incr` is not atomic on the file-based backend shared by
+# our Passenger processes. A lost or evicted token only causes cache misses.
+def _new_token():
+    return str(time.time_ns())
+
+
+def _get_version(key):
+    version = cache.get(key)
+    if version is None:
+        version = _new_token()
+        cache.set(key, version, None)
+    return version
+
+
+def get_catalog_version(slug=None):
+    if slug is None:
+        return _get_version(GLOBAL_VERSION_KEY)
+    return _get_version(SERVICE_VERSION_KEY.format(slug=slug))
+
+
+def bump_catalog_version(slug=None):
+    """
+    Invalidate cached catalog responses: always the global list version, and
+    the per-service version when a slug is given.
+    """
+    cache.set(GLOBAL_VERSION_KEY, _new_token(), None)
+    if slug:
+        cache.set(SERVICE_VERSION_KEY.format(slug=slug), _new_token(), None)
+
+
+# ---------------------------------------------------
+# HIT / MISS COUNTERS (approximate on the file backend)
+# ---------------------------------------------------
+def _record(kind):
+    key = STATS_KEY.format(kind=kind)
+    try:
+        cache.add(key, 0, None)
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def catalog_cache_stats():
+    hits = cache.get(STATS_KEY.format(kind="hit"), 0)
+    misses = cache.get(STATS_KEY.format(kind="miss"), 0)
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": round(hits / total, 4) if total else None,
+        "global_version": get_catalog_version(),
+    }
+
+
+# ---------------------------------------------------
+# RESPONSE CACHE
+# ---------------------------------------------------
+def build_cache_key(request, scope, version):
+    query = "&".join(
+        f"{key}={value}"
+        for key in sorted(request.query_params)
+        for value in request.query_params.getlist(key)
+    )
+    raw = f"{request.get_host()}|{request.path}|{query}|{request.accepted_renderer.format}"
+    digest = hashlib.sha256(raw.encode("utf-8")).hexdigest()
+    return f"catalog:response:{scope}:{version}:{digest}"
+
+
+def cache_catalog_response(scope, per_service=False):
+    """
+    Cache anonymous GET responses of a DRF view method.
+
+    The key covers host, path, query params and the catalog version (global,
+    or per-service when `per_service` is set and the view receives `slug`).
+    Only 200 responses are stored; the serialized `response.data` is cached,
+    so hits skip the database and serialization entirely.
+    """
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(view, request, *args, **kwargs):
+            if request.method != "GET" or request.user.is_authenticated:
+                return view_method(view, request, *args, **kwargs)
+
+            slug = kwargs.get("slug") if per_service else None
+            key = build_cache_key(request, scope, get_catalog_version(slug))
+
+            cached = cache.get(key)
+            if cached is not None:
+                _record("hit")
+                response = Response(cached)
+                response["X-Cache"] = "HIT"
+                return response
+
+            _record("miss")
+            response = view_method(view, request, *args, **kwargs)
+
+            if response.status_code == 200:
+                cache.set(key, response.data, _timeout())
+            response["X-Cache"] = "MISS"
+            return response
+
+        return wrapper
+    return decorator
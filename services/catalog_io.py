@@ -0,0 +1,344 @@
+"""
+Bulk catalog import/export used by `manage.py catalog_import` / `catalog_export`.
+
+A catalog record is one service with its packages, availabilities and time
+slots nested (JSONL), or one CSV row whose `packages` / `availabilities`
+columns hold the same nested lists as JSON.
+"""
+import csv
+import json
+from datetime import date, time
+from decimal import Decimal, InvalidOperation
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from .availability import find_overlaps, parse_exception_dates, weekday_mask
+from .cache import bump_catalog_version
+from .models import (
+    Service,
+    Package,
+    ServiceAvailability,
+    ServiceTimeSlot,
+    allocate_unique_slugs,
+)
+from .search import index_services
+
+SERVICE_FIELDS = [
+    "title",
+    "category",
+    "city",
+    "country",
+    "description",
+    "tour_inclusive",
+    "duration_hours",
+    "price",
+    "min_age",
+    "available_days",
+    "is_active",
+    "is_approved",
+]
+PACKAGE_FIELDS = ["name", "description", "price", "duration_days", "max_people", "is_active"]
+AVAILABILITY_FIELDS = ["start_date", "end_date", "available_days", "blackout_dates", "is_active"]
+TIME_SLOT_FIELDS = ["start_time", "end_time", "capacity", "is_active"]
+
+CSV_COLUMNS = ["slug", "operator"] + SERVICE_FIELDS + ["packages", "availabilities"]
+
+
+class CatalogRecordError(ValueError):
+    pass
+
+
+# ---------------------------------------------------
+# READING / WRITING
+# ---------------------------------------------------
+def read_records(handle, fmt):
+    """
+    Yield (line_number, record) pairs from a JSONL or CSV stream without
+    loading the whole file.
+    """
+    if fmt == "jsonl":
+        for line_number, line in enumerate(handle, start=1):
+            if line.strip():
+                try:
+                    yield line_number, json.loads(line)
+                except json.JSONDecodeError as exc:
+                    yield line_number, CatalogRecordError(f"Invalid JSON: {exc}")
+        return
+
+    for line_number, row in enumerate(csv.DictReader(handle), start=2):
+        record = {key: value for key, value in row.items() if key and value not in ("", None)}
+        try:
+            for key in ("packages", "availabilities", "available_days"):
+                if key in record:
+                    record[key] = json.loads(record[key])
+        except json.JSONDecodeError as exc:
+            yield line_number, CatalogRecordError(f"Invalid JSON in column: {exc}")
+            continue
+        yield line_number, record
+
+
+def service_to_record(service):
+    """
+    Nested export record; expects packages and availabilities__time_slots
+    to be prefetched.
+    """
+    def plain(value):
+        if isinstance(value, Decimal):
+            return str(value)
+        if isinstance(value, (date, time)):
+            return value.isoformat()
+        return value
+
+    return {
+        "slug": service.slug,
+        "operator": service.operator.username,
+        **{field: plain(getattr(service, field)) for field in SERVICE_FIELDS},
+        "packages": [
+            {field: plain(getattr(package, field)) for field in PACKAGE_FIELDS}
+            for package in service.packages.all()
+        ],
+        "availabilities": [
+            {
+                **{field: plain(getattr(availability, field)) for field in AVAILABILITY_FIELDS},
+                "time_slots": [
+                    {field: plain(getattr(slot, field)) for field in TIME_SLOT_FIELDS}
+                    for slot in availability.time_slots.all()
+                ],
+            }
+            for availability in service.availabilities.all()
+        ],
+    }
+
+
+def write_record(writer, record, fmt):
+    if fmt == "jsonl":
+        writer.write(json.dumps(record, ensure_ascii=False) + "\n")
+        return
+
+    row = dict(record)
+    for key in ("packages", "availabilities", "available_days"):
+        row[key] = json.dumps(row.get(key) or [], ensure_ascii=False)
+    writer.writerow(row)
+
+
+def csv_writer(handle):
+    writer = csv.DictWriter(handle, fieldnames=CSV_COLUMNS, extrasaction="ignore")
+    writer.writeheader()
+    return writer
+
+
+# ---------------------------------------------------
+# VALIDATION
+# ---------------------------------------------------
+def _bool(value, default=True):
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "true", "yes", "y")
+
+
+def _decimal(value, label):
+    try:
+        return Decimal(str(value))
+    except (InvalidOperation, TypeError):
+        raise CatalogRecordError(f"{label}: invalid amount {value!r}")
+
+
+def _optional_int(value):
+    return None if value in (None, "") else int(value)
+
+
+def build_service(record, operator):
+    """
+    Validate a record and return unsaved (service, packages, availabilities)
+    where availabilities is a list of (availability, [time slots]).
+    """
+    try:
+        service = Service(
+            operator=operator,
+            title=record.get("title", ""),
+            category=record.get("category") or "tour",
+            city=record.get("city", ""),
+            country=record.get("country", ""),
+            description=record.get("description", ""),
+            tour_inclusive=record.get("tour_inclusive") or "",
+            duration_hours=_optional_int(record.get("duration_hours")),
+            price=_decimal(record.get("price"), "price"),
+            min_age=_optional_int(record.get("min_age")),
+            available_days=record.get("available_days") or [],
+            is_active=_bool(record.get("is_active")),
+            is_approved=_bool(record.get("is_approved"), default=False),
+        )
+        service.weekday_mask = weekday_mask(service.available_days)
+        service.full_clean(exclude=["slug", "operator"], validate_unique=False)
+
+        packages = []
+        for item in record.get("packages") or []:
+            package = Package(
+                name=item.get("name", ""),
+                description=item.get("description") or "",
+                price=_decimal(item.get("price"), f"package {item.get('name')!r} price"),
+                duration_days=_optional_int(item.get("duration_days")),
+                max_people=_optional_int(item.get("max_people")),
+                is_active=_bool(item.get("is_active")),
+            )
+            package.full_clean(exclude=["service"], validate_unique=False)
+            packages.append(package)
+
+        if len({package.name for package in packages}) != len(packages):
+            raise CatalogRecordError("Duplicate package names.")
+
+        availabilities = []
+        for item in record.get("availabilities") or []:
+            availability = ServiceAvailability(
+                start_date=date.fromisoformat(item["start_date"]),
+                end_date=date.fromisoformat(item["end_date"]),
+                available_days=item.get("available_days") or [],
+                blackout_dates=parse_exception_dates(item.get("blackout_dates")),
+                is_active=_bool(item.get("is_active")),
+            )
+            if availability.end_date < availability.start_date:
+                raise CatalogRecordError(
+                    f"Availability {availability.start_date} ends before it starts."
+                )
+
+            slots = []
+            for slot_item in item.get("time_slots") or []:
+                slot = ServiceTimeSlot(
+                    start_time=time.fromisoformat(slot_item["start_time"]),
+                    end_time=time.fromisoformat(slot_item["end_time"]),
+                    capacity=int(slot_item["capacity"]),
+                    is_active=_bool(slot_item.get("is_active")),
+                )
+                slot.full_clean(exclude=["availability"])
+                slots.append(slot)
+
+            availabilities.append((availability, slots))
+
+        overlaps = find_overlaps(
+            (availability.start_date, availability.end_date, index)
+            for index, (availability, _) in enumerate(availabilities)
+        )
+        if overlaps:
+            first, second = overlaps[0]
+            raise CatalogRecordError(
+                f"Availabilities #{first + 1} and #{second + 1} overlap."
+            )
+
+    except ValidationError as exc:
+        raise CatalogRecordError("; ".join(
+            f"{field}: {' '.join(messages)}" for field, messages in exc.message_dict.items()
+        ))
+    except (KeyError, TypeError, ValueError) as exc:
+        if isinstance(exc, CatalogRecordError):
+            raise
+        raise CatalogRecordError(f"Invalid record: {exc}")
+
+    return service, packages, availabilities
+
+
+def resolve_operators(identifiers):
+    """
+    Map operator usernames/emails to users with one query per batch.
+    """
+    identifiers = {identifier for identifier in identifiers if identifier}
+    if not identifiers:
+        return {}
+
+    User = get_user_model()
+    users = User.objects.filter(username__in=identifiers) | User.objects.filter(email__in=identifiers)
+
+    resolved = {}
+    for user in users:
+        resolved[user.username] = user
+        if user.email:
+            resolved[user.email] = user
+    return resolved
+
+
+# ---------------------------------------------------
+# BULK WRITE
+# ---------------------------------------------------
+def bulk_create_windows(windows):
+    """
+    bulk_create (availability, [time slots]) pairs whose service_id is set and
+    whose windows are already known not to overlap. Must run inside a
+    transaction. Returns (availabilities, slots) with primary keys filled in.
+
+    Availability ids are re-read by (service, start_date), which is unique once
+    overlaps are excluded, since bulk_create does not return pks on MySQL.
+    """
+    availabilities = [availability for availability, _ in windows]
+    for availability in availabilities:
+        availability.weekday_mask = weekday_mask(availability.available_days)
+
+    ServiceAvailability.objects.bulk_create(availabilities)
+
+    ids = {
+        (service_id, start_date): pk
+        for pk, service_id, start_date in ServiceAvailability.objects.filter(
+            service_id__in={availability.service_id for availability in availabilities},
+            start_date__in={availability.start_date for availability in availabilities},
+        ).values_list("pk", "service_id", "start_date")
+    }
+
+    slots = []
+    for availability, availability_slots in windows:
+        availability.pk = ids[(availability.service_id, availability.start_date)]
+        for slot in availability_slots:
+            slot.availability_id = availability.pk
+            slots.append(slot)
+
+    ServiceTimeSlot.objects.bulk_create(slots)
+    return availabilities, slots
+
+
+def import_batch(built):
+    """
+    Insert a batch of validated (service, packages, availabilities) tuples in
+    one transaction using bulk_create, and return row counts.
+
+    Primary keys are re-read by natural key (slug, (service, start_date))
+    rather than trusted from bulk_create, which does not return them on MySQL.
+    """
+    if not built:
+        return {"services": 0, "packages": 0, "availabilities": 0, "time_slots": 0}
+
+    services = [service for service, _, _ in built]
+    for service, slug in zip(services, allocate_unique_slugs([s.title for s in services])):
+        service.slug = slug
+
+    with transaction.atomic():
+        Service.objects.bulk_create(services)
+        ids = dict(
+            Service.objects.filter(slug__in=[s.slug for s in services]).values_list("slug", "pk")
+        )
+        for service in services:
+            service.pk = ids[service.slug]
+
+        packages = []
+        windows = []
+        for service, service_packages, service_availabilities in built:
+            for package in service_packages:
+                package.service_id = service.pk
+                packages.append(package)
+            for availability, availability_slots in service_availabilities:
+                availability.service_id = service.pk
+                windows.append((availability, availability_slots))
+
+        Package.objects.bulk_create(packages)
+        availabilities, slots = bulk_create_windows(windows)
+
+    # bulk_create skips model signals: refresh search + catalog cache explicitly
+    index_services(services)
+    bump_catalog_version()
+
+    return {
+        "services": len(services),
+        "packages": len(packages),
+        "availabilities": len(availabilities),
+        "time_slots": len(slots),
+    }
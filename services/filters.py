@@ -0,0 +1,158 @@
+import django_filters
+from django.db.models import Count, Exists, Max, Min, OuterRef, Q
+
+from .availability import WEEKDAY_NAMES, masks_containing, parse_weekday
+from .models import Service, Package, ServiceAvailability
+
+
+class ServiceFilter(django_filters.FilterSet):
+    """
+    Catalog filters for ServiceViewSet.
+
+    ?category=tour&city=lagos&country=nigeria
+    ?min_price=100&max_price=500   (service price OR any active package price)
+    ?age=8                          (services without a min_age, or min_age <= 8)
+    ?min_duration=2&max_duration=6  (hours)
+    ?weekday=saturday,sunday        (open on any of the given days)
+    ?open_on=2026-12-24             (an active availability is open that date)
+    """
+    category = django_filters.ChoiceFilter(choices=Service.CATEGORY_CHOICES)
+    city = django_filters.CharFilter(field_name="city", lookup_expr="iexact")
+    country = django_filters.CharFilter(field_name="country", lookup_expr="iexact")
+
+    min_price = django_filters.NumberFilter(method="filter_price")
+    max_price = django_filters.NumberFilter(method="filter_price")
+
+    age = django_filters.NumberFilter(method="filter_age")
+
+    min_duration = django_filters.NumberFilter(field_name="duration_hours", lookup_expr="gte")
+    max_duration = django_filters.NumberFilter(field_name="duration_hours", lookup_expr="lte")
+
+    weekday = django_filters.CharFilter(method="filter_weekday")
+    open_on = django_filters.DateFilter(method="filter_open_on")
+
+    class Meta:
+        model = Service
+        fields = ["category", "city", "country", "min_age"]
+
+    def filter_price(self, queryset, name, value):
+        # Both bounds are applied together on the first call
+        if getattr(self, "_price_filtered", False):
+            return queryset
+        self._price_filtered = True
+
+        low = self.form.cleaned_data.get("min_price")
+        high = self.form.cleaned_data.get("max_price")
+
+        service_q = Q()
+        package_q = Q()
+        if low is not None:
+            service_q &= Q(price__gte=low)
+            package_q &= Q(price__gte=low)
+        if high is not None:
+            service_q &= Q(price__lte=high)
+            package_q &= Q(price__lte=high)
+
+        package_match = Package.objects.filter(
+            package_q, service=OuterRef("pk"), is_active=True
+        )
+        return queryset.filter(service_q | Q(Exists(package_match)))
+
+    def filter_age(self, queryset, name, value):
+        return queryset.filter(Q(min_age__isnull=True) | Q(min_age__lte=value))
+
+    def filter_weekday(self, queryset, name, value):
+        weekdays = [parse_weekday(part) for part in value.split(",") if part.strip()]
+        weekdays = [day for day in weekdays if day is not None]
+        if not weekdays:
+            return queryset.none()
+        return queryset.filter(weekday_mask__in=masks_containing(weekdays))
+
+    def filter_open_on(self, queryset, name, value):
+        # Window + weekday narrow in SQL; blackout dates are checked on the few candidates
+        candidates = ServiceAvailability.objects.filter(
+            is_active=True,
+            start_date__lte=value,
+            end_date__gte=value,
+            weekday_mask__in=masks_containing([value.weekday()]),
+        ).values_list("service_id", "blackout_dates")
+
+        day = value.isoformat()
+        service_ids = {service_id for service_id, blackout in candidates if day not in (blackout or [])}
+        return queryset.filter(pk__in=service_ids)
+
+
+# Duration facet buckets in hours, inclusive (min, max); None is open-ended.
+# Each maps onto ?min_duration=&max_duration=.
+DURATION_BUCKETS = (
+    (None, 2),
+    (3, 4),
+    (5, 8),
+    (9, 24),
+    (25, None),
+)
+
+
+def _duration_q(low, high):
+    q = Q(duration_hours__isnull=False)
+    if low is not None:
+        q &= Q(duration_hours__gte=low)
+    if high is not None:
+        q &= Q(duration_hours__lte=high)
+    return q
+
+
+def service_facets(queryset):
+    """
+    Facet counts over an (already filtered) service queryset: one grouped
+    query per dimension, one conditional aggregate for weekdays/durations/
+    service prices and one aggregate over package prices.
+
+    The price range spans service prices and active package prices, the
+    same prices ?min_price/?max_price match against. `min_age` counts each
+    distinct minimum age (null: no age limit).
+    """
+    queryset = queryset.order_by()
+
+    def grouped(field):
+        return [
+            {"value": row[field], "count": row["count"]}
+            for row in queryset.values(field).annotate(count=Count("pk")).order_by("-count", field)
+        ]
+
+    weekday_counts = {
+        f"weekday_{index}": Count("pk", filter=Q(weekday_mask__in=masks_containing([index])))
+        for index in range(len(WEEKDAY_NAMES))
+    }
+    duration_counts = {
+        f"duration_{index}": Count("pk", filter=_duration_q(low, high))
+        for index, (low, high) in enumerate(DURATION_BUCKETS)
+    }
+    totals = queryset.aggregate(
+        min_price=Min("price"),
+        max_price=Max("price"),
+        **weekday_counts,
+        **duration_counts,
+    )
+    package_prices = Package.objects.filter(
+        service__in=queryset.values("pk"), is_active=True
+    ).aggregate(min_price=Min("price"), max_price=Max("price"))
+
+    low = [price for price in (totals["min_price"], package_prices["min_price"]) if price is not None]
+    high = [price for price in (totals["max_price"], package_prices["max_price"]) if price is not None]
+
+    return {
+        "category": grouped("category"),
+        "city": grouped("city"),
+        "country": grouped("country"),
+        "min_age": grouped("min_age"),
+        "duration_hours": [
+            {"min": low, "max": high, "count": totals[f"duration_{index}"]}
+            for index, (low, high) in enumerate(DURATION_BUCKETS)
+        ],
+        "weekday": [
+            {"value": name, "count": totals[f"weekday_{index}"]}
+            for index, name in enumerate(WEEKDAY_NAMES)
+        ],
+        "price": {"min": min(low, default=None), "max": max(high, default=None)},
+    }
@@ -0,0 +1,229 @@
+import logging
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import ServiceTimeSlot, SlotInventory
+
+logger = logging.getLogger("services")
+
+
+class InsufficientSeats(Exception):
+    def __init__(self, time_slot, date, requested, remaining):
+        self.time_slot = time_slot
+        self.date = date
+        self.requested = requested
+        self.remaining = remaining
+        super().__init__(f"{requested} seat(s) requested, {remaining} remaining")
+
+
+# ---------------------------------------------------
+# ROW ACCESS
+# ---------------------------------------------------
+def get_inventory_row(time_slot, date):
+    """
+    Return the SlotInventory row for (time_slot, date), creating it on first use.
+    Safe under concurrent first-use: a losing INSERT falls back to a locking
+    read, which sees the winner's committed row even where a plain read
+    would not (MySQL REPEATABLE READ snapshots).
+    """
+    row = SlotInventory.objects.filter(time_slot_id=time_slot.pk, date=date).first()
+    if row is not None:
+        return row
+
+    try:
+        with transaction.atomic():
+            return SlotInventory.objects.create(
+                time_slot_id=time_slot.pk,
+                date=date,
+                capacity=time_slot.capacity,
+            )
+    except IntegrityError:
+        with transaction.atomic():
+            return SlotInventory.objects.select_for_update().get(time_slot_id=time_slot.pk, date=date)
+
+
+def inventory_map(slot_ids, date_from=None, date_to=None):
+    """
+    Load inventory rows for many slots in one query.
+    Returns {(time_slot_id, date): SlotInventory}.
+    """
+    qs = SlotInventory.objects.filter(time_slot_id__in=list(slot_ids))
+    if date_from is not None:
+        qs = qs.filter(date__gte=date_from)
+    if date_to is not None:
+        qs = qs.filter(date__lte=date_to)
+
+    return {(row.time_slot_id, row.date): row for row in qs}
+
+
+# ---------------------------------------------------
+# COUNTER UPDATES
+# ---------------------------------------------------
+def apply_delta(time_slot, date, booked=0, held=0):
+    """
+    Atomically add (or subtract) seats on the booked/held counters.
+    Counters are clamped at zero so a stale release can never go negative.
+    """
+    if not booked and not held:
+        return
+
+    get_inventory_row(time_slot, date)
+
+    updates = {"updated_at": timezone.now()}
+    if booked:
+        updates["booked"] = Greatest(F("booked") + booked, 0)
+    if held:
+        updates["held"] = Greatest(F("held") + held, 0)
+
+    SlotInventory.objects.filter(time_slot_id=time_slot.pk, date=date).update(**updates)
+
+
+def reserve_seats(time_slot, date, seats, bucket="held"):
+    """
+    Claim seats with a single conditional UPDATE: the counter only moves if
+    capacity still covers booked + held + seats, so concurrent buyers can
+    never oversell. No row is locked beyond the UPDATE itself (held until the
+    surrounding transaction commits). Raises InsufficientSeats otherwise.
+    """
+    get_inventory_row(time_slot, date)
+
+    claimed = SlotInventory.objects.filter(
+        time_slot_id=time_slot.pk,
+        date=date,
+        capacity__gte=F("booked") + F("held") + seats,
+    ).update(**{bucket: F(bucket) + seats, "updated_at": timezone.now()})
+
+    if not claimed:
+        row = SlotInventory.objects.get(time_slot_id=time_slot.pk, date=date)
+        raise InsufficientSeats(time_slot, date, seats, row.remaining)
+
+
+def move_booking_seats(old, new):
+    """
+    Apply a booking transition to the inventory.
+
+    `old` / `new` are (time_slot, date, seats, bucket) tuples or None, where
+    bucket is "held", "booked" or None. Covers create, cancel/reject, payment
+    (held -> booked) and slot/date/traveler changes with one code path.
+    """
+    if old == new:
+        return
+
+    with transaction.atomic():
+        if old and old[0] is not None and old[3]:
+            time_slot, date, seats, bucket = old
+            apply_delta(time_slot, date, **{bucket: -seats})
+
+        if new and new[0] is not None and new[3]:
+            time_slot, date, seats, bucket = new
+            apply_delta(time_slot, date, **{bucket: seats})
+
+
+def sync_capacity(time_slot):
+    """
+    Propagate a slot capacity change to today's and future inventory rows.
+    """
+    SlotInventory.objects.filter(
+        time_slot_id=time_slot.pk,
+        date__gte=timezone.localdate(),
+    ).exclude(capacity=time_slot.capacity).update(
+        capacity=time_slot.capacity,
+        updated_at=timezone.now(),
+    )
+
+
+# ---------------------------------------------------
+# REBUILD / VERIFY
+# ---------------------------------------------------
+def compute_expected_counters(slot_ids=None):
+    """
+    Recompute {(time_slot_id, date): {"booked": n, "held": n}} from Booking rows.
+    """
+    from bookings.models import Booking  # local import to avoid circular imports
+
+    qs = Booking.objects.filter(time_slot__isnull=False).exclude(
+        status__in=[Booking.STATUS_CANCELLED, Booking.STATUS_REJECTED]
+    )
+    if slot_ids is not None:
+        qs = qs.filter(time_slot_id__in=list(slot_ids))
+
+    rows = qs.values("time_slot_id", "start_date", "status").annotate(
+        seats=Sum(F("num_adults") + F("num_children"))
+    )
+
+    expected = defaultdict(lambda: {"booked": 0, "held": 0})
+    for row in rows:
+        if row["status"] in Booking.HELD_STATUSES:
+            bucket = "held"
+        elif row["status"] in Booking.BOOKED_STATUSES:
+            bucket = "booked"
+        else:
+            continue
+        key = (row["time_slot_id"], row["start_date"])
+        expected[key][bucket] += row["seats"] or 0
+
+    return dict(expected)
+
+
+def rebuild_inventory(slot_ids=None, dry_run=False):
+    """
+    Compare the ledger against Booking rows and (unless dry_run) fix drift.
+    Returns a list of (time_slot_id, date, current, expected) mismatches.
+    """
+    expected = compute_expected_counters(slot_ids)
+
+    existing_qs = SlotInventory.objects.all()
+    if slot_ids is not None:
+        existing_qs = existing_qs.filter(time_slot_id__in=list(slot_ids))
+    existing = {(row.time_slot_id, row.date): row for row in existing_qs}
+
+    capacities = dict(
+        ServiceTimeSlot.objects.filter(
+            pk__in={key[0] for key in expected} | {key[0] for key in existing}
+        ).values_list("pk", "capacity")
+    )
+
+    mismatches = []
+    to_create = []
+    to_update = []
+    now = timezone.now()
+
+    for key in set(expected) | set(existing):
+        want = expected.get(key, {"booked": 0, "held": 0})
+        row = existing.get(key)
+        capacity = capacities.get(key[0], 0)
+
+        if row is None:
+            mismatches.append((key[0], key[1], None, want))
+            to_create.append(SlotInventory(
+                time_slot_id=key[0],
+                date=key[1],
+                capacity=capacity,
+                booked=want["booked"],
+                held=want["held"],
+            ))
+            continue
+
+        current = {"booked": row.booked, "held": row.held}
+        if current != want:
+            mismatches.append((key[0], key[1], current, want))
+            row.booked = want["booked"]
+            row.held = want["held"]
+            row.updated_at = now
+            to_update.append(row)
+
+    if not dry_run and (to_create or to_update):
+        with transaction.atomic():
+            SlotInventory.objects.bulk_create(to_create, batch_size=500)
+            SlotInventory.objects.bulk_update(
+                to_update, ["booked", "held", "updated_at"], batch_size=500
+            )
+        logger.info(
+            f"[Inventory] Rebuilt ledger: {len(to_create)} created, {len(to_update)} corrected"
+        )
+
+    return mismatches
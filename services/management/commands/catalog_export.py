@@ -0,0 +1,75 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Prefetch
+
+from services.catalog_io import csv_writer, service_to_record, write_record
+from services.models import Service, ServiceAvailability
+
+
+class Command(BaseCommand):
+    help = "Stream the service catalog (with packages, availabilities and time slots) to CSV or JSONL"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path",
+            nargs="?",
+            default="-",
+            help="Output file (default: stdout).",
+        )
+        parser.add_argument(
+            "--format",
+            choices=["csv", "jsonl"],
+            help="Output format (default: guessed from the extension, jsonl for stdout).",
+        )
+        parser.add_argument("--operator", help="Only export services owned by this username.")
+        parser.add_argument(
+            "--active-only",
+            action="store_true",
+            help="Skip inactive or unapproved services.",
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or ("csv" if path.lower().endswith(".csv") else "jsonl")
+
+        queryset = (
+            Service.objects.select_related("operator")
+            .prefetch_related(
+                "packages",
+                Prefetch(
+                    "availabilities",
+                    queryset=ServiceAvailability.objects.prefetch_related("time_slots"),
+                ),
+            )
+            .order_by("pk")
+        )
+        if options["operator"]:
+            queryset = queryset.filter(operator__username=options["operator"])
+        if options["active_only"]:
+            queryset = queryset.filter(is_active=True, is_approved=True)
+
+        to_stdout = path == "-"
+        try:
+            handle = sys.stdout if to_stdout else open(path, "w", newline="", encoding="utf-8")
+        except OSError as exc:
+            raise CommandError(f"Cannot open {path}: {exc}")
+
+        started = time.monotonic()
+        count = 0
+        try:
+            writer = csv_writer(handle) if fmt == "csv" else handle
+            # iterator(chunk_size) keeps memory flat while still prefetching per chunk
+            for service in queryset.iterator(chunk_size=options["batch_size"]):
+                write_record(writer, service_to_record(service), fmt)
+                count += 1
+        finally:
+            if not to_stdout:
+                handle.close()
+
+        elapsed = max(time.monotonic() - started, 1e-6)
+        message = f"✅ Exported {count} service(s) in {elapsed:.2f}s ({count / elapsed:.1f} services/s)"
+        # Keep stdout clean for piping when streaming records there
+        (self.stderr if to_stdout else self.stdout).write(self.style.SUCCESS(message))
@@ -0,0 +1,123 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from services.catalog_io import (
+    CatalogRecordError,
+    build_service,
+    import_batch,
+    read_records,
+    resolve_operators,
+)
+
+
+class Command(BaseCommand):
+    help = "Bulk import services (with packages, availabilities and time slots) from CSV or JSONL"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or JSONL file to import.")
+        parser.add_argument(
+            "--format",
+            choices=["csv", "jsonl"],
+            help="File format (default: guessed from the extension).",
+        )
+        parser.add_argument(
+            "--operator",
+            help="Username or email of the operator owning rows without an `operator` column.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=200,
+            help="Services written per transaction (default: 200).",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Validate every row without writing anything.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or ("csv" if path.lower().endswith(".csv") else "jsonl")
+        batch_size = max(options["batch_size"], 1)
+        dry_run = options["dry_run"]
+
+        if not os.path.exists(path):
+            raise CommandError(f"File not found: {path}")
+
+        default_operator = None
+        if options["operator"]:
+            default_operator = resolve_operators([options["operator"]]).get(options["operator"])
+            if default_operator is None:
+                raise CommandError(f"Unknown operator: {options['operator']}")
+
+        self.stdout.write(self.style.WARNING(f"📥 Importing catalog from {path} ({fmt})…"))
+
+        totals = {"services": 0, "packages": 0, "availabilities": 0, "time_slots": 0}
+        errors = 0
+        started = time.monotonic()
+
+        with open(path, newline="", encoding="utf-8") as handle:
+            chunk = []
+            for line_number, record in read_records(handle, fmt):
+                chunk.append((line_number, record))
+                if len(chunk) >= batch_size:
+                    errors += self._import_chunk(chunk, default_operator, dry_run, totals)
+                    chunk = []
+            if chunk:
+                errors += self._import_chunk(chunk, default_operator, dry_run, totals)
+
+        elapsed = max(time.monotonic() - started, 1e-6)
+        verb = "Validated" if dry_run else "Imported"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ {verb} {totals['services']} service(s), {totals['packages']} package(s), "
+                f"{totals['availabilities']} availability window(s), {totals['time_slots']} time slot(s) "
+                f"in {elapsed:.2f}s ({totals['services'] / elapsed:.1f} services/s)"
+            )
+        )
+        if errors:
+            self.stdout.write(self.style.ERROR(f"❌ {errors} row(s) skipped"))
+
+    def _import_chunk(self, chunk, default_operator, dry_run, totals):
+        operators = resolve_operators(
+            record.get("operator")
+            for _, record in chunk
+            if isinstance(record, dict)
+        )
+
+        built = []
+        errors = 0
+        for line_number, record in chunk:
+            try:
+                if isinstance(record, CatalogRecordError):
+                    raise record
+                if not isinstance(record, dict):
+                    raise CatalogRecordError("Expected an object per line.")
+
+                operator = operators.get(record.get("operator")) or default_operator
+                if operator is None:
+                    raise CatalogRecordError(
+                        f"Unknown operator {record.get('operator')!r} and no --operator given."
+                    )
+
+                built.append(build_service(record, operator))
+            except CatalogRecordError as exc:
+                errors += 1
+                self.stdout.write(self.style.ERROR(f"❌ Line {line_number}: {exc}"))
+
+        if dry_run:
+            counts = {
+                "services": len(built),
+                "packages": sum(len(packages) for _, packages, _ in built),
+                "availabilities": sum(len(windows) for _, _, windows in built),
+                "time_slots": sum(len(slots) for _, _, windows in built for _, slots in windows),
+            }
+        else:
+            counts = import_batch(built)
+
+        for key, value in counts.items():
+            totals[key] += value
+        return errors
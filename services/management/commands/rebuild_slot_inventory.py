@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from services.models import Service, ServiceTimeSlot
+from services.inventory import rebuild_inventory
+
+
+class Command(BaseCommand):
+    help = "Recompute per-date slot inventory counters from Booking rows"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Only report drift, do not write any changes.",
+        )
+        parser.add_argument(
+            "--service",
+            help="Limit to a single service slug.",
+        )
+
+    def handle(self, *args, **options):
+        verify_only = options["verify"]
+        slot_ids = None
+
+        if options["service"]:
+            service = Service.objects.filter(slug=options["service"]).first()
+            if not service:
+                raise CommandError(f"Unknown service slug: {options['service']}")
+            slot_ids = list(
+                ServiceTimeSlot.objects.filter(
+                    availability__service=service
+                ).values_list("pk", flat=True)
+            )
+
+        mode = "Verifying" if verify_only else "Rebuilding"
+        self.stdout.write(self.style.WARNING(f"🔄 {mode} slot inventory…"))
+
+        mismatches = rebuild_inventory(slot_ids=slot_ids, dry_run=verify_only)
+
+        for slot_id, date, current, expected in sorted(mismatches, key=lambda m: (m[0], m[1])):
+            self.stdout.write(
+                f"   - Slot #{slot_id} on {date}: ledger={current or 'missing'} | bookings={expected}"
+            )
+
+        if not mismatches:
+            self.stdout.write(self.style.SUCCESS("✅ Slot inventory is consistent"))
+        elif verify_only:
+            self.stdout.write(
+                self.style.ERROR(f"❌ {len(mismatches)} inventory row(s) out of sync")
+            )
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(f"✅ Corrected {len(mismatches)} inventory row(s)")
+            )
@@ -0,0 +1,47 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from services.models import Service
+from services.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Refresh the service full-text search index"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--minutes",
+            type=int,
+            default=60,
+            help="Reindex services updated in the last N minutes (default: 60).",
+        )
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Reindex every service instead of only recent changes.",
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        queryset = Service.objects.order_by("pk")
+
+        if options["full"]:
+            self.stdout.write(self.style.WARNING("🔄 Rebuilding full search index…"))
+            backend.clear()
+        else:
+            since = timezone.now() - timedelta(minutes=options["minutes"])
+            queryset = queryset.filter(updated_at__gte=since)
+            self.stdout.write(
+                self.style.WARNING(f"🔄 Reindexing services updated since {since:%Y-%m-%d %H:%M}…")
+            )
+
+        count = backend.rebuild(queryset, batch_size=options["batch_size"])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ Indexed {count} service(s) with {backend.__class__.__name__}"
+            )
+        )
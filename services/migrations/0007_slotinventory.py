@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-18 01:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0006_service_tour_inclusive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlotInventory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('capacity', models.PositiveIntegerField()),
+                ('booked', models.PositiveIntegerField(default=0)),
+                ('held', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('time_slot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inventory', to='services.servicetimeslot')),
+            ],
+            options={
+                'ordering': ('date',),
+                'constraints': [models.UniqueConstraint(fields=('time_slot', 'date'), name='unique_slot_inventory_date')],
+            },
+        ),
+    ]
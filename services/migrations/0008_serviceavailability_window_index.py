@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-18 01:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0007_slotinventory'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='serviceavailability',
+            index=models.Index(fields=['service', 'start_date', 'end_date'], name='svc_avail_window_idx'),
+        ),
+    ]
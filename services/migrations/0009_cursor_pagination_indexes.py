@@ -0,0 +1,27 @@
+# Generated by Django 5.2.7 on 2026-10-18 01:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0008_serviceavailability_window_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(fields=['is_active', 'is_approved', 'created_at', 'id'], name='service_public_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(fields=['operator', 'created_at', 'id'], name='service_operator_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(fields=['created_at', 'id'], name='service_created_idx'),
+        ),
+    ]
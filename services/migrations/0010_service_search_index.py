@@ -0,0 +1,47 @@
+from django.db import migrations
+
+
+SQLITE_FTS_TABLE = "services_service_fts"
+MYSQL_FULLTEXT_INDEX = "service_fulltext_idx"
+SEARCH_FIELDS = ("title", "description", "tour_inclusive", "city", "country")
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    columns = ", ".join(SEARCH_FIELDS)
+
+    if connection.vendor == "sqlite":
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_FTS_TABLE} "
+            f"USING fts5({columns}, tokenize='unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(
+            f"INSERT INTO {SQLITE_FTS_TABLE} (rowid, {columns}) "
+            f"SELECT id, {columns} FROM services_service"
+        )
+    elif connection.vendor == "mysql":
+        schema_editor.execute(
+            f"ALTER TABLE services_service ADD FULLTEXT INDEX {MYSQL_FULLTEXT_INDEX} ({columns})"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+
+    if connection.vendor == "sqlite":
+        schema_editor.execute(f"DROP TABLE IF EXISTS {SQLITE_FTS_TABLE}")
+    elif connection.vendor == "mysql":
+        schema_editor.execute(
+            f"ALTER TABLE services_service DROP INDEX {MYSQL_FULLTEXT_INDEX}"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0009_cursor_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.7 on 2026-10-18 01:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+WEEKDAY_NAMES = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+
+
+# Frozen copy of services.availability.weekday_mask(): unknown names are
+# ignored and a list with no known names means every day.
+def backfill_weekday_mask(apps, schema_editor):
+    Service = apps.get_model("services", "Service")
+    for service in Service.objects.only("pk", "available_days").iterator():
+        days = {str(day).strip().lower() for day in (service.available_days or [])}
+        mask = sum(1 << index for index, name in enumerate(WEEKDAY_NAMES) if name in days)
+        Service.objects.filter(pk=service.pk).update(weekday_mask=mask or 127)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0010_service_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='service',
+            name='weekday_mask',
+            field=models.PositiveSmallIntegerField(default=127, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='package',
+            index=models.Index(fields=['service', 'is_active', 'price'], name='package_service_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(fields=['is_active', 'is_approved', 'category'], name='service_public_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(fields=['city'], name='service_city_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(fields=['country'], name='service_country_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(fields=['price'], name='service_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(fields=['duration_hours'], name='service_duration_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(fields=['weekday_mask'], name='service_weekday_mask_idx'),
+        ),
+        migrations.RunPython(backfill_weekday_mask, migrations.RunPython.noop),
+    ]
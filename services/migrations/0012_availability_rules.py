@@ -0,0 +1,37 @@
+# Generated by Django 5.2.7 on 2026-10-18 01:57
+
+from django.db import migrations, models
+
+
+WEEKDAY_NAMES = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+
+
+# Frozen copy of services.availability.weekday_mask(): unknown names are
+# ignored and a list with no known names means every day.
+def backfill_weekday_mask(apps, schema_editor):
+    ServiceAvailability = apps.get_model("services", "ServiceAvailability")
+    for availability in ServiceAvailability.objects.only("pk", "available_days").iterator():
+        days = {str(day).strip().lower() for day in (availability.available_days or [])}
+        mask = sum(1 << index for index, name in enumerate(WEEKDAY_NAMES) if name in days)
+        ServiceAvailability.objects.filter(pk=availability.pk).update(weekday_mask=mask or 127)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0011_service_catalog_filters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='serviceavailability',
+            name='blackout_dates',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='serviceavailability',
+            name='weekday_mask',
+            field=models.PositiveSmallIntegerField(default=127, editable=False),
+        ),
+        migrations.RunPython(backfill_weekday_mask, migrations.RunPython.noop),
+    ]
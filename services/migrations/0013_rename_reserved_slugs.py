@@ -0,0 +1,27 @@
+from django.db import migrations
+
+
+# Frozen copy of services.models.RESERVED_SLUGS
+RESERVED_SLUGS = ("search", "packages")
+
+
+def rename_reserved_slugs(apps, schema_editor):
+    """Move services off slugs that the list-level routes shadow."""
+    Service = apps.get_model("services", "Service")
+    for service in Service.objects.filter(slug__in=RESERVED_SLUGS):
+        taken = set(Service.objects.filter(slug__startswith=service.slug).values_list("slug", flat=True))
+        counter = 1
+        while f"{service.slug}-{counter}" in taken:
+            counter += 1
+        Service.objects.filter(pk=service.pk).update(slug=f"{service.slug}-{counter}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0012_availability_rules'),
+    ]
+
+    operations = [
+        migrations.RunPython(rename_reserved_slugs, migrations.RunPython.noop),
+    ]
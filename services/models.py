@@ -5,7 +5,12 @@ from django.db import models
 from django.core.validators import MinValueValidator
 from django.utils.text import slugify
 from django.core.exceptions import ValidationError
-from django.db.models import Sum
+from django.db.models import Count, Min, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from allicom_travels.tracking import FieldTrackerMixin
+from .availability import ALL_DAYS_MASK, AvailabilityRule, parse_exception_dates, weekday_mask
 
 
 def service_image_upload_path(instance, filename):
@@ -20,11 +25,14 @@ def service_document_upload_path(instance, filename):
     return os.path.join("services/documents/", filename)
 
 
-class Service(models.Model):
+class Service(FieldTrackerMixin, models.Model):
     """
     Represents a tour/service uploaded by an operator (Tour Operator).
     Matches the supplier upload form fields.
     """
+    # Search-indexed text plus the weekday list mirrored into weekday_mask
+    TRACKED_FIELDS = ("title", "description", "tour_inclusive", "city", "country", "available_days")
+
     CATEGORY_CHOICES = [
         ('tour', 'Tour'),
         ('hotel', 'Hotel'),
@@ -79,22 +87,43 @@ class Service(models.Model):
         help_text="List of available weekdays (e.g. ['Monday', 'Tuesday'])"
     )
 
+    # Indexed bitmask mirror of available_days (bit 0 = Monday), kept in sync on save
+    weekday_mask = models.PositiveSmallIntegerField(default=ALL_DAYS_MASK, editable=False)
+
     is_active = models.BooleanField(default=True)
     is_approved = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        # Composite keys backing the (created_at, id) cursor pagination
+        indexes = [
+            models.Index(
+                fields=["is_active", "is_approved", "created_at", "id"],
+                name="service_public_created_idx",
+            ),
+            models.Index(fields=["operator", "created_at", "id"], name="service_operator_created_idx"),
+            models.Index(fields=["created_at", "id"], name="service_created_idx"),
+
+            # Catalog filters
+            models.Index(fields=["is_active", "is_approved", "category"], name="service_public_category_idx"),
+            models.Index(fields=["city"], name="service_city_idx"),
+            models.Index(fields=["country"], name="service_country_idx"),
+            models.Index(fields=["price"], name="service_price_idx"),
+            models.Index(fields=["duration_hours"], name="service_duration_idx"),
+            models.Index(fields=["weekday_mask"], name="service_weekday_mask_idx"),
+        ]
+
     def save(self, *args, **kwargs):
         """Auto-generate slug from title if not provided"""
+        if self.has_changed("available_days"):
+            self.weekday_mask = weekday_mask(self.available_days)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "available_days" in update_fields:
+            kwargs["update_fields"] = set(update_fields) | {"weekday_mask"}
+
         if not self.slug:
-            base_slug = slugify(self.title)
-            slug = base_slug
-            counter = 1
-            # Ensure uniqueness by appending a number if slug already exists
-            while Service.objects.filter(slug=slug).exclude(pk=self.pk).exists():
-                slug = f"{base_slug}-{counter}"
-                counter += 1
-            self.slug = slug
+            self.slug = allocate_unique_slugs([self.title], exclude_pk=self.pk)[0]
         super().save(*args, **kwargs)
 
     def images_count(self):
@@ -104,6 +133,43 @@ class Service(models.Model):
         return f"{self.title} by {self.operator.username}"
 
 
+# Service slugs that ServiceViewSet's list-level routes (services/search/,
+# services/packages/) would shadow
+RESERVED_SLUGS = frozenset({"search", "packages"})
+
+
+def allocate_unique_slugs(titles, exclude_pk=None):
+    """
+    Return a unique slug for each title, appending -1, -2, ... on collision
+    with an existing or reserved slug.
+
+    Existing slugs are loaded with a single `startswith` lookup per distinct
+    base slug and collisions are resolved in memory, so allocating slugs for
+    a whole import batch costs one query per base instead of one per attempt.
+    """
+    bases = [slugify(title)[:240] or "service" for title in titles]
+
+    taken = {}
+    for base in set(bases):
+        existing = Service.objects.filter(slug__startswith=base)
+        if exclude_pk is not None:
+            existing = existing.exclude(pk=exclude_pk)
+        taken[base] = set(existing.values_list("slug", flat=True)) | RESERVED_SLUGS
+
+    slugs = []
+    for base in bases:
+        used = taken[base]
+        slug = base
+        counter = 1
+        while slug in used:
+            slug = f"{base}-{counter}"
+            counter += 1
+        used.add(slug)
+        slugs.append(slug)
+
+    return slugs
+
+
 class ServiceImage(models.Model):
     """
     Images for a service (JPEG, PNG, WEBP only)
@@ -139,16 +205,36 @@ class ServiceAvailability(models.Model):
     end_date = models.DateField()
 
     available_days = models.JSONField(default=list, blank=True)
+    weekday_mask = models.PositiveSmallIntegerField(default=ALL_DAYS_MASK, editable=False)
+
+    # Exception dates (ISO strings) closed despite matching available_days
+    blackout_dates = models.JSONField(default=list, blank=True)
+
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ("start_date",)
+        indexes = [
+            models.Index(
+                fields=["service", "start_date", "end_date"],
+                name="svc_avail_window_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.service.title} ({self.start_date} → {self.end_date})"
 
+    @property
+    def rule(self):
+        return AvailabilityRule.for_availability(self)
+
     def clean(self):
+        try:
+            self.blackout_dates = parse_exception_dates(self.blackout_dates)
+        except (TypeError, ValueError):
+            raise ValidationError({"blackout_dates": "Use a list of YYYY-MM-DD dates."})
+
         # 🔒 Prevent validation before parent is saved
         if not self.pk and not self.service_id:
             return
@@ -169,6 +255,10 @@ class ServiceAvailability(models.Model):
 
     def save(self, *args, **kwargs):
         self.full_clean()
+        self.weekday_mask = weekday_mask(self.available_days)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "available_days" in update_fields:
+            kwargs["update_fields"] = set(update_fields) | {"weekday_mask"}
         super().save(*args, **kwargs)
 
 
@@ -197,9 +287,21 @@ class ServiceTimeSlot(models.Model):
     def __str__(self):
         return f"{self.start_time} - {self.end_time}"
 
-    def seats_remaining(self):
+    def seats_remaining(self, date=None):
+        """
+        Seats still available for this slot.
+
+        With a date, reads the per-date SlotInventory ledger (single row lookup).
+        Without one, falls back to the legacy aggregate over all bookings.
+        """
+        if date is not None:
+            row = self.inventory.filter(date=date).first()
+            if row is None:
+                return self.capacity
+            return row.remaining
+
         booked = self.bookings.filter(
-            status__in=["pending", "confirmed"]
+            status__in=["pending", "paid", "confirmed"]
         ).aggregate(
             total=(
                 Sum("num_adults") + Sum("num_children")
@@ -209,6 +311,44 @@ class ServiceTimeSlot(models.Model):
         return max(self.capacity - booked, 0)
 
 
+class SlotInventory(models.Model):
+    """
+    Per-date seat ledger for a time slot.
+
+    `held` counts seats of pending (unpaid) bookings, `booked` counts seats of
+    paid/confirmed bookings. Rows are created lazily and maintained by the
+    booking signals; `manage.py rebuild_slot_inventory` recomputes them.
+    """
+    time_slot = models.ForeignKey(
+        ServiceTimeSlot,
+        on_delete=models.CASCADE,
+        related_name="inventory"
+    )
+    date = models.DateField()
+
+    capacity = models.PositiveIntegerField()
+    booked = models.PositiveIntegerField(default=0)
+    held = models.PositiveIntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ("date",)
+        constraints = [
+            models.UniqueConstraint(
+                fields=["time_slot", "date"],
+                name="unique_slot_inventory_date",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.time_slot} on {self.date} ({self.remaining} left)"
+
+    @property
+    def remaining(self):
+        return max(self.capacity - self.booked - self.held, 0)
+
+
 class Package(models.Model):
     """
     Package model tied to a Service. Operators create packages under their services.
@@ -226,6 +366,56 @@ class Package(models.Model):
     class Meta:
         ordering = ('-created_at',)
         unique_together = ('service', 'name')  # prevent duplicate package names per service
+        indexes = [
+            models.Index(fields=["service", "is_active", "price"], name="package_service_price_idx"),
+        ]
 
     def __str__(self):
-        return f"{self.name} ({self.service.title})"
\ No newline at end of file
+        return f"{self.name} ({self.service.title})"
+
+
+def annotate_service_list(queryset):
+    """
+    Add the computed columns used by ServiceListSerializer as correlated
+    subqueries (no JOIN fan-out): images_count, cover_image_path and
+    min_package_price. next_available_date needs the weekday/blackout rules,
+    so it is computed per page by `next_open_dates`.
+    """
+    images = ServiceImage.objects.filter(service=OuterRef("pk")).order_by()
+    packages = Package.objects.filter(service=OuterRef("pk"), is_active=True).order_by()
+
+    return queryset.annotate(
+        images_count=Coalesce(
+            Subquery(
+                images.values("service").annotate(total=Count("pk")).values("total"),
+                output_field=models.IntegerField(),
+            ),
+            0,
+        ),
+        cover_image_path=Subquery(images.order_by("uploaded_at").values("image")[:1]),
+        min_package_price=Subquery(
+            packages.values("service").annotate(lowest=Min("price")).values("lowest"),
+            output_field=models.DecimalField(max_digits=10, decimal_places=2),
+        ),
+    )
+
+
+def next_open_dates(service_ids, today=None):
+    """
+    {service_id: earliest open date from today} over the active
+    availabilities of `service_ids`, honouring weekday masks and blackout
+    dates. One query, for a page of services.
+    """
+    today = today or timezone.localdate()
+    availabilities = ServiceAvailability.objects.filter(
+        service_id__in=list(service_ids),
+        is_active=True,
+        end_date__gte=today,
+    ).only("service_id", "start_date", "end_date", "weekday_mask", "blackout_dates")
+
+    earliest = {}
+    for availability in availabilities:
+        day = AvailabilityRule.for_availability(availability).first_open_date(today)
+        if day is not None and (availability.service_id not in earliest or day < earliest[availability.service_id]):
+            earliest[availability.service_id] = day
+    return earliest
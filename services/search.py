@@ -0,0 +1,221 @@
+import logging
+import re
+
+from django.db import connection, DatabaseError
+from django.db.models import Case, IntegerField, Q, When
+from django.db.models.expressions import RawSQL
+
+logger = logging.getLogger("services")
+
+SEARCH_FIELDS = ("title", "description", "tour_inclusive", "city", "country")
+
+# Upper bound on ranked candidates fetched from the text index per query
+MAX_SEARCH_RESULTS = 500
+
+SQLITE_FTS_TABLE = "services_service_fts"
+MYSQL_FULLTEXT_INDEX = "service_fulltext_idx"
+
+
+def tokenize(query):
+    return re.findall(r"\w+", query or "", flags=re.UNICODE)
+
+
+# ---------------------------------------------------
+# BACKENDS
+# ---------------------------------------------------
+class BaseSearchBackend:
+    """
+    Text index abstraction over the service catalog.
+
+    `search(queryset, query)` returns the queryset filtered to matches and
+    ordered by relevance. `index(services)` / `remove(ids)` keep the index
+    current for backends that need explicit maintenance.
+    """
+
+    def search(self, queryset, query):
+        raise NotImplementedError
+
+    def index(self, services):
+        pass
+
+    def remove(self, service_ids):
+        pass
+
+    def clear(self):
+        pass
+
+    def rebuild(self, queryset, batch_size=500):
+        count = 0
+        batch = []
+        for service in queryset.only(*SEARCH_FIELDS).iterator(chunk_size=batch_size):
+            batch.append(service)
+            if len(batch) >= batch_size:
+                self.index(batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            self.index(batch)
+            count += len(batch)
+        return count
+
+
+class SQLiteFTSBackend(BaseSearchBackend):
+    """
+    SQLite FTS5 virtual table keyed by service id (rowid), ranked with bm25.
+    Title matches weigh most, then location, then inclusions/description.
+    """
+    WEIGHTS = (10.0, 1.0, 2.0, 4.0, 4.0)
+
+    def _match_expression(self, query):
+        return " ".join(f'"{token}"*' for token in tokenize(query))
+
+    def search(self, queryset, query):
+        match = self._match_expression(query)
+        if not match:
+            return queryset.none()
+
+        # Visibility and catalog filters go inside the ranked query, so the
+        # cap applies to rows the caller can actually see
+        candidates, candidate_params = (
+            queryset.order_by().values_list("pk", flat=True).query.sql_with_params()
+        )
+        weights = ", ".join(str(w) for w in self.WEIGHTS)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid FROM {SQLITE_FTS_TABLE} "
+                f"WHERE {SQLITE_FTS_TABLE} MATCH %s AND rowid IN ({candidates}) "
+                f"ORDER BY bm25({SQLITE_FTS_TABLE}, {weights}) LIMIT %s",
+                [match, *candidate_params, MAX_SEARCH_RESULTS],
+            )
+            ranked_ids = [row[0] for row in cursor.fetchall()]
+
+        if not ranked_ids:
+            return queryset.none()
+
+        ranking = Case(
+            *[When(pk=pk, then=position) for position, pk in enumerate(ranked_ids)],
+            output_field=IntegerField(),
+        )
+        return queryset.filter(pk__in=ranked_ids).annotate(search_rank=ranking).order_by("search_rank")
+
+    def index(self, services):
+        services = list(services)
+        if not services:
+            return
+
+        columns = ", ".join(SEARCH_FIELDS)
+        placeholders = ", ".join(["%s"] * (len(SEARCH_FIELDS) + 1))
+        with connection.cursor() as cursor:
+            self._delete(cursor, [s.pk for s in services])
+            cursor.executemany(
+                f"INSERT INTO {SQLITE_FTS_TABLE} (rowid, {columns}) VALUES ({placeholders})",
+                [
+                    [s.pk] + [getattr(s, field) or "" for field in SEARCH_FIELDS]
+                    for s in services
+                ],
+            )
+
+    def remove(self, service_ids):
+        with connection.cursor() as cursor:
+            self._delete(cursor, list(service_ids))
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SQLITE_FTS_TABLE}")
+
+    def _delete(self, cursor, ids):
+        if ids:
+            cursor.execute(
+                f"DELETE FROM {SQLITE_FTS_TABLE} WHERE rowid IN ({', '.join(['%s'] * len(ids))})",
+                ids,
+            )
+
+
+class MySQLFullTextBackend(BaseSearchBackend):
+    """
+    MySQL/MariaDB FULLTEXT index on the service table itself. The index is
+    maintained by the database, so index/remove are no-ops.
+    """
+
+    def search(self, queryset, query):
+        tokens = tokenize(query)
+        if not tokens:
+            return queryset.none()
+
+        table = queryset.model._meta.db_table
+        columns = ", ".join(f"{table}.{field}" for field in SEARCH_FIELDS)
+        relevance = RawSQL(
+            f"MATCH ({columns}) AGAINST (%s IN NATURAL LANGUAGE MODE)",
+            (" ".join(tokens),),
+        )
+        return (
+            queryset.annotate(search_rank=relevance)
+            .filter(search_rank__gt=0)
+            .order_by("-search_rank", "-id")[:MAX_SEARCH_RESULTS]
+        )
+
+    def rebuild(self, queryset, batch_size=500):
+        return queryset.count()
+
+
+class LikeSearchBackend(BaseSearchBackend):
+    """
+    Fallback for databases without a text index: every token must appear
+    in one of the fields; title hits rank first.
+    """
+
+    def search(self, queryset, query):
+        tokens = tokenize(query)
+        if not tokens:
+            return queryset.none()
+
+        for token in tokens:
+            condition = Q()
+            for field in SEARCH_FIELDS:
+                condition |= Q(**{f"{field}__icontains": token})
+            queryset = queryset.filter(condition)
+
+        title_hit = Case(
+            When(title__icontains=tokens[0], then=0),
+            default=1,
+            output_field=IntegerField(),
+        )
+        return queryset.annotate(search_rank=title_hit).order_by("search_rank", "-id")[:MAX_SEARCH_RESULTS]
+
+
+# ---------------------------------------------------
+# BACKEND SELECTION
+# ---------------------------------------------------
+_backend = None
+
+
+def _sqlite_fts_available():
+    try:
+        return SQLITE_FTS_TABLE in connection.introspection.table_names()
+    except DatabaseError:
+        return False
+
+
+def get_search_backend():
+    global _backend
+    if _backend is None:
+        if connection.vendor == "sqlite" and _sqlite_fts_available():
+            _backend = SQLiteFTSBackend()
+        elif connection.vendor == "mysql":
+            _backend = MySQLFullTextBackend()
+        else:
+            logger.warning("[Search] No text index available, falling back to LIKE search")
+            _backend = LikeSearchBackend()
+    return _backend
+
+
+def search_services(queryset, query):
+    return get_search_backend().search(queryset, query)
+
+
+def index_services(services):
+    get_search_backend().index(services)
+
+
+def remove_services(service_ids):
+    get_search_backend().remove(service_ids)
@@ -1,10 +1,13 @@
+from django.core.files.storage import default_storage
 from rest_framework import serializers
 from .models import (
+    RESERVED_SLUGS,
     Service,
     Package,
     ServiceImage,
     ServiceAvailability,
     ServiceTimeSlot,
+    next_open_dates,
 )
 
 # ---------------------------------------------------
@@ -81,11 +84,54 @@ class ServiceAvailabilitySerializer(serializers.ModelSerializer):
             "start_date",
             "end_date",
             "available_days",
+            "blackout_dates",
             "is_active",
             "time_slots",
         ]
 
 
+class AvailabilityBlockSerializer(serializers.Serializer):
+    """
+    One row of a bulk season upload: an availability window plus its time slots.
+    Validates shape only; overlaps are checked by the view across the batch.
+    """
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+    available_days = serializers.ListField(
+        child=serializers.ChoiceField(choices=Service.WEEKDAYS),
+        required=False,
+        default=list,
+    )
+    blackout_dates = serializers.ListField(child=serializers.DateField(), required=False, default=list)
+    is_active = serializers.BooleanField(required=False, default=True)
+    time_slots = ServiceTimeSlotSerializer(many=True, required=False, default=list)
+
+    def validate(self, attrs):
+        if attrs["end_date"] < attrs["start_date"]:
+            raise serializers.ValidationError({"end_date": "End date cannot be before start date."})
+
+        for slot in attrs["time_slots"]:
+            if slot["end_time"] <= slot["start_time"]:
+                raise serializers.ValidationError(
+                    {"time_slots": "Each time slot must end after it starts."}
+                )
+        return attrs
+
+    def build(self, service):
+        """Unsaved (availability, [time slots]) for bulk_create."""
+        data = self.validated_data
+        availability = ServiceAvailability(
+            service=service,
+            start_date=data["start_date"],
+            end_date=data["end_date"],
+            available_days=list(data["available_days"]),
+            blackout_dates=sorted({day.isoformat() for day in data["blackout_dates"]}),
+            is_active=data["is_active"],
+        )
+        slots = [ServiceTimeSlot(**slot) for slot in data["time_slots"]]
+        return availability, slots
+
+
 # ---------------------------------------------------
 # PACKAGE SERIALIZER (FIXED)
 # ---------------------------------------------------
@@ -152,15 +198,92 @@ class ServiceSerializer(serializers.ModelSerializer):
             "availabilities",
         ]
 
+    def validate_slug(self, value):
+        if value in RESERVED_SLUGS:
+            raise serializers.ValidationError("This slug is reserved; choose another.")
+        return value
+
+    # Read from ServiceViewSet's prefetches when present, so each service
+    # costs no extra queries; fall back to direct queries otherwise.
+    def _is_prefetched(self, obj, name):
+        return name in getattr(obj, "_prefetched_objects_cache", {})
+
     def get_images_count(self, obj):
+        if self._is_prefetched(obj, "images"):
+            return len(obj.images.all())
         return obj.images.count()
 
     def get_packages(self, obj):
-        return PackageSerializer(
-            obj.packages.filter(is_active=True),
-            many=True
-        ).data
+        if self._is_prefetched(obj, "packages"):
+            packages = [p for p in obj.packages.all() if p.is_active]
+        else:
+            packages = obj.packages.filter(is_active=True)
+        return PackageSerializer(packages, many=True).data
+
+    def get_cover_image(self, obj):
+        if self._is_prefetched(obj, "images"):
+            images = sorted(obj.images.all(), key=lambda img: img.uploaded_at)
+            first = images[0] if images else None
+        else:
+            first = obj.images.order_by("uploaded_at").first()
+        return first.image.url if first and first.image else None
+
+
+# ---------------------------------------------------
+# SERVICE LIST SERIALIZER (LEAN, ANNOTATION-BACKED)
+# ---------------------------------------------------
+class ServicePageSerializer(serializers.ListSerializer):
+    """
+    Fills next_available_date for the whole page with one availability
+    query (see `next_open_dates`).
+    """
+
+    def to_representation(self, data):
+        services = list(data.all() if hasattr(data, "all") else data)
+        open_dates = next_open_dates(service.pk for service in services)
+        for service in services:
+            service.next_available_date = open_dates.get(service.pk)
+        return super().to_representation(services)
+
+
+class ServiceListSerializer(serializers.ModelSerializer):
+    """
+    Flat representation used by the catalog list endpoint.
+    The computed fields read queryset annotations added by
+    ServiceViewSet.get_queryset (see `annotate_service_list`), plus one
+    availability query per page for next_available_date.
+    """
+    cover_image = serializers.SerializerMethodField()
+    images_count = serializers.IntegerField(read_only=True)
+    min_package_price = serializers.DecimalField(
+        max_digits=10, decimal_places=2, read_only=True, allow_null=True
+    )
+    next_available_date = serializers.DateField(read_only=True, allow_null=True)
+
+    class Meta:
+        model = Service
+        fields = [
+            "id",
+            "category",
+            "city",
+            "country",
+            "title",
+            "slug",
+            "price",
+            "duration_hours",
+            "min_age",
+            "available_days",
+            "is_active",
+            "is_approved",
+
+            "cover_image",
+            "images_count",
+            "min_package_price",
+            "next_available_date",
+        ]
+        read_only_fields = fields
+        list_serializer_class = ServicePageSerializer
 
     def get_cover_image(self, obj):
-        first = obj.images.order_by("uploaded_at").first()
-        return first.image.url if first and first.image else None
\ No newline at end of file
+        name = getattr(obj, "cover_image_path", None)
+        return default_storage.url(name) if name else None
\ No newline at end of file
@@ -0,0 +1,75 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import (
+    Service,
+    Package,
+    ServiceImage,
+    ServiceAvailability,
+    ServiceTimeSlot,
+)
+from .inventory import sync_capacity
+from .cache import bump_catalog_version
+from .search import SEARCH_FIELDS, index_services, remove_services
+
+
+@receiver(post_save, sender=ServiceTimeSlot)
+def time_slot_post_save(sender, instance, created, **kwargs):
+    """
+    Keep inventory capacity in step with the slot's configured capacity.
+    """
+    if not created:
+        sync_capacity(instance)
+
+
+# ---------------------------------------------------
+# SEARCH INDEX
+# ---------------------------------------------------
+@receiver(post_save, sender=Service)
+def service_search_index_post_save(sender, instance, **kwargs):
+    # Status/price edits leave the indexed text untouched
+    if instance.has_changed(*SEARCH_FIELDS):
+        index_services([instance])
+
+
+@receiver(post_delete, sender=Service)
+def service_search_index_post_delete(sender, instance, **kwargs):
+    remove_services([instance.pk])
+
+
+# ---------------------------------------------------
+# CATALOG CACHE INVALIDATION
+# ---------------------------------------------------
+def _touch_service(service_id):
+    """
+    Roll a child change up into the parent's updated_at (so it always equals
+    max(updated_at) over the service and its children, which the ETags rely
+    on) and return the service slug for cache invalidation.
+    """
+    if not service_id:
+        return None
+    Service.objects.filter(pk=service_id).update(updated_at=timezone.now())
+    return Service.objects.filter(pk=service_id).values_list("slug", flat=True).first()
+
+
+@receiver([post_save, post_delete], sender=Service)
+def service_changed(sender, instance, **kwargs):
+    bump_catalog_version(instance.slug)
+
+
+@receiver([post_save, post_delete], sender=Package)
+@receiver([post_save, post_delete], sender=ServiceImage)
+@receiver([post_save, post_delete], sender=ServiceAvailability)
+def service_child_changed(sender, instance, **kwargs):
+    bump_catalog_version(_touch_service(instance.service_id))
+
+
+@receiver([post_save, post_delete], sender=ServiceTimeSlot)
+def time_slot_changed(sender, instance, **kwargs):
+    service_id = (
+        ServiceAvailability.objects.filter(pk=instance.availability_id)
+        .values_list("service_id", flat=True)
+        .first()
+    )
+    bump_catalog_version(_touch_service(service_id))
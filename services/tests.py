@@ -1,3 +1,436 @@
-from django.test import TestCase
+from datetime import date, time
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import IntegrityError
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .filters import service_facets
+from .search import LikeSearchBackend, SQLiteFTSBackend, get_search_backend
+from .inventory import InsufficientSeats, get_inventory_row, reserve_seats
+from .models import Package, Service, ServiceAvailability, ServiceTimeSlot, SlotInventory
+
+DAY = date(2030, 1, 7)
+
+LOCMEM_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "services-tests"}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class CleanCacheTestCase(TestCase):
+    """
+    Private, emptied cache per test, so cached catalog responses, catalog
+    versions and DRF throttle history never leak between tests or runs.
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+
+class SlotInventoryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        operator = get_user_model().objects.create_user("op", "op@example.com", "pw", role="operator")
+        service = Service.objects.create(
+            operator=operator, title="Tour", city="Lagos", country="Nigeria",
+            description="d", price=100, is_approved=True,
+        )
+        availability = ServiceAvailability.objects.create(
+            service=service, start_date=date(2030, 1, 1), end_date=date(2030, 12, 31),
+        )
+        cls.slot = ServiceTimeSlot.objects.create(
+            availability=availability, start_time=time(9), end_time=time(11), capacity=5,
+        )
+
+    def counters(self):
+        row = SlotInventory.objects.get(time_slot=self.slot, date=DAY)
+        return row.booked, row.held
+
+    def test_reserve_claims_seats_in_the_requested_bucket(self):
+        reserve_seats(self.slot, DAY, 2)
+        reserve_seats(self.slot, DAY, 1, bucket="booked")
+
+        self.assertEqual(self.counters(), (1, 2))
+
+    def test_rejected_reservation_leaves_counters_unchanged(self):
+        reserve_seats(self.slot, DAY, 3)
+        reserve_seats(self.slot, DAY, 1, bucket="booked")
+
+        with self.assertRaises(InsufficientSeats) as raised:
+            reserve_seats(self.slot, DAY, 2, bucket="booked")
+
+        self.assertEqual(raised.exception.remaining, 1)
+        self.assertEqual(self.counters(), (1, 3))
+
+    def test_held_and_booked_seats_both_count_against_capacity(self):
+        reserve_seats(self.slot, DAY, 4)
+        reserve_seats(self.slot, DAY, 1, bucket="booked")
+
+        with self.assertRaises(InsufficientSeats):
+            reserve_seats(self.slot, DAY, 1)
+        self.assertEqual(self.counters(), (1, 4))
+
+    def test_first_use_race_falls_back_to_the_winners_row(self):
+        winner = SlotInventory.objects.create(time_slot=self.slot, date=DAY, capacity=5)
+
+        # Our first read missed the row and our INSERT lost the race
+        with mock.patch("django.db.models.query.QuerySet.first", return_value=None), \
+                mock.patch.object(SlotInventory.objects, "create", side_effect=IntegrityError):
+            row = get_inventory_row(self.slot, DAY)
+
+        self.assertEqual(row.pk, winner.pk)
+
+
+class ServiceFacetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        operator = get_user_model().objects.create_user("op", "op@example.com", "pw", role="operator")
+
+        def service(title, price, **fields):
+            return Service.objects.create(
+                operator=operator, title=title, country="Nigeria", description="d",
+                price=price, is_approved=True, **{"city": "Lagos", **fields},
+            )
+
+        boat = service("Boat", 100, category="tour", duration_hours=2, min_age=12, available_days=["Saturday"])
+        service("Hike", 250, category="tour", duration_hours=6, available_days=["Saturday", "Sunday"])
+        service("Museum", 40, category="event", duration_hours=30)
+        service("Safari", 900, city="Abuja", category="tour", duration_hours=6, min_age=12)
+        Package.objects.create(service=boat, name="VIP", description="d", price=Decimal("600"), is_active=True)
+
+    def test_facets_are_counted_over_the_filtered_queryset(self):
+        facets = service_facets(Service.objects.filter(city="Lagos"))
+
+        self.assertEqual(facets["city"], [{"value": "Lagos", "count": 3}])
+        self.assertEqual(facets["category"], [{"value": "tour", "count": 2}, {"value": "event", "count": 1}])
+        self.assertEqual(facets["min_age"], [{"value": None, "count": 2}, {"value": 12, "count": 1}])
+        self.assertEqual(
+            [(bucket["min"], bucket["max"], bucket["count"]) for bucket in facets["duration_hours"]],
+            [(None, 2, 1), (3, 4, 0), (5, 8, 1), (9, 24, 0), (25, None, 1)],
+        )
+        weekdays = {row["value"]: row["count"] for row in facets["weekday"]}
+        self.assertEqual((weekdays["Saturday"], weekdays["Sunday"], weekdays["Monday"]), (3, 2, 1))
+        # Package prices count towards the range, as they do for ?max_price
+        self.assertEqual(facets["price"], {"min": Decimal("40"), "max": Decimal("600")})
+
+
+class ServiceSlugTests(CleanCacheTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.operator = get_user_model().objects.create_user("op", "op@example.com", "pw", role="operator")
+
+    def test_route_names_are_never_allocated_as_slugs(self):
+        service = Service.objects.create(
+            operator=self.operator, title="Search", city="Lagos", country="Nigeria",
+            description="d", price=100, is_approved=True,
+        )
+
+        self.assertEqual(service.slug, "search-1")
+        response = self.client.get(reverse("services:service-detail", args=[service.slug]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["title"], "Search")
+
+
+class ConditionalGetTests(CleanCacheTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        operator = get_user_model().objects.create_user("op", "op@example.com", "pw", role="operator")
+        cls.service = Service.objects.create(
+            operator=operator, title="Tour", city="Lagos", country="Nigeria",
+            description="d", price=100, is_approved=True,
+        )
+        availability = ServiceAvailability.objects.create(
+            service=cls.service, start_date=date(2030, 1, 1), end_date=date(2030, 12, 31),
+        )
+        cls.slot = ServiceTimeSlot.objects.create(
+            availability=availability, start_time=time(9), end_time=time(11), capacity=5,
+        )
+
+    def test_detail_if_none_match_round_trip(self):
+        url = reverse("services:service-detail", args=[self.service.slug])
+        first = self.client.get(url)
+        etag = first["ETag"]
+
+        self.assertEqual(first.status_code, 200)
+        self.assertTrue(etag.startswith('W/"'))
+        self.assertIn("Last-Modified", first)
+
+        cached = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached["ETag"], etag)
+        self.assertEqual(cached.content, b"")
+        # Weak comparison: the strong form of the tag matches too
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag[2:]).status_code, 304)
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=first["Last-Modified"]).status_code, 304)
+
+        self.service.title = "Tour (updated)"
+        self.service.save()
+        changed = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed["ETag"], etag)
+        self.assertEqual(changed.json()["title"], "Tour (updated)")
+
+    def test_calendar_etag_follows_inventory(self):
+        url = reverse("services:service-calendar", args=[self.service.slug])
+        window = {"from": "2030-01-07", "to": "2030-01-13"}
+        etag = self.client.get(url, window)["ETag"]
+
+        self.assertEqual(self.client.get(url, window, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        reserve_seats(self.slot, DAY, 2)
+        response = self.client.get(url, window, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+
+class BulkAvailabilityTests(CleanCacheTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.operator = get_user_model().objects.create_user("op", "op@example.com", "pw", role="operator")
+        cls.service = Service.objects.create(
+            operator=cls.operator, title="Tour", city="Lagos", country="Nigeria",
+            description="d", price=100, is_approved=True,
+        )
+        cls.existing = ServiceAvailability.objects.create(
+            service=cls.service, start_date=date(2030, 6, 1), end_date=date(2030, 6, 30),
+        )
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.operator)
+        self.url = reverse("services:service-bulk-availability", args=[self.service.slug])
+
+    def block(self, start, end):
+        return {
+            "start_date": start,
+            "end_date": end,
+            "available_days": ["Saturday", "Sunday"],
+            "time_slots": [{"start_time": "09:00", "end_time": "11:00", "capacity": 10}],
+        }
+
+    def test_non_overlapping_season_is_created_with_its_slots(self):
+        response = self.client.post(
+            self.url,
+            [self.block("2030-01-01", "2030-03-31"), self.block("2030-04-01", "2030-05-31")],
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual((response.json()["created"], response.json()["time_slots_created"]), (2, 2))
+        self.assertEqual(self.service.availabilities.count(), 3)
+
+    def test_any_overlap_rejects_the_whole_batch(self):
+        response = self.client.post(
+            self.url,
+            [
+                self.block("2030-01-01", "2030-01-31"),
+                self.block("2030-06-15", "2030-07-15"),
+                self.block("2030-07-10", "2030-08-10"),
+            ],
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 400)
+        errors = {row["row"]: row["errors"]["non_field_errors"] for row in response.json()["errors"]}
+        self.assertEqual(sorted(errors), [1, 2])
+        self.assertIn(f"Overlaps existing availability #{self.existing.pk}.", errors[1])
+        self.assertIn("Overlaps row 1.", errors[2])
+        # The valid first row was not written either
+        self.assertEqual(list(self.service.availabilities.all()), [self.existing])
+        self.assertFalse(ServiceTimeSlot.objects.exists())
+
+
+class CatalogCacheTests(CleanCacheTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.operator = get_user_model().objects.create_user("op", "op@example.com", "pw", role="operator")
+        cls.boat = Service.objects.create(
+            operator=cls.operator, title="Boat", city="Lagos", country="Nigeria",
+            description="d", price=100, is_approved=True,
+        )
+        cls.hike = Service.objects.create(
+            operator=cls.operator, title="Hike", city="Lagos", country="Nigeria",
+            description="d", price=200, is_approved=True,
+        )
+
+    def get(self, url):
+        response = self.client.get(url)
+        return response["X-Cache"], response.json()
+
+    def test_list_is_served_from_cache_until_the_catalog_changes(self):
+        url = reverse("services:service-list")
+        self.assertEqual(self.get(url)[0], "MISS")
+        self.assertEqual(self.get(url)[0], "HIT")
+
+        Package.objects.create(service=self.boat, name="VIP", description="d", price=Decimal("50"), is_active=True)
+
+        state, body = self.get(url)
+        self.assertEqual(state, "MISS")
+        boat = next(row for row in body["results"] if row["slug"] == self.boat.slug)
+        self.assertEqual(Decimal(str(boat["min_package_price"])), Decimal("50"))
+
+    def test_detail_is_only_invalidated_by_its_own_service(self):
+        url = reverse("services:service-detail", args=[self.boat.slug])
+        self.get(url)
+
+        self.hike.title = "Hike (updated)"
+        self.hike.save()
+        self.assertEqual(self.get(url)[0], "HIT")
+
+        self.boat.title = "Boat (updated)"
+        self.boat.save()
+        state, body = self.get(url)
+        self.assertEqual((state, body["title"]), ("MISS", "Boat (updated)"))
+
+    def test_admin_bulk_approval_invalidates_cached_pages(self):
+        from django.contrib import admin
+
+        Service.objects.filter(pk=self.hike.pk).update(is_approved=False)
+        list_url = reverse("services:service-list")
+        detail_url = reverse("services:service-detail", args=[self.hike.slug])
+        self.assertEqual(self.client.get(detail_url).status_code, 404)
+        self.assertEqual([row["slug"] for row in self.get(list_url)[1]["results"]], [self.boat.slug])
+
+        model_admin = admin.site._registry[Service]
+        with mock.patch.object(model_admin, "message_user"):
+            model_admin.approve_services(None, Service.objects.filter(pk=self.hike.pk))
+
+        state, body = self.get(list_url)
+        self.assertEqual(state, "MISS")
+        self.assertEqual({row["slug"] for row in body["results"]}, {self.boat.slug, self.hike.slug})
+        self.assertEqual(self.client.get(detail_url).status_code, 200)
+
+
+class ServiceSearchTests(CleanCacheTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        operator = get_user_model().objects.create_user("op", "op@example.com", "pw", role="operator")
+
+        def service(title, description="d", approved=True):
+            return Service.objects.create(
+                operator=operator, title=title, city="Lagos", country="Nigeria",
+                description=description, price=100, is_approved=approved,
+            )
+
+        cls.in_title = service("Lagoon kayaking")
+        cls.in_description = service("Island day trip", description="Paddle across the lagoon at dawn")
+        cls.unrelated = service("City museum")
+        cls.hidden = [service(f"Lagoon cruise {n}", approved=False) for n in range(3)]
+
+    def visible(self):
+        return Service.objects.filter(is_active=True, is_approved=True)
+
+    def ranked(self, backend, query):
+        return [service.pk for service in backend.search(self.visible(), query)]
+
+    def test_fts_ranks_title_matches_first_and_matches_prefixes(self):
+        backend = get_search_backend()
+        if not isinstance(backend, SQLiteFTSBackend):
+            self.skipTest("SQLite FTS5 index not available")
+
+        self.assertEqual(self.ranked(backend, "lagoon"), [self.in_title.pk, self.in_description.pk])
+        self.assertEqual(self.ranked(backend, "kayak"), [self.in_title.pk])
+        self.assertEqual(self.ranked(backend, "!!"), [])
+
+    def test_fts_cap_applies_after_visibility(self):
+        backend = get_search_backend()
+        if not isinstance(backend, SQLiteFTSBackend):
+            self.skipTest("SQLite FTS5 index not available")
+
+        # Hidden title matches outrank both visible ones but must not use up the cap
+        with mock.patch("services.search.MAX_SEARCH_RESULTS", 2):
+            self.assertEqual(self.ranked(backend, "lagoon"), [self.in_title.pk, self.in_description.pk])
+
+    def test_fts_index_follows_edits(self):
+        backend = get_search_backend()
+        if not isinstance(backend, SQLiteFTSBackend):
+            self.skipTest("SQLite FTS5 index not available")
+
+        self.unrelated.title = "Lagoon museum"
+        self.unrelated.save()
+        self.assertIn(self.unrelated.pk, self.ranked(backend, "lagoon"))
+
+        self.in_title.delete()
+        self.assertNotIn(self.in_title.pk, self.ranked(backend, "lagoon"))
+
+    def test_like_fallback_requires_every_token(self):
+        backend = LikeSearchBackend()
+
+        self.assertEqual(self.ranked(backend, "lagoon"), [self.in_title.pk, self.in_description.pk])
+        self.assertEqual(self.ranked(backend, "lagoon dawn"), [self.in_description.pk])
+
+    def test_endpoint_rejects_short_queries(self):
+        url = reverse("services:service-search")
+
+        self.assertEqual(self.client.get(url, {"q": "l"}).status_code, 400)
+        response = self.client.get(url, {"q": "lagoon"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row["id"] for row in response.json()["results"]], [self.in_title.pk, self.in_description.pk])
+
+
+class ServiceCalendarTests(CleanCacheTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        operator = get_user_model().objects.create_user("op", "op@example.com", "pw", role="operator")
+        cls.service = Service.objects.create(
+            operator=operator, title="Tour", city="Lagos", country="Nigeria",
+            description="d", price=100, is_approved=True,
+        )
+        cls.availability = ServiceAvailability.objects.create(
+            service=cls.service, start_date=date(2030, 1, 1), end_date=date(2030, 12, 31),
+            available_days=["Monday"], blackout_dates=["2030-01-14"],
+        )
+        cls.morning = ServiceTimeSlot.objects.create(
+            availability=cls.availability, start_time=time(9), end_time=time(11), capacity=2,
+        )
+        cls.evening = ServiceTimeSlot.objects.create(
+            availability=cls.availability, start_time=time(17), end_time=time(19), capacity=4,
+        )
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse("services:service-calendar", args=[self.service.slug])
+
+    def get(self, **params):
+        return self.client.get(self.url, {"from": "2030-01-01", "to": "2030-01-21", **params})
+
+    def test_only_open_dates_in_the_window_are_listed(self):
+        reserve_seats(self.morning, DAY, 2)
+
+        body = self.get().json()
+
+        self.assertEqual(body["window"], {"from": "2030-01-01", "to": "2030-01-21"})
+        # Mondays in the window, minus the 14th blackout
+        self.assertEqual(list(body["calendar"]), ["2030-01-07", "2030-01-21"])
+        self.assertEqual(
+            [(slot["remaining"], slot["available"]) for slot in body["calendar"]["2030-01-07"]],
+            [(0, False), (4, True)],
+        )
+        self.assertEqual(self.get(mode="summary").json()["days"], {"2030-01-07": True, "2030-01-21": True})
+
+    def test_invalid_windows_are_rejected(self):
+        self.assertEqual(self.get(to="2029-12-31").status_code, 400)
+        self.assertEqual(self.get(to="2031-06-01").status_code, 400)
+        self.assertEqual(self.get(**{"from": "01/01/2030"}).status_code, 400)
+
+    def test_query_count_does_not_grow_with_slots_or_days(self):
+        with CaptureQueriesContext(connection) as small:
+            self.get(to="2030-01-07")
+
+        for hour in (11, 13, 15):
+            ServiceTimeSlot.objects.create(
+                availability=self.availability, start_time=time(hour), end_time=time(hour + 1), capacity=3,
+            )
+        reserve_seats(self.evening, date(2030, 3, 4), 1)
+        with CaptureQueriesContext(connection) as large:
+            response = self.get(to="2030-06-30")
+
+        self.assertEqual(len(response.json()["calendar"]["2030-03-04"]), 5)
+        self.assertEqual(len(large), len(small))
@@ -1,11 +1,12 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ServiceViewSet, PackageViewSet, ServiceCalendarView
+from .views import ServiceViewSet, PackageViewSet, ServiceCalendarView, CatalogCacheStatsView
 
 app_name = "services"
 
 # Define urlpatterns first
 urlpatterns = [
+    path("cache/stats/", CatalogCacheStatsView.as_view(), name="catalog-cache-stats"),
     path("<slug:slug>/calendar/", ServiceCalendarView.as_view(), name="service-calendar"),
 ]
 
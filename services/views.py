@@ -1,27 +1,53 @@
-from datetime import timedelta
+from datetime import date, timedelta
 
 from django.shortcuts import get_object_or_404
-from django.db.models import Prefetch
+from django.db import transaction
+from django.db.models import Count, Max, Prefetch
+from django.utils import timezone
 
 from rest_framework import viewsets, status, serializers
 from rest_framework.response import Response
-from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
 from rest_framework.views import APIView
 
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from django_filters.rest_framework import DjangoFilterBackend
 from drf_spectacular.utils import extend_schema
 
-from .models import Service, Package, ServiceImage, ServiceAvailability
+from .models import (
+    Service,
+    Package,
+    ServiceImage,
+    ServiceAvailability,
+    ServiceTimeSlot,
+    SlotInventory,
+    annotate_service_list,
+)
 from .serializers import (
     ServiceSerializer,
+    ServiceListSerializer,
     PackageSerializer,
     ServiceImageSerializer,
     ServiceAvailabilitySerializer,
+    AvailabilityBlockSerializer,
 )
 from .permissions import ServicePermission, PackagePermission
+from .inventory import inventory_map
+from .availability import find_overlaps
+from .catalog_io import bulk_create_windows
+from .cache import bump_catalog_version, cache_catalog_response, catalog_cache_stats
+from .search import search_services
+from .filters import ServiceFilter, service_facets
 from bookings.models import Booking
+from allicom_travels.pagination import CreatedAtCursorPagination, SearchResultsPagination
+from allicom_travels.conditional import (
+    is_not_modified,
+    make_weak_etag,
+    not_modified_response,
+    set_validators,
+)
 
 
 class ServiceViewSet(viewsets.ModelViewSet):
@@ -32,15 +58,37 @@ class ServiceViewSet(viewsets.ModelViewSet):
     permission_classes = [ServicePermission]
     parser_classes = (MultiPartParser, FormParser)
     lookup_field = "slug"
+    pagination_class = CreatedAtCursorPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = ServiceFilter
+
+    LIST_ACTIONS = ("list", "search")
+
+    MAX_BULK_AVAILABILITY_ROWS = 500
+
+    def get_serializer_class(self):
+        if self.action in self.LIST_ACTIONS:
+            return ServiceListSerializer
+        return ServiceSerializer
 
     def get_queryset(self):
-        user = self.request.user
+        if self.action in self.LIST_ACTIONS:
+            # Lean list: computed columns come from subquery annotations
+            qs = annotate_service_list(Service.objects.all())
+        else:
+            qs = Service.objects.all().prefetch_related(
+                "images",
+                Prefetch(
+                    "availabilities",
+                    queryset=ServiceAvailability.objects.prefetch_related("time_slots"),
+                ),
+                Prefetch("packages", queryset=Package.objects.filter(is_active=True)),
+            )
 
-        qs = Service.objects.all().prefetch_related(
-            "images",
-            "availabilities",
-            Prefetch("packages", queryset=Package.objects.filter(is_active=True)),
-        )
+        return self._visible(qs)
+
+    def _visible(self, qs):
+        user = self.request.user
 
         if user.is_authenticated and (user.is_staff or user.is_superuser):
             return qs
@@ -50,6 +98,69 @@ class ServiceViewSet(viewsets.ModelViewSet):
 
         return qs.filter(is_active=True, is_approved=True)
 
+    @cache_catalog_response("service-list")
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+
+        # Facets are counted over the filtered catalog, without list annotations
+        if request.query_params.get("facets", "true").lower() not in ("0", "false", "no"):
+            facet_qs = self.filter_queryset(self._visible(Service.objects.all()))
+            response.data["facets"] = service_facets(facet_qs)
+
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        # Validators come from one narrow query; a match skips the cache,
+        # the prefetches and serialization entirely.
+        version = (
+            self._visible(Service.objects.all())
+            .filter(slug=kwargs.get("slug"))
+            .values_list("id", "updated_at")
+            .first()
+        )
+        if version is None:
+            return self._cached_retrieve(request, *args, **kwargs)
+
+        etag = make_weak_etag("service", *version)
+        last_modified = version[1]
+
+        if is_not_modified(request, etag, last_modified):
+            return not_modified_response(etag, last_modified)
+
+        response = self._cached_retrieve(request, *args, **kwargs)
+        return set_validators(response, etag, last_modified)
+
+    @cache_catalog_response("service-detail", per_service=True)
+    def _cached_retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="search",
+    )
+    @cache_catalog_response("service-search")
+    def search(self, request):
+        """
+        GET /api/v1/services/search/?q=<text>
+        Relevance-ranked full-text search over title, description,
+        inclusions, city and country.
+        """
+        query = (request.query_params.get("q") or "").strip()
+
+        if len(query) < 2:
+            return Response(
+                {"detail": "Query parameter 'q' must be at least 2 characters."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        results = search_services(self.filter_queryset(self.get_queryset()), query)
+
+        paginator = SearchResultsPagination()
+        page = paginator.paginate_queryset(results, request, view=self)
+        serializer = self.get_serializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
     def perform_create(self, serializer):
         serializer.save(operator=self.request.user)
 
@@ -131,7 +242,7 @@ class ServiceViewSet(viewsets.ModelViewSet):
     def approve(self, request, slug=None):
         service = self.get_object()
         service.is_approved = True
-        service.save(update_fields=["is_approved"])
+        service.save(update_fields=["is_approved", "updated_at"])
         return Response(
             {"detail": "Service approved successfully."},
             status=status.HTTP_200_OK,
@@ -146,7 +257,7 @@ class ServiceViewSet(viewsets.ModelViewSet):
     def reject(self, request, slug=None):
         service = self.get_object()
         service.is_approved = False
-        service.save(update_fields=["is_approved"])
+        service.save(update_fields=["is_approved", "updated_at"])
         return Response(
             {"detail": "Service rejected."},
             status=status.HTTP_200_OK,
@@ -157,12 +268,107 @@ class ServiceViewSet(viewsets.ModelViewSet):
         methods=["get"],
         url_path="availability",
     )
+    @cache_catalog_response("service-availability", per_service=True)
     def availability(self, request, slug=None):
         service = self.get_object()
         availabilities = service.availabilities.filter(is_active=True)
         serializer = ServiceAvailabilitySerializer(availabilities, many=True)
         return Response(serializer.data)
 
+    @extend_schema(request=AvailabilityBlockSerializer(many=True))
+    @action(
+        detail=True,
+        methods=["post"],
+        url_path="availability/bulk",
+        parser_classes=[JSONParser],
+    )
+    def bulk_availability(self, request, slug=None):
+        """
+        POST /api/v1/services/<slug>/availability/bulk/
+        Body: a list of availability blocks (or {"availabilities": [...]}),
+        each with optional nested time_slots.
+
+        All-or-nothing: rows are validated, then checked for overlaps against
+        existing windows and each other with one sorted sweep. Any error
+        returns 400 with per-row errors and nothing is written.
+        """
+        service = self.get_object()
+
+        rows = request.data.get("availabilities") if isinstance(request.data, dict) else request.data
+        if not isinstance(rows, list) or not rows:
+            return Response(
+                {"detail": "Provide a non-empty list of availability blocks."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(rows) > self.MAX_BULK_AVAILABILITY_ROWS:
+            return Response(
+                {"detail": f"At most {self.MAX_BULK_AVAILABILITY_ROWS} blocks per request."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        errors = {}
+        blocks = {}
+        for index, row in enumerate(rows):
+            block = AvailabilityBlockSerializer(data=row)
+            if block.is_valid():
+                blocks[index] = block
+            else:
+                errors[index] = block.errors
+
+        # One query for existing windows, then an in-memory interval sweep
+        intervals = [
+            (start, end, ("existing", pk))
+            for pk, start, end in service.availabilities.values_list("pk", "start_date", "end_date")
+        ]
+        intervals += [
+            (block.validated_data["start_date"], block.validated_data["end_date"], ("row", index))
+            for index, block in blocks.items()
+        ]
+
+        def describe(key):
+            kind, ref = key
+            return f"existing availability #{ref}" if kind == "existing" else f"row {ref}"
+
+        for first, second in find_overlaps(intervals):
+            for key, other in ((first, second), (second, first)):
+                if key[0] == "row":
+                    errors.setdefault(key[1], {}).setdefault("non_field_errors", []).append(
+                        f"Overlaps {describe(other)}."
+                    )
+
+        if errors:
+            return Response(
+                {
+                    "detail": "No availability was created.",
+                    "errors": [
+                        {"row": index, "errors": errors[index]} for index in sorted(errors)
+                    ],
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        with transaction.atomic():
+            availabilities, slots = bulk_create_windows(
+                [blocks[index].build(service) for index in sorted(blocks)]
+            )
+
+        # bulk_create skips the catalog signals
+        Service.objects.filter(pk=service.pk).update(updated_at=timezone.now())
+        bump_catalog_version(service.slug)
+
+        created = ServiceAvailability.objects.filter(
+            pk__in=[availability.pk for availability in availabilities]
+        ).prefetch_related("time_slots")
+
+        return Response(
+            {
+                "created": len(availabilities),
+                "time_slots_created": len(slots),
+                "availabilities": ServiceAvailabilitySerializer(created, many=True).data,
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
     @action(
         detail=True,
         methods=["post"],
@@ -266,31 +472,75 @@ class PackageViewSet(viewsets.ModelViewSet):
 
 
 class ServiceCalendarView(APIView):
+    """
+    GET /api/v1/services/<slug>/calendar/?from=YYYY-MM-DD&to=YYYY-MM-DD[&mode=summary]
+
+    Returns slot availability per open date inside a bounded window
+    (default: the next DEFAULT_WINDOW_DAYS days). `mode=summary` returns only
+    a per-day availability flag, for month views.
+    """
     permission_classes = [AllowAny]
 
+    DEFAULT_WINDOW_DAYS = 60
+    MAX_WINDOW_DAYS = 366
+
     def get(self, request, slug):
         service = get_object_or_404(Service, slug=slug, is_active=True)
 
-        calendar = {}
-        availabilities = service.availabilities.filter(is_active=True)
+        try:
+            date_from, date_to = self._parse_window(request)
+        except ValueError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        summary = request.query_params.get("mode") == "summary"
+
+        # Validators: service (incl. children, see services.signals) + inventory
+        inventory_version = SlotInventory.objects.filter(
+            time_slot__availability__service=service,
+            date__gte=date_from,
+            date__lte=date_to,
+        ).aggregate(latest=Max("updated_at"), rows=Count("pk"))
+        etag = make_weak_etag(
+            "calendar",
+            service.id,
+            service.updated_at.timestamp(),
+            date_from,
+            date_to,
+            summary,
+            inventory_version["latest"] and inventory_version["latest"].timestamp(),
+            inventory_version["rows"],
+        )
+        if is_not_modified(request, etag):
+            return not_modified_response(etag)
+
+        # One query for availabilities overlapping the window, one for their slots
+        availabilities = list(
+            service.availabilities.filter(
+                is_active=True,
+                start_date__lte=date_to,
+                end_date__gte=date_from,
+            ).prefetch_related(
+                Prefetch("time_slots", queryset=ServiceTimeSlot.objects.filter(is_active=True))
+            )
+        )
 
-        for availability in availabilities:
-            current_date = availability.start_date
+        slot_ids = [slot.id for availability in availabilities for slot in availability.time_slots.all()]
+        inventory = inventory_map(slot_ids, date_from, date_to) if slot_ids else {}
 
-            while current_date <= availability.end_date:
-                weekday = current_date.strftime("%A")
+        calendar = {}
 
-                if availability.available_days and weekday not in availability.available_days:
-                    current_date += timedelta(days=1)
-                    continue
+        for availability in availabilities:
+            slots = availability.time_slots.all()
 
+            for current_date in availability.rule.open_dates(date_from, date_to):
                 date_key = current_date.isoformat()
-                calendar.setdefault(date_key, [])
+                day_slots = calendar.setdefault(date_key, [])
 
-                for slot in availability.time_slots.filter(is_active=True):
-                    remaining = slot.seats_remaining()
+                for slot in slots:
+                    row = inventory.get((slot.id, current_date))
+                    remaining = row.remaining if row else slot.capacity
 
-                    calendar[date_key].append({
+                    day_slots.append({
                         "time_slot_id": slot.id,
                         "start_time": slot.start_time.strftime("%H:%M"),
                         "end_time": slot.end_time.strftime("%H:%M"),
@@ -299,13 +549,60 @@ class ServiceCalendarView(APIView):
                         "available": remaining > 0,
                     })
 
-                current_date += timedelta(days=1)
-
-        return Response({
+        payload = {
             "service": {
                 "id": service.id,
                 "title": service.title,
                 "slug": service.slug,
             },
-            "calendar": calendar
-        })
\ No newline at end of file
+            "window": {
+                "from": date_from.isoformat(),
+                "to": date_to.isoformat(),
+            },
+        }
+
+        if summary:
+            payload["days"] = {
+                date_key: any(slot["available"] for slot in day_slots)
+                for date_key, day_slots in sorted(calendar.items())
+            }
+        else:
+            payload["calendar"] = dict(sorted(calendar.items()))
+
+        return set_validators(Response(payload), etag)
+
+    def _parse_window(self, request):
+        today = timezone.localdate()
+
+        date_from = self._parse_date(request.query_params.get("from"), "from") or today
+        date_to = self._parse_date(request.query_params.get("to"), "to") or (
+            date_from + timedelta(days=self.DEFAULT_WINDOW_DAYS - 1)
+        )
+
+        if date_to < date_from:
+            raise ValueError("'to' cannot be before 'from'.")
+
+        if (date_to - date_from).days >= self.MAX_WINDOW_DAYS:
+            raise ValueError(f"Calendar window cannot exceed {self.MAX_WINDOW_DAYS} days.")
+
+        return date_from, date_to
+
+    @staticmethod
+    def _parse_date(value, name):
+        if not value:
+            return None
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            raise ValueError(f"Invalid '{name}' date. Use YYYY-MM-DD.")
+
+
+class CatalogCacheStatsView(APIView):
+    """
+    GET /api/v1/services/cache/stats/
+    Admin-only view of catalog response cache hit/miss counters.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(catalog_cache_stats())